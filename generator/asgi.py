@@ -0,0 +1,687 @@
+# ============================================================
+# FILE: .\asgi.py (асинхронный вариант server.py)
+# TYPE: .PY
+# ============================================================
+#
+# Запуск: uvicorn asgi:app --host 0.0.0.0 --port 5000
+#
+# Те же эндпоинты и те же JSON-ответы, что у server.py, но синтез Edge-TTS
+# ожидается прямо в event loop сервера: один процесс держит сотни
+# ожидающих генераций и при этом сразу отдает готовые файлы.
+
+import sys
+import os
+import contextlib
+import time
+from pathlib import Path
+from urllib.parse import quote
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Добавляем путь к модулям
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from classes.SpeechGenerator import SpeechGenerator
+from classes.HealthMonitor import HealthMonitor
+from classes.AudioByteCache import AudioByteCache
+from classes.AudioBundle import AudioBundleStore
+
+# Получаем путь к директории с аудиофайлами из переменной окружения
+# или используем значение по умолчанию
+BASE_AUDIO_DIR = os.environ.get('BASE_AUDIO_DIR',
+    os.path.abspath("/home/vmaya/www/eng_frases/public/data/voices"))
+BASE_OUTPUT_DIR = BASE_AUDIO_DIR
+
+Path(BASE_OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+
+print(f"Инициализация SpeechGenerator (ASGI)...")
+print(f"BASE_OUTPUT_DIR: {BASE_OUTPUT_DIR}")
+
+speech_generator = SpeechGenerator(BASE_OUTPUT_DIR, use_edge_tts=True)
+audio_manifest = speech_generator.manifest
+
+# Фоновое обновление индекса (запускается в lifespan); AUDIO_MANIFEST_WATCH=0 отключает
+AUDIO_MANIFEST_WATCH = os.environ.get('AUDIO_MANIFEST_WATCH', '1').lower() in ('1', 'true', 'yes')
+
+# Кэш содержимого часто запрашиваемых аудиофайлов (AUDIO_CACHE_MB, AUDIO_CACHE_ENTRY_KB)
+audio_cache = AudioByteCache.from_env()
+
+# Время кэширования аудио клиентом: имена файлов содержат хэш фразы
+AUDIO_MAX_AGE = int(os.environ.get('AUDIO_MAX_AGE', '31536000'))
+
+# Способ отдачи аудиофайлов (AUDIO_SERVE_MODE):
+#   python     - частые файлы из кэша в памяти, остальные через FileResponse
+#   sendfile   - FileResponse без кэша (http.response.pathsend, если сервер поддерживает)
+#   x-accel    - только заголовок X-Accel-Redirect, файл отдает nginx
+#                (internal location AUDIO_ACCEL_PREFIX с alias на BASE_AUDIO_DIR)
+#   x-sendfile - только заголовок X-Sendfile (Apache mod_xsendfile, lighttpd)
+AUDIO_SERVE_MODES = ('python', 'sendfile', 'x-accel', 'x-sendfile')
+AUDIO_SERVE_MODE = os.environ.get('AUDIO_SERVE_MODE', 'python').strip().lower()
+if AUDIO_SERVE_MODE not in AUDIO_SERVE_MODES:
+    print(f"⚠️ Неизвестный AUDIO_SERVE_MODE '{AUDIO_SERVE_MODE}', используется python")
+    AUDIO_SERVE_MODE = 'python'
+AUDIO_ACCEL_PREFIX = os.environ.get('AUDIO_ACCEL_PREFIX', '/protected-audio').rstrip('/')
+
+# Пакеты аудиофайлов по категориям (utilites/AudioBundleBuilder.py), отображенные в память
+audio_bundles = AudioBundleStore(os.path.join(BASE_OUTPUT_DIR, '.bundles'))
+
+# Фоновая проверка состояния: /api/health отдает последний снимок
+health_monitor = HealthMonitor(
+    BASE_OUTPUT_DIR,
+    manifest=audio_manifest,
+    queue_depth=lambda: len(speech_generator._inflight),
+    interval=float(os.environ.get('HEALTH_CHECK_INTERVAL', '30')),
+    min_free_mb=float(os.environ.get('HEALTH_MIN_FREE_MB', '100')),
+    extra_checks={'audio_cache': audio_cache.stats}
+)
+
+
+def _json(content: dict, status_code: int = 200) -> JSONResponse:
+    return JSONResponse(content, status_code=status_code)
+
+
+def _error(message: str, status_code: int) -> JSONResponse:
+    return _json({
+        "status": "error",
+        "message": message,
+        "timestamp": str(datetime.now())
+    }, status_code)
+
+
+async def _read_json(request: Request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def generate_audio(request: Request) -> JSONResponse:
+    """
+    Обработка запроса на генерацию аудио с поддержкой Edge-TTS
+    """
+    try:
+        print(f"\n[{datetime.now()}] POST /api/generate-audio")
+
+        data = await _read_json(request)
+
+        if not data:
+            return _error("No JSON data provided", 400)
+
+        text = data.get('text', '').strip()
+        language = data.get('language', 'en').strip().lower()
+        gender = data.get('gender', 'male').strip().lower()
+        voice_name = data.get('voice_name', '').strip()
+
+        if not text:
+            return _error("Text field is required", 400)
+
+        if language not in ['en', 'ru']:
+            return _error("Language must be 'en' or 'ru'", 400)
+
+        if gender not in ['male', 'female']:
+            return _error("Gender must be 'male' or 'female'", 400)
+
+        # Проверка существования файла - поиск в индексе
+        check_result = speech_generator.check_audio_exists(text, language, gender=gender)
+
+        if check_result['exists']:
+            return _json({
+                "status": "ok",
+                "message": "Audio file already exists",
+                "data": {
+                    "filename": check_result['filename'],
+                    "gender": gender
+                },
+                "timestamp": str(datetime.now())
+            })
+
+        # Генерация в event loop сервера, без блокировки других запросов
+        generation_result = await speech_generator.generate_audio_async(
+            text, language, gender=gender, voice_name=voice_name if voice_name else None
+        )
+
+        if not generation_result:
+            return _error("Failed to generate audio file", 500)
+
+        if generation_result.get('already_exists'):
+            return _json({
+                "status": "ok",
+                "message": "Audio file already exists (generated during check)",
+                "data": {
+                    "filename": generation_result['filename'],
+                    "gender": gender,
+                    "voice": generation_result.get('voice', 'default')
+                },
+                "timestamp": str(datetime.now())
+            })
+
+        return _json({
+            "status": "success",
+            "message": "Audio file generated successfully",
+            "data": {
+                "filename": generation_result['filename'],
+                "gender": gender,
+                "voice": generation_result.get('voice', 'default'),
+                "file_size_kb": round(generation_result['file_size'] / 1024, 2)
+            },
+            "timestamp": str(datetime.now())
+        }, 201)
+
+    except Exception as e:
+        print(f"Критическая ошибка при обработке запроса: {str(e)}")
+        return _error(f"Internal server error: {str(e)}", 500)
+
+
+async def get_voices(request: Request) -> JSONResponse:
+    """
+    Получение списка доступных голосов Edge-TTS
+    """
+    try:
+        language = request.query_params.get('language', 'en').strip().lower()
+        gender = request.query_params.get('gender', '').strip().lower()
+
+        if language not in ['en', 'ru']:
+            return _error("Language must be 'en' or 'ru'", 400)
+
+        if gender and gender not in ['male', 'female']:
+            return _error("Gender must be 'male', 'female' or empty for all", 400)
+
+        voices = speech_generator.get_available_voices(language, gender if gender else None)
+
+        return _json({
+            "status": "success",
+            "data": {
+                "language": language,
+                "gender": gender if gender else "all",
+                "voices": voices,
+                "count": len(voices)
+            },
+            "timestamp": str(datetime.now())
+        })
+
+    except Exception as e:
+        return _error(f"Error: {str(e)}", 500)
+
+
+async def check_audio(request: Request) -> JSONResponse:
+    """
+    Проверка существования аудиофайла
+    """
+    try:
+        data = await _read_json(request)
+
+        if not data:
+            return _error("No JSON data provided", 400)
+
+        text = data.get('text', '').strip()
+        language = data.get('language', 'en').strip().lower()
+        gender = data.get('gender', 'male').strip().lower()
+
+        if not text:
+            return _error("Text field is required", 400)
+
+        found_file = speech_generator.find_audio_file(text, language, gender=gender)
+
+        if found_file:
+            return _json({
+                "status": "found",
+                "message": "Audio file found",
+                "data": found_file,
+                "gender": gender,
+                "timestamp": str(datetime.now())
+            })
+
+        return _json({
+            "status": "not_found",
+            "message": "Audio file not found",
+            "data": {
+                "text": text,
+                "language": language
+            },
+            "gender": gender,
+            "timestamp": str(datetime.now())
+        })
+
+    except Exception as e:
+        return _error(f"Error: {str(e)}", 500)
+
+
+async def health_check(request: Request) -> JSONResponse:
+    """
+    Проверка работоспособности сервера: последний снимок фоновых проверок
+    """
+    snapshot = health_monitor.snapshot
+
+    if snapshot is None:
+        return _json({
+            "status": "starting",
+            "message": "Health checks have not completed yet",
+            "timestamp": str(datetime.now())
+        }, 503)
+
+    return _json({
+        "status": snapshot['status'],
+        "checks": snapshot['checks'],
+        "age_seconds": round(time.time() - snapshot['checked_at'], 1)
+    }, 200 if snapshot['status'] == 'healthy' else 503)
+
+
+async def health_live(request: Request) -> JSONResponse:
+    """
+    Liveness: процесс отвечает на запросы
+    """
+    return _json({
+        "status": "alive",
+        "timestamp": str(datetime.now())
+    })
+
+
+async def health_ready(request: Request) -> JSONResponse:
+    """
+    Readiness: директория с аудио доступна и есть свободное место
+    """
+    snapshot = health_monitor.snapshot
+    ready = bool(snapshot and snapshot['ready'])
+
+    return _json({
+        "status": "ready" if ready else "not_ready",
+        "timestamp": str(datetime.now())
+    }, 200 if ready else 503)
+
+
+def _audio_headers(record) -> dict:
+    """ETag, Last-Modified и Cache-Control аудиофайла (в индексе только файлы вида {язык}_{md5}.mp3)"""
+    return {
+        'etag': record.etag,
+        'last-modified': formatdate(record.mtime_ns / 1e9, usegmt=True),
+        'cache-control': f'public, max-age={AUDIO_MAX_AGE}, immutable',
+        'accept-ranges': 'bytes'
+    }
+
+
+def _not_modified(request: Request, record, etag: str = None) -> bool:
+    """Условный запрос (If-None-Match, If-Modified-Since) совпал с текущей версией файла"""
+    etag = etag or record.etag
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return '*' in tags or etag in tags
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return record.mtime_ns // 1_000_000_000 <= since
+
+    return False
+
+
+def _byte_range(request: Request, record, etag: str = None, size: int = None):
+    """
+    Диапазон из заголовка Range
+
+    Args:
+        request: Запрос
+        record: Запись индекса или пакет (etag, size)
+        etag: ETag, если отличается от record.etag
+        size: Размер, если отличается от record.size
+
+    Returns:
+        (начало, конец включительно) или None для полного ответа
+
+    Raises:
+        ValueError: если диапазон не может быть удовлетворен (416)
+    """
+    header = request.headers.get('range')
+    if not header:
+        return None
+
+    etag = etag or record.etag
+    size = record.size if size is None else size
+
+    # If-Range с другой версией файла - полный ответ
+    if_range = request.headers.get('if-range')
+    if if_range and if_range.strip() != etag:
+        return None
+
+    unit, _, spec = header.partition('=')
+    # Несколько диапазонов не поддерживаются - полный ответ
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+
+    start, _, end = spec.strip().partition('-')
+    if not start:
+        length = int(end)
+        if length <= 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+async def get_audio(request: Request):
+    """
+    Получение аудиофайла
+    """
+    try:
+        safe_filename = os.path.basename(request.path_params['filename'])
+
+        # Поиск в индексе: без обращения к файловой системе
+        record = audio_manifest.resolve(safe_filename)
+
+        if record:
+            headers = _audio_headers(record)
+            if _not_modified(request, record):
+                return Response(status_code=304, headers=headers)
+
+            # Файл отдает фронтовой сервер по заголовку
+            if AUDIO_SERVE_MODE == 'x-accel':
+                relative_path = Path(record.path).relative_to(audio_manifest.base_dir).as_posix()
+                headers['x-accel-redirect'] = f"{AUDIO_ACCEL_PREFIX}/{quote(relative_path)}"
+                return Response(media_type='audio/mpeg', headers=headers)
+            if AUDIO_SERVE_MODE == 'x-sendfile':
+                headers['x-sendfile'] = record.path
+                return Response(media_type='audio/mpeg', headers=headers)
+
+            # Частые фразы отдаются из памяти, промах читается в пуле потоков
+            if AUDIO_SERVE_MODE == 'python' and audio_cache.enabled and audio_cache.cacheable(record.size):
+                data = audio_cache.get(record.path, record.size, record.mtime_ns)
+                if data is None:
+                    try:
+                        data = await run_in_threadpool(audio_cache.read, record.path, record.size, record.mtime_ns)
+                    except FileNotFoundError:
+                        # Файл удален в обход индекса
+                        await run_in_threadpool(audio_manifest.remove_file, record.path)
+                        audio_cache.discard(record.path)
+                        return _error("Audio file not found", 404)
+
+                try:
+                    byte_range = _byte_range(request, record)
+                except ValueError:
+                    return Response(status_code=416, headers={'content-range': f'bytes */{record.size}'})
+
+                if byte_range is None:
+                    return Response(data, media_type='audio/mpeg', headers=headers)
+
+                start, end = byte_range
+                headers['content-range'] = f'bytes {start}-{end}/{record.size}'
+                return Response(data[start:end + 1], status_code=206, media_type='audio/mpeg', headers=headers)
+
+            # Диапазоны с диска обрабатывает FileResponse
+            return FileResponse(record.path, media_type='audio/mpeg', headers=headers)
+
+        return _error("Audio file not found", 404)
+
+    except Exception as e:
+        return _error(f"Error: {str(e)}", 500)
+
+
+async def stream_audio(request: Request):
+    """
+    Потоковая генерация аудио: фрагменты MP3 отдаются клиенту по мере
+    синтеза и одновременно сохраняются в кэш-файл
+    """
+    try:
+        data = await _read_json(request) if request.method == 'POST' else request.query_params
+
+        if not data:
+            return _error("No parameters provided", 400)
+
+        text = (data.get('text') or '').strip()
+        language = (data.get('language') or 'en').strip().lower()
+        gender = (data.get('gender') or 'male').strip().lower()
+        voice_name = (data.get('voice_name') or '').strip()
+
+        if not text:
+            return _error("Text field is required", 400)
+
+        if language not in ['en', 'ru']:
+            return _error("Language must be 'en' or 'ru'", 400)
+
+        if gender not in ['male', 'female']:
+            return _error("Gender must be 'male' or 'female'", 400)
+
+        stream = await speech_generator.stream_audio_async(
+            text, language, gender=gender, voice_name=voice_name if voice_name else None
+        )
+
+        if stream:
+            filename, chunks = stream
+            # Ждем первый фрагмент: пока заголовки не отправлены, ошибку можно вернуть статусом
+            first_chunk = await anext(chunks, None)
+
+        if not stream or first_chunk is None:
+            return _error("Failed to generate audio", 500)
+
+        async def generate():
+            yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+
+        return StreamingResponse(
+            generate(),
+            media_type='audio/mpeg',
+            headers={'X-Audio-Filename': filename}
+        )
+
+    except Exception as e:
+        return _error(f"Error: {str(e)}", 500)
+
+
+def _memoryview_response(request: Request, view: memoryview, record, headers: dict,
+                         media_type: str, etag: str = None) -> Response:
+    """
+    Ответ из среза отображения пакета: 304, 206 и 416 без чтения файла
+
+    Срез memoryview передается серверу как тело ответа без копирования.
+    """
+    if _not_modified(request, record, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = _byte_range(request, record, etag, len(view))
+    except ValueError:
+        return Response(status_code=416, headers={'content-range': f'bytes */{len(view)}'})
+
+    if byte_range is None:
+        return Response(view, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers['content-range'] = f'bytes {start}-{end}/{len(view)}'
+    return Response(view[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+
+def _bundle_headers(bundle) -> dict:
+    """ETag и Last-Modified пакета; пакет пересобирается, поэтому клиент перепроверяет его"""
+    return {
+        'etag': bundle.etag,
+        'last-modified': formatdate(bundle.mtime_ns / 1e9, usegmt=True),
+        'cache-control': 'public, no-cache',
+        'accept-ranges': 'bytes'
+    }
+
+
+async def _get_bundle(request: Request):
+    """Пакет из хранилища: stat и открытие отображения - в пуле потоков"""
+    params = request.path_params
+    return await run_in_threadpool(audio_bundles.get, params['gender'], params['language'], params['name'])
+
+
+async def list_bundles(request: Request) -> JSONResponse:
+    """
+    Список пакетов аудиофайлов по категориям (utilites/AudioBundleBuilder.py)
+    """
+    return _json({
+        "status": "success",
+        "bundles": await run_in_threadpool(audio_bundles.list),
+        "timestamp": str(datetime.now())
+    })
+
+
+async def get_bundle(request: Request):
+    """
+    Пакет категории целиком; поддерживает Range для загрузки частями
+    """
+    try:
+        bundle = await _get_bundle(request)
+        if bundle is None:
+            return _error("Bundle not found", 404)
+        return _memoryview_response(request, bundle.data(), bundle, _bundle_headers(bundle),
+                                    'application/octet-stream')
+    except ValueError as e:
+        return _error(f"Error: {str(e)}", 500)
+
+
+async def get_bundle_index(request: Request):
+    """
+    Индекс пакета: md5 фразы -> [смещение, длина] в файле пакета
+    """
+    try:
+        bundle = await _get_bundle(request)
+        if bundle is None:
+            return _error("Bundle not found", 404)
+
+        headers = _bundle_headers(bundle)
+        del headers['accept-ranges']
+        if _not_modified(request, bundle):
+            return Response(status_code=304, headers=headers)
+
+        return JSONResponse({
+            "status": "success",
+            "size": bundle.size,
+            "count": bundle.count,
+            "data_offset": bundle.data_offset,
+            "entries": {phrase_md5: [offset, length] for phrase_md5, offset, length in bundle.entries()},
+            "timestamp": str(datetime.now())
+        }, headers=headers)
+    except ValueError as e:
+        return _error(f"Error: {str(e)}", 500)
+
+
+async def get_bundle_audio(request: Request):
+    """
+    Аудиофайл одной фразы из пакета (без отдельного файла на диске)
+    """
+    try:
+        bundle = await _get_bundle(request)
+        phrase_md5 = request.path_params['phrase_md5']
+        view = bundle.view(phrase_md5) if bundle is not None else None
+        if view is None:
+            return _error("Audio file not found", 404)
+
+        # URL фразы не меняется при пересборке пакета: клиент перепроверяет по ETag версии пакета
+        etag = bundle.entry_etag(phrase_md5)
+        headers = dict(_bundle_headers(bundle), etag=etag)
+        return _memoryview_response(request, view, bundle, headers, 'audio/mpeg', etag)
+    except ValueError as e:
+        return _error(f"Error: {str(e)}", 500)
+
+
+async def audio_cache_stats(request: Request) -> JSONResponse:
+    """
+    Счетчики кэша аудиофайлов в памяти
+    """
+    return _json({
+        "status": "success",
+        "cache": audio_cache.stats(),
+        "timestamp": str(datetime.now())
+    })
+
+
+async def test_endpoint(request: Request) -> JSONResponse:
+    """
+    Тестовый эндпоинт для проверки подключения
+    """
+    return _json({
+        "status": "success",
+        "message": "Server is working!",
+        "timestamp": str(datetime.now()),
+        "endpoints": {
+            "generate_audio": "POST /api/generate-audio",
+            "check_audio": "POST /api/check-audio",
+            "get_voices": "GET /api/get-voices",
+            "health": "GET /api/health",
+            "health_live": "GET /api/health/live",
+            "health_ready": "GET /api/health/ready",
+            "get_audio": "GET /api/get-audio/<filename>",
+            "audio_cache": "GET /api/audio-cache",
+            "bundles": "GET /api/bundles",
+            "bundle": "GET /api/bundles/<gender>/<language>/<name>",
+            "bundle_index": "GET /api/bundles/<gender>/<language>/<name>/index",
+            "bundle_audio": "GET /api/bundles/<gender>/<language>/<name>/<md5>.mp3",
+            "stream_audio": "GET|POST /api/stream-audio"
+        }
+    })
+
+
+async def server_info(request: Request) -> JSONResponse:
+    """
+    Информация о сервере
+    """
+    return _json({
+        "status": "success",
+        "server": "Audio Generator API",
+        "version": "1.0.0",
+        "engine": "Edge-TTS",
+        "mode": "asgi",
+        "base_directory": BASE_OUTPUT_DIR,
+        "audio_serve_mode": AUDIO_SERVE_MODE,
+        "timestamp": str(datetime.now())
+    })
+
+
+routes = [
+    Route('/api/generate-audio', generate_audio, methods=['POST']),
+    Route('/api/get-voices', get_voices, methods=['GET']),
+    Route('/api/check-audio', check_audio, methods=['POST']),
+    Route('/api/health', health_check, methods=['GET']),
+    Route('/api/health/live', health_live, methods=['GET']),
+    Route('/api/health/ready', health_ready, methods=['GET']),
+    Route('/api/get-audio/{filename:path}', get_audio, methods=['GET']),
+    Route('/api/audio-cache', audio_cache_stats, methods=['GET']),
+    Route('/api/bundles', list_bundles, methods=['GET']),
+    Route('/api/bundles/{gender}/{language}/{name}', get_bundle, methods=['GET']),
+    Route('/api/bundles/{gender}/{language}/{name}/index', get_bundle_index, methods=['GET']),
+    Route('/api/bundles/{gender}/{language}/{name}/{phrase_md5}.mp3', get_bundle_audio, methods=['GET']),
+    Route('/api/stream-audio', stream_audio, methods=['GET', 'POST']),
+    Route('/api/test', test_endpoint, methods=['GET']),
+    Route('/api/info', server_info, methods=['GET']),
+]
+
+middleware = [
+    Middleware(
+        CORSMiddleware,
+        allow_origins=['*'],
+        allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS', 'PATCH'],
+        allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'Accept', 'Origin'],
+        max_age=86400
+    )
+]
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    health_monitor.start()
+    if AUDIO_MANIFEST_WATCH:
+        audio_manifest.start_watching(float(os.environ.get('AUDIO_MANIFEST_REFRESH_INTERVAL', '60')))
+    yield
+    health_monitor.stop()
+    audio_manifest.stop_watching()
+    audio_bundles.close()
+    speech_generator.cleanup()
+
+
+app = Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+
+class AsyncLoopRunner:
+    """Постоянный event loop в фоновом потоке для синхронного кода"""
+
+    def __init__(self, name: str = 'async-loop-runner'):
+        """
+        Инициализация раннера
+
+        Args:
+            name: Имя фонового потока
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop фонового потока (запускается при первом обращении)"""
+        if self._loop is None or self._loop.is_closed():
+            with self._lock:
+                if self._loop is None or self._loop.is_closed():
+                    self._start()
+        return self._loop
+
+    def _start(self):
+        """Создание loop и запуск потока с run_forever"""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        started.wait()
+        self._loop = loop
+
+    def submit(self, coro: Coroutine) -> Future:
+        """
+        Отправка корутины в фоновый loop без ожидания результата
+
+        Args:
+            coro: Корутина для выполнения
+
+        Returns:
+            concurrent.futures.Future с результатом корутины
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Выполнение корутины в фоновом loop с ожиданием результата
+
+        Args:
+            coro: Корутина для выполнения
+            timeout: Максимальное время ожидания в секундах
+
+        Returns:
+            Результат корутины
+        """
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        """Остановка фонового loop и потока"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None or loop.is_closed():
+            return
+
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
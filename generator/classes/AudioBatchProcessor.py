@@ -1,7 +1,32 @@
 import json
-import hashlib
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from .PhraseKey import clean_phrase, normalize_phrase, phrase_keys
+
+# Папки гендеров в структуре BASE_AUDIO_DIR/gender/language (EdgeTTSGenerator)
+GENDERS = ('male', 'female')
+
+# Битрейты MPEG (кбит/с): [версия 1 / версия 2 и 2.5][слой 1..3]
+MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# Частоты дискретизации по полю версии заголовка: 3 - MPEG1, 2 - MPEG2, 0 - MPEG2.5
+MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
 
 class AudioBatchProcessor:
     """Класс для пакетной обработки аудиофайлов"""
@@ -16,33 +41,136 @@ class AudioBatchProcessor:
         self.BASE_AUDIO_DIR = base_audio_dir
     
     @staticmethod
-    def _generate_filename(phrase: str, language: str = 'en') -> str:
+    def check_mp3_frames(filepath: str) -> Tuple[bool, str]:
         """
-        Генерация имени файла на основе фразы
+        Проверка MP3 по заголовкам фреймов
+        
+        Проходит по цепочке фреймов от начала (после тега ID3v2) до конца
+        файла. Обрезанный файл обнаруживается по последнему фрейму,
+        выходящему за конец файла.
         
         Args:
-            phrase: Текст фразы
-            language: Язык ('en' или 'ru')
+            filepath: Путь к файлу
         
         Returns:
-            str: Имя файла
+            Кортеж (файл корректен, описание проблемы)
+        """
+        try:
+            with open(filepath, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            return False, f"read error: {e}"
+        
+        size = len(data)
+        pos = 0
+        
+        # Тег ID3v2: 10 байт заголовка, размер - syncsafe integer
+        if data[:3] == b'ID3' and size >= 10:
+            tag_size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+            pos = 10 + tag_size + (10 if data[5] & 0x10 else 0)
+        
+        frames = 0
+        while pos + 4 <= size:
+            b1, b2 = data[pos + 1], data[pos + 2]
+            
+            if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+                # Тег ID3v1 в конце файла
+                if data[pos:pos + 3] == b'TAG' and size - pos == 128:
+                    pos = size
+                    break
+                return False, f"invalid frame header at offset {pos}"
+            
+            version_bits = (b1 >> 3) & 0x03
+            layer = 4 - ((b1 >> 1) & 0x03)
+            bitrate_index = b2 >> 4
+            sample_rate_index = (b2 >> 2) & 0x03
+            padding = (b2 >> 1) & 0x01
+            
+            if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+                return False, f"invalid frame header at offset {pos}"
+            
+            version = 1 if version_bits == 3 else 2
+            bitrate = MP3_BITRATES[(version, layer)][bitrate_index] * 1000
+            sample_rate = MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+            
+            if layer == 1:
+                frame_length = (12 * bitrate // sample_rate + padding) * 4
+            elif layer == 3 and version == 2:
+                frame_length = 72 * bitrate // sample_rate + padding
+            else:
+                frame_length = 144 * bitrate // sample_rate + padding
+            
+            pos += frame_length
+            frames += 1
+        
+        if frames == 0:
+            return False, "no MPEG frames"
+        if pos != size:
+            return False, f"truncated: {pos - size} bytes missing in last frame" if pos > size else "truncated frame header"
+        return True, ""
+    
+    def _list_directory(self, directory: Path) -> Dict[str, os.DirEntry]:
+        """Один проход os.scandir: имя файла -> запись каталога"""
+        try:
+            with os.scandir(directory) as entries:
+                return {entry.name: entry for entry in entries if entry.name.endswith('.mp3')}
+        except OSError:
+            return {}
+    
+    def _audio_locations(self, languages: List[str]) -> List[Tuple[Optional[str], str, Path]]:
+        """
+        Проверяемые директории: (гендер или None для legacy, язык, путь)
+        
+        Проверяются существующие папки гендеров и старые папки языков в корне.
+        Если нет ни тех, ни других - ожидается структура gender/language.
         """
-        # Нормализуем фразу
-        normalized_phrase = ' '.join(phrase.strip().split()).lower()
+        base_dir = Path(self.BASE_AUDIO_DIR)
+        genders = [gender for gender in GENDERS if (base_dir / gender).is_dir()]
+        legacy = [language for language in languages if (base_dir / language).is_dir()]
         
-        phrase_hash = hashlib.md5(normalized_phrase.encode('utf-8')).hexdigest()
-        return f"{language}_{phrase_hash}.mp3"
+        if not genders and not legacy:
+            genders = list(GENDERS)
+        
+        locations = [(gender, language, base_dir / gender / language) for gender in genders for language in languages]
+        locations += [(None, language, base_dir / language) for language in legacy]
+        return locations
+    
+    def _load_verification_cache(self, cache_file: Path) -> Dict:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
     
-    def verify_audio_files(self, json_file_path: str) -> Dict:
+    def _save_verification_cache(self, cache_file: Path, cache: Dict):
+        temp_file = cache_file.with_name(f"{cache_file.name}.{uuid.uuid4().hex}.part")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️ Не удалось сохранить кэш проверки: {e}")
+    
+    def verify_audio_files(self, json_file_path: str, workers: int = 8, use_cache: bool = True) -> Dict:
         """
         Проверка соответствия JSON и сгенерированных файлов
         
+        Каждая директория gender/language (и старая language) читается
+        один раз через scandir. Найденные файлы проверяются по заголовкам
+        MP3-фреймов параллельно; результат кэшируется по размеру и mtime
+        в .verification_cache.json, повторная проверка читает только
+        измененные файлы.
+        
         Args:
             json_file_path: Путь к JSON файлу с фразами
+            workers: Количество потоков проверки фреймов
+            use_cache: Использовать кэш результатов проверки
         
         Returns:
             dict: Статистика проверки
         """
+        start_time = time.perf_counter()
+        
         with open(json_file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
@@ -50,15 +178,39 @@ class AudioBatchProcessor:
         print("ПРОВЕРКА СООТВЕТСТВИЯ АУДИОФАЙЛОВ")
         print("="*60)
         
+        language_by_type = {'target': 'en', 'native': 'ru'}
+        locations = self._audio_locations(list(language_by_type.values()))
+        listings = {str(path): self._list_directory(path) for _, _, path in locations}
+        
         stats = {
             'total_phrases': 0,
             'expected_files': 0,
             'found_files': 0,
+            'valid_files': 0,
             'missing_files': [],
+            'corrupt_files': [],
             'categories': {},
-            'languages': {'en': {'found': 0, 'missing': 0}, 'ru': {'found': 0, 'missing': 0}}
+            'languages': {'en': {'found': 0, 'missing': 0}, 'ru': {'found': 0, 'missing': 0}},
+            'locations': [str(path) for _, _, path in locations]
         }
         
+        # Имена файлов всего корпуса одним проходом: скобки удаляются так же,
+        # как при генерации, одинаковые фразы хэшируются один раз
+        corpus = {language: [] for language in language_by_type.values()}
+        for phrases_list in data.values():
+            for phrase_pair in phrases_list:
+                for phrase_type, language in language_by_type.items():
+                    phrase = phrase_pair.get(phrase_type, '').strip()
+                    if phrase:
+                        corpus[language].append(clean_phrase(phrase))
+        filenames = {
+            language: {text: f"{key}.mp3" for text, key in zip(texts, phrase_keys(texts, language))}
+            for language, texts in corpus.items()
+        }
+        
+        # Найденные файлы для проверки фреймов: путь -> (запись каталога, сведения о фразе)
+        found = {}
+        
         for category, phrases_list in data.items():
             category_stats = {
                 'expected': 0,
@@ -66,82 +218,120 @@ class AudioBatchProcessor:
                 'missing': []
             }
             
-            # Папки с языками теперь находятся в корне, а не в подпапках категорий
-            en_dir = Path(self.BASE_AUDIO_DIR) / 'en'
-            ru_dir = Path(self.BASE_AUDIO_DIR) / 'ru'
-            
             for phrase_pair in phrases_list:
                 stats['total_phrases'] += 1
                 
-                # Проверка английской фразы
-                if 'target' in phrase_pair and phrase_pair['target'].strip():
-                    stats['expected_files'] += 1
-                    category_stats['expected'] += 1
-                    
-                    phrase = phrase_pair['target'].strip()
-                    normalized_phrase = ' '.join(phrase.split()).lower()
-                    filename = self._generate_filename(normalized_phrase, 'en')
-                    filepath = en_dir / filename
-                    
-                    if filepath.exists():
-                        stats['found_files'] += 1
-                        category_stats['found'] += 1
-                        stats['languages']['en']['found'] += 1
-                    else:
-                        category_stats['missing'].append(f"EN: {phrase}")
-                        stats['missing_files'].append({
-                            'category': category,
-                            'type': 'target',
-                            'phrase': phrase,
-                            'normalized_phrase': normalized_phrase,
-                            'filename': filename,
-                            'expected_path': str(filepath)
-                        })
-                        stats['languages']['en']['missing'] += 1
-                
-                # Проверка русской фразы
-                if 'native' in phrase_pair and phrase_pair['native'].strip():
-                    stats['expected_files'] += 1
-                    category_stats['expected'] += 1
+                for phrase_type, language in language_by_type.items():
+                    if not phrase_pair.get(phrase_type, '').strip():
+                        continue
                     
-                    phrase = phrase_pair['native'].strip()
-                    normalized_phrase = ' '.join(phrase.split()).lower()
-                    filename = self._generate_filename(normalized_phrase, 'ru')
-                    filepath = ru_dir / filename
+                    phrase = phrase_pair[phrase_type].strip()
+                    clean_text = clean_phrase(phrase)
+                    normalized_phrase = normalize_phrase(clean_text)
+                    filename = filenames[language][clean_text]
                     
-                    if filepath.exists():
-                        stats['found_files'] += 1
-                        category_stats['found'] += 1
-                        stats['languages']['ru']['found'] += 1
-                    else:
-                        category_stats['missing'].append(f"RU: {phrase}")
-                        stats['missing_files'].append({
-                            'category': category,
-                            'type': 'native',
-                            'phrase': phrase,
-                            'normalized_phrase': normalized_phrase,
-                            'filename': filename,
-                            'expected_path': str(filepath)
-                        })
-                        stats['languages']['ru']['missing'] += 1
+                    for gender, location_language, directory in locations:
+                        if location_language != language:
+                            continue
+                        
+                        stats['expected_files'] += 1
+                        category_stats['expected'] += 1
+                        filepath = directory / filename
+                        entry = listings[str(directory)].get(filename)
+                        
+                        if entry is not None:
+                            stats['found_files'] += 1
+                            category_stats['found'] += 1
+                            stats['languages'][language]['found'] += 1
+                            found[str(filepath)] = (entry, {
+                                'category': category,
+                                'type': phrase_type,
+                                'gender': gender,
+                                'phrase': phrase,
+                                'normalized_phrase': normalized_phrase,
+                                'filename': filename,
+                                'path': str(filepath)
+                            })
+                        else:
+                            label = language.upper() if gender is None else f"{language.upper()}/{gender}"
+                            category_stats['missing'].append(f"{label}: {phrase}")
+                            stats['missing_files'].append({
+                                'category': category,
+                                'type': phrase_type,
+                                'gender': gender,
+                                'phrase': phrase,
+                                'normalized_phrase': normalized_phrase,
+                                'filename': filename,
+                                'expected_path': str(filepath)
+                            })
+                            stats['languages'][language]['missing'] += 1
             
             stats['categories'][category] = category_stats
         
+        # Проверка фреймов: только новые и измененные файлы
+        cache_file = Path(self.BASE_AUDIO_DIR) / '.verification_cache.json'
+        cache = self._load_verification_cache(cache_file) if use_cache else {}
+        new_cache = {}
+        to_check = []
+        
+        for path, (entry, info) in found.items():
+            try:
+                stat = entry.stat()
+            except OSError:
+                to_check.append((path, None))
+                continue
+            
+            cached = cache.get(path)
+            if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                new_cache[path] = cached
+            else:
+                to_check.append((path, stat))
+        
+        def check(item):
+            path, stat = item
+            return path, stat, self.check_mp3_frames(path)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for path, stat, (ok, reason) in executor.map(check, to_check):
+                if stat is not None:
+                    new_cache[path] = [stat.st_size, stat.st_mtime_ns, ok, reason]
+                else:
+                    new_cache[path] = [None, None, ok, reason]
+        
+        for path, (entry, info) in found.items():
+            _, _, ok, reason = new_cache[path]
+            if ok:
+                stats['valid_files'] += 1
+            else:
+                stats['corrupt_files'].append(dict(info, reason=reason))
+        
+        if use_cache:
+            self._save_verification_cache(cache_file, new_cache)
+        
+        elapsed = time.perf_counter() - start_time
+        stats['checked_files'] = len(to_check)
+        stats['cached_files'] = len(found) - len(to_check)
+        stats['elapsed'] = round(elapsed, 3)
+        stats['files_per_second'] = round(stats['expected_files'] / elapsed, 1) if elapsed > 0 else 0
+        
         # Вывод результатов
         print(f"\nОбщая статистика:")
         print(f"  Всего фраз: {stats['total_phrases']}")
+        print(f"  Проверено директорий: {len(locations)}")
         print(f"  Ожидается файлов: {stats['expected_files']}")
         print(f"  Найдено файлов: {stats['found_files']}")
         print(f"  Отсутствует файлов: {len(stats['missing_files'])}")
+        print(f"  Поврежденных файлов: {len(stats['corrupt_files'])}")
+        print(f"  Проверено фреймов: {stats['checked_files']} файлов (из кэша: {stats['cached_files']})")
         
         print(f"\nСтатистика по языкам:")
         for lang in ['en', 'ru']:
-            found = stats['languages'][lang]['found']
+            found_count = stats['languages'][lang]['found']
             missing = stats['languages'][lang]['missing']
-            total = found + missing
+            total = found_count + missing
             if total > 0:
-                percentage = (found / total) * 100
-                print(f"  {lang.upper()}: {found}/{total} ({percentage:.1f}%)")
+                percentage = (found_count / total) * 100
+                print(f"  {lang.upper()}: {found_count}/{total} ({percentage:.1f}%)")
         
         if stats['missing_files']:
             print(f"\nОтсутствующие файлы:")
@@ -152,6 +342,15 @@ class AudioBatchProcessor:
             if len(stats['missing_files']) > 10:
                 print(f"  ... и еще {len(stats['missing_files']) - 10} файлов")
         
+        if stats['corrupt_files']:
+            print(f"\nПоврежденные файлы:")
+            for corrupt in stats['corrupt_files'][:10]:
+                print(f"  • {corrupt['path']}: {corrupt['reason']}")
+            if len(stats['corrupt_files']) > 10:
+                print(f"  ... и еще {len(stats['corrupt_files']) - 10} файлов")
+        
+        print(f"\nВремя: {elapsed:.2f} с ({stats['files_per_second']:.0f} файлов/с)")
+        
         # Сохраняем отчет
         report_file = Path(self.BASE_AUDIO_DIR) / "verification_report.json"
         with open(report_file, 'w', encoding='utf-8') as f:
@@ -159,4 +358,4 @@ class AudioBatchProcessor:
         
         print(f"\n✓ Отчет проверки сохранен: {report_file}")
         
-        return stats
\ No newline at end of file
+        return stats
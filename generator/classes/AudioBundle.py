@@ -0,0 +1,315 @@
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Формат пакета (little-endian):
+#   заголовок: magic 'EFAB', версия u16, резерв u16, количество записей u32
+#   индекс:    записи md5 (16 байт), смещение u64, длина u32, отсортированы по md5
+#   данные:    содержимое MP3 подряд; смещения отсчитываются от начала файла
+BUNDLE_MAGIC = b'EFAB'
+BUNDLE_VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+ENTRY = struct.Struct('<16sQI')
+
+# Расширение файлов пакетов и индекс пакетов в директории пакетов
+BUNDLE_SUFFIX = '.bundle'
+BUNDLES_INDEX = 'bundles.json'
+
+# Имя пакета: буквы, цифры и подчеркивания
+BUNDLE_NAME_RE = re.compile(r'^\w+$')
+
+
+def bundle_name(category: str) -> str:
+    """Имя файла пакета для категории фраз (без расширения)"""
+    return re.sub(r'\W+', '_', category).strip('_').lower() or 'category'
+
+
+class AudioBundle:
+    """
+    Пакет аудиофайлов категории: один файл с бинарным индексом md5 -> (смещение, длина)
+
+    Файл отображается в память только для чтения; поиск - двоичный
+    по индексу внутри отображения, без разбора индекса при открытии.
+    view() отдает memoryview на данные фразы в отображении: страницы
+    берутся из page cache и общие для всех воркеров, копий в памяти
+    процесса нет.
+    """
+
+    def __init__(self, path: str):
+        """
+        Открытие пакета
+
+        Args:
+            path: Путь к файлу пакета
+
+        Raises:
+            ValueError: если файл не является пакетом поддерживаемой версии
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.size = stat.st_size
+            self.mtime_ns = stat.st_mtime_ns
+            if self.size < HEADER.size:
+                raise ValueError(f"Файл слишком мал для пакета: {path}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Неизвестный формат пакета: {path}")
+
+        self.count = count
+        self.data_offset = HEADER.size + count * ENTRY.size
+        if self.data_offset > self.size:
+            self._mmap.close()
+            raise ValueError(f"Индекс пакета выходит за конец файла: {path}")
+
+        self._view = memoryview(self._mmap)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, phrase_hash: str) -> bool:
+        return self.find(phrase_hash) is not None
+
+    def __enter__(self) -> 'AudioBundle':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Закрытие отображения
+
+        Если срезы view() еще передаются клиентам, отображение закроется
+        сборщиком мусора после освобождения последнего среза.
+        """
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    @property
+    def etag(self) -> str:
+        """ETag версии пакета (меняется при пересборке)"""
+        return f'"{Path(self.path).stem}-{self.size:x}-{self.mtime_ns:x}"'
+
+    def find(self, phrase_hash: str) -> Optional[Tuple[int, int]]:
+        """
+        Поиск фразы в индексе
+
+        Args:
+            phrase_hash: MD5 нормализованной фразы (hex)
+
+        Returns:
+            Кортеж (смещение, длина) или None
+        """
+        try:
+            key = bytes.fromhex(phrase_hash)
+        except ValueError:
+            return None
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            position = HEADER.size + middle * ENTRY.size
+            current = self._mmap[position:position + 16]
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                _, offset, length = ENTRY.unpack_from(self._mmap, position)
+                return self._check_entry(phrase_hash, offset, length)
+        return None
+
+    def _check_entry(self, phrase_hash: str, offset: int, length: int) -> Tuple[int, int]:
+        """
+        Проверка записи индекса по границам файла
+
+        Raises:
+            ValueError: если данные выходят за пределы области данных (пакет обрезан или поврежден)
+        """
+        if offset < self.data_offset or offset + length > self.size:
+            raise ValueError(f"Запись {phrase_hash} выходит за пределы пакета: {self.path}")
+        return offset, length
+
+    def entry_etag(self, phrase_hash: str) -> Optional[str]:
+        """
+        ETag аудиофайла фразы: версия пакета (размер, время изменения) и запись
+
+        Хэш фразы и длина не определяют содержимое: после пересинтеза
+        пакет может содержать другой звук той же длины.
+        """
+        found = self.find(phrase_hash)
+        if found is None:
+            return None
+        offset, length = found
+        return f'"{phrase_hash}-{self.size:x}-{self.mtime_ns:x}-{offset:x}"'
+
+    def view(self, phrase_hash: str) -> Optional[memoryview]:
+        """
+        Данные аудиофайла фразы без копирования
+
+        Args:
+            phrase_hash: MD5 нормализованной фразы (hex)
+
+        Returns:
+            memoryview на отображение пакета или None
+        """
+        found = self.find(phrase_hash)
+        if found is None:
+            return None
+        offset, length = found
+        return self._view[offset:offset + length]
+
+    def read(self, phrase_hash: str) -> Optional[bytes]:
+        """Содержимое аудиофайла фразы (копия) или None"""
+        view = self.view(phrase_hash)
+        return view.tobytes() if view is not None else None
+
+    def data(self) -> memoryview:
+        """Весь файл пакета без копирования"""
+        return self._view
+
+    def entries(self) -> Iterator[Tuple[str, int, int]]:
+        """Записи индекса: (md5, смещение, длина) в порядке md5"""
+        for index in range(self.count):
+            key, offset, length = ENTRY.unpack_from(self._mmap, HEADER.size + index * ENTRY.size)
+            self._check_entry(key.hex(), offset, length)
+            yield key.hex(), offset, length
+
+    @staticmethod
+    def build(output_path: str, files: Iterable[Tuple[str, str]]) -> Dict:
+        """
+        Сборка пакета из аудиофайлов (атомарная запись через временный файл)
+
+        Args:
+            output_path: Путь к файлу пакета
+            files: Пары (md5 фразы, путь к MP3); повторы md5 пропускаются
+
+        Returns:
+            Словарь со статистикой: count, size, missing
+        """
+        unique: Dict[bytes, str] = {}
+        for phrase_hash, path in files:
+            unique.setdefault(bytes.fromhex(phrase_hash), path)
+
+        entries: List[Tuple[bytes, str, int]] = []
+        missing = 0
+        for key in sorted(unique):
+            try:
+                entries.append((key, unique[key], os.path.getsize(unique[key])))
+            except OSError:
+                missing += 1
+
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = output.with_name(f"{output.name}.{uuid.uuid4().hex}.part")
+
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 0, len(entries)))
+
+                offset = HEADER.size + len(entries) * ENTRY.size
+                for key, _, length in entries:
+                    f.write(ENTRY.pack(key, offset, length))
+                    offset += length
+
+                for key, path, length in entries:
+                    with open(path, 'rb') as source:
+                        data = source.read()
+                    if len(data) != length:
+                        raise OSError(f"Файл изменился во время сборки: {path}")
+                    f.write(data)
+            os.replace(temp_file, output)
+        except BaseException:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
+
+        return {'count': len(entries), 'size': output.stat().st_size, 'missing': missing}
+
+
+class AudioBundleStore:
+    """
+    Открытые пакеты из директории пакетов
+
+    Структура: bundles_dir/{gender}/{language}/{имя}.bundle и индекс
+    bundles_dir/bundles.json, который пишет утилита сборки. Пакет
+    открывается (отображается в память) при первом обращении; пересобранный
+    файл открывается заново.
+    """
+
+    def __init__(self, bundles_dir: str):
+        """
+        Инициализация хранилища
+
+        Args:
+            bundles_dir: Директория пакетов
+        """
+        self.bundles_dir = bundles_dir
+        self._bundles: Dict[Tuple[str, str, str], AudioBundle] = {}
+        self._lock = threading.Lock()
+
+    def path(self, gender: str, language: str, name: str) -> Optional[str]:
+        """Путь к файлу пакета или None для недопустимого имени"""
+        for part in (gender, language, name):
+            if not BUNDLE_NAME_RE.match(part):
+                return None
+        return os.path.join(self.bundles_dir, gender, language, f"{name}{BUNDLE_SUFFIX}")
+
+    def get(self, gender: str, language: str, name: str) -> Optional[AudioBundle]:
+        """
+        Открытый пакет или None, если его нет
+
+        Raises:
+            ValueError: если файл поврежден
+        """
+        path = self.path(gender, language, name)
+        if path is None:
+            return None
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        key = (gender, language, name)
+        bundle = self._bundles.get(key)
+        if bundle is not None and bundle.size == stat.st_size and bundle.mtime_ns == stat.st_mtime_ns:
+            return bundle
+
+        with self._lock:
+            bundle = self._bundles.get(key)
+            if bundle is None or bundle.size != stat.st_size or bundle.mtime_ns != stat.st_mtime_ns:
+                # Старое отображение не закрывается: его может читать другой поток
+                bundle = AudioBundle(path)
+                self._bundles[key] = bundle
+        return bundle
+
+    def list(self) -> List[Dict]:
+        """Список пакетов из bundles.json (пустой, если пакеты не собраны)"""
+        try:
+            with open(os.path.join(self.bundles_dir, BUNDLES_INDEX), 'r', encoding='utf-8') as f:
+                return json.load(f).get('bundles', [])
+        except (OSError, ValueError):
+            return []
+
+    def close(self):
+        """Закрытие всех открытых пакетов"""
+        with self._lock:
+            for bundle in self._bundles.values():
+                bundle.close()
+            self._bundles.clear()
@@ -0,0 +1,164 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Бюджет кэша по умолчанию, МБ (AUDIO_CACHE_MB, 0 - кэш выключен)
+DEFAULT_CACHE_MB = 64
+
+# Максимальный размер одного файла в кэше по умолчанию, КБ (AUDIO_CACHE_ENTRY_KB)
+DEFAULT_ENTRY_KB = 512
+
+
+class AudioByteCache:
+    """
+    LRU-кэш содержимого аудиофайлов с ограничением по объему
+
+    Ключ - (путь, размер, mtime_ns) из записи индекса AudioManifest:
+    перезаписанный файл получает новый ключ, а старая запись вытесняется
+    по LRU. Попадание отдает байты без обращения к диску. Все операции
+    защищены одной блокировкой, кэш общий для потоков воркера.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        """
+        Инициализация кэша
+
+        Args:
+            max_bytes: Бюджет кэша в байтах (0 - кэш выключен)
+            max_entry_bytes: Максимальный размер одного файла в байтах
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+
+        self._entries: 'OrderedDict[Tuple[str, int, int], bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> 'AudioByteCache':
+        """Создание кэша из AUDIO_CACHE_MB и AUDIO_CACHE_ENTRY_KB"""
+        max_mb = float(os.environ.get('AUDIO_CACHE_MB', DEFAULT_CACHE_MB))
+        entry_kb = float(os.environ.get('AUDIO_CACHE_ENTRY_KB', DEFAULT_ENTRY_KB))
+        return cls(int(max_mb * 1024 * 1024), int(entry_kb * 1024))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def cacheable(self, size: int) -> bool:
+        """Файл такого размера помещается в кэш"""
+        return 0 < size <= self.max_entry_bytes
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[bytes]:
+        """
+        Содержимое файла из кэша
+
+        Returns:
+            bytes или None при промахе
+        """
+        key = (path, size, mtime_ns)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, path: str, size: int, mtime_ns: int, data: bytes):
+        """Добавление содержимого файла с вытеснением давно не используемых"""
+        if not self.cacheable(len(data)):
+            return
+
+        key = (path, size, mtime_ns)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = data
+            self._size += len(data)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def load(self, path: str, size: int, mtime_ns: int) -> Optional[bytes]:
+        """
+        Содержимое файла: из кэша или с диска с добавлением в кэш
+
+        Args:
+            path: Путь к файлу
+            size: Размер из индекса
+            mtime_ns: Время изменения из индекса
+
+        Returns:
+            bytes или None, если файл не помещается в кэш
+
+        Raises:
+            FileNotFoundError: если файл удален
+        """
+        if not self.enabled or not self.cacheable(size):
+            return None
+
+        data = self.get(path, size, mtime_ns)
+        if data is None:
+            data = self.read(path, size, mtime_ns)
+        return data
+
+    def read(self, path: str, size: int, mtime_ns: int) -> bytes:
+        """
+        Чтение файла с диска с добавлением в кэш (после промаха get)
+
+        Raises:
+            FileNotFoundError: если файл удален
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        # Файл изменился после индексации - отдаем, но не кэшируем
+        if len(data) == size:
+            self.put(path, size, mtime_ns, data)
+        return data
+
+    def discard(self, path: str):
+        """Удаление всех версий файла из кэша"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                self._size -= len(self._entries.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict:
+        """
+        Счетчики кэша
+
+        Returns:
+            Словарь с попаданиями, промахами, вытеснениями и заполнением
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'max_entry_bytes': self.max_entry_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / requests, 4) if requests else None
+            }
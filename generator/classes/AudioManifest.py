@@ -0,0 +1,383 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Имя аудиофайла: {язык}_{md5 нормализованной фразы}.mp3
+AUDIO_FILENAME_RE = re.compile(r'^([a-z]{2,3})_([0-9a-f]{32})\.mp3$')
+
+# Папки гендеров в структуре BASE_OUTPUT_DIR/gender/language
+GENDERS = ('male', 'female')
+
+
+class AudioRecord(NamedTuple):
+    """Запись индекса об аудиофайле"""
+    path: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def etag(self) -> str:
+        """Строгий ETag: имя файла, размер и время изменения (меняется при перезаписи)"""
+        return f'"{os.path.basename(self.path)[:-4]}-{self.size:x}-{self.mtime_ns:x}"'
+
+
+class AudioManifest:
+    """
+    In-memory индекс аудиофайлов
+
+    Хранит две таблицы:
+      - (gender, language, md5) -> запись, для проверки существования фраз;
+      - имя файла -> запись, для отдачи файла по имени (/api/get-audio).
+    """
+
+    def __init__(self, base_dir: str):
+        """
+        Инициализация индекса
+
+        Args:
+            base_dir: Базовая директория с аудиофайлами
+        """
+        self.base_dir = str(Path(base_dir).resolve())
+        self._records: Dict[Tuple[Optional[str], str, str], AudioRecord] = {}
+        self._by_name: Dict[str, Dict[int, AudioRecord]] = {}
+        self._lock = threading.Lock()
+        # Ключи, измененные add_file/remove_file во время refresh()
+        self._touched: Optional[set] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_pid: Optional[int] = None
+        self._stop_event = threading.Event()
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @staticmethod
+    def parse_filename(filename: str) -> Optional[Tuple[str, str]]:
+        """
+        Разбор имени аудиофайла
+
+        Returns:
+            Кортеж (язык, md5) или None если имя не соответствует формату
+        """
+        match = AUDIO_FILENAME_RE.match(filename)
+        if not match:
+            return None
+        return match.group(1), match.group(2)
+
+    def _classify(self, path: str) -> Optional[Tuple[Optional[Tuple[Optional[str], str, str]], str, int]]:
+        """
+        Ключ индекса и приоритет файла по его расположению
+
+        Ключ (gender, language, md5) есть только у файлов в структурах
+        gender/language/file и language/file. Приоритет повторяет прежний
+        порядок поиска /api/get-audio: gender/language, language,
+        категории, корень.
+
+        Returns:
+            Кортеж (ключ или None, имя файла, приоритет) или None
+        """
+        parts = Path(os.path.relpath(path, self.base_dir)).parts
+        if not parts or parts[0] == os.pardir or len(parts) > 3:
+            return None
+
+        filename = parts[-1]
+        parsed = self.parse_filename(filename)
+        if not parsed:
+            return None
+
+        language, phrase_hash = parsed
+
+        if len(parts) == 3:
+            if parts[0] not in GENDERS:
+                return None
+            rank = GENDERS.index(parts[0]) * 2 + (0 if parts[1] == language else 1)
+            key = (parts[0], language, phrase_hash) if parts[1] == language else None
+            return key, filename, rank
+
+        if len(parts) == 2:
+            if parts[0] == language:
+                return (None, language, phrase_hash), filename, 4
+            return None, filename, 5
+
+        return None, filename, 6
+
+    def _scan(self) -> Tuple[Dict, Dict]:
+        """Один проход os.scandir по base_dir (до двух уровней вложенности)"""
+        records = {}
+        by_name = {}
+
+        def scan_files(directory: str):
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith('.mp3') or not entry.is_file():
+                            continue
+                        classified = self._classify(entry.path)
+                        if classified is None:
+                            continue
+                        stat = entry.stat()
+                        if stat.st_size <= 0:
+                            continue
+                        key, filename, rank = classified
+                        record = AudioRecord(entry.path, stat.st_size, stat.st_mtime_ns)
+                        if key is not None:
+                            records[key] = record
+                        by_name.setdefault(filename, {})[rank] = record
+            except OSError:
+                pass
+
+        def subdirs(directory: str):
+            try:
+                with os.scandir(directory) as entries:
+                    return [entry for entry in entries if entry.is_dir() and not entry.name.startswith('.')]
+            except OSError:
+                return []
+
+        scan_files(self.base_dir)
+
+        for top in subdirs(self.base_dir):
+            scan_files(top.path)
+            if top.name in GENDERS:
+                for lang_dir in subdirs(top.path):
+                    scan_files(lang_dir.path)
+
+        return records, by_name
+
+    def build(self) -> 'AudioManifest':
+        """Построение индекса одним проходом по директории"""
+        records, by_name = self._scan()
+        with self._lock:
+            self._records = records
+            self._by_name = by_name
+            self.built = True
+        print(f"✓ Индекс аудиофайлов построен: {len(records)} файлов")
+        return self
+
+    def refresh(self):
+        """
+        Повторный проход по директории со слиянием в текущий индекс
+
+        Записи, которые add_file/remove_file изменили во время прохода,
+        остаются как есть: проход мог увидеть директорию до этих изменений.
+        """
+        with self._lock:
+            self._touched = set()
+        try:
+            records, by_name = self._scan()
+        finally:
+            with self._lock:
+                touched, self._touched = self._touched, None
+
+        with self._lock:
+            for key in [key for key in self._records if key not in records and key not in touched]:
+                del self._records[key]
+            for key, record in records.items():
+                if key not in touched:
+                    self._records[key] = record
+
+            for filename in set(self._by_name) | set(by_name):
+                candidates = dict(by_name.get(filename, {}))
+                # Расположения, измененные во время прохода, берутся из текущего индекса
+                for rank, record in self._by_name.get(filename, {}).items():
+                    if (filename, rank) in touched:
+                        candidates[rank] = record
+                for rank in list(candidates):
+                    if (filename, rank) in touched and rank not in self._by_name.get(filename, {}):
+                        del candidates[rank]
+
+                if candidates:
+                    if candidates != self._by_name.get(filename):
+                        self._by_name[filename] = candidates
+                else:
+                    self._by_name.pop(filename, None)
+
+    def _touch(self, key, filename: str, rank: int):
+        """Отметка изменения во время refresh() (вызывается под блокировкой)"""
+        if self._touched is not None:
+            if key is not None:
+                self._touched.add(key)
+            self._touched.add((filename, rank))
+
+    def get(self, gender: Optional[str], language: str, phrase_hash: str) -> Optional[AudioRecord]:
+        """
+        Поиск файла в индексе без обращения к файловой системе
+
+        Файлы, записанные другими процессами (воркеры gunicorn, утилиты
+        генерации), появляются в индексе через фоновое обновление
+        (start_watching / refresh).
+
+        Args:
+            gender: Гендер голоса или None для структуры language/file
+            language: Язык ('en' или 'ru')
+            phrase_hash: MD5 нормализованной фразы
+
+        Returns:
+            AudioRecord или None
+        """
+        return self._records.get((gender, language, phrase_hash))
+
+    def resolve(self, filename: str) -> Optional[AudioRecord]:
+        """
+        Поиск файла по имени без обращения к файловой системе
+
+        Промах отвечается только по индексу: файлы других процессов
+        попадают в него через add_file при записи и фоновое обновление
+        (start_watching).
+
+        Args:
+            filename: Имя файла ({язык}_{md5}.mp3)
+
+        Returns:
+            AudioRecord с наивысшим приоритетом расположения или None
+        """
+        # Словари кандидатов не изменяются на месте, чтение без блокировки безопасно
+        candidates = self._by_name.get(filename)
+        if not candidates:
+            return None
+        return candidates[min(candidates)]
+
+    def add_file(self, path: str, size: Optional[int] = None, mtime_ns: Optional[int] = None) -> Optional[AudioRecord]:
+        """
+        Добавление (обновление) файла в индексе после записи
+
+        Args:
+            path: Путь к файлу
+            size: Размер файла (если None - определяется через stat)
+            mtime_ns: Время изменения (если None - определяется через stat)
+
+        Returns:
+            Добавленная запись или None если файл не соответствует структуре
+        """
+        path = os.path.realpath(path)
+        classified = self._classify(path)
+        if classified is None:
+            return None
+
+        if size is None or mtime_ns is None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.remove_file(path)
+                return None
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+
+        if size <= 0:
+            self.remove_file(path)
+            return None
+
+        key, filename, rank = classified
+        record = AudioRecord(path, size, mtime_ns)
+        with self._lock:
+            self._touch(key, filename, rank)
+            if key is not None:
+                self._records[key] = record
+            candidates = dict(self._by_name.get(filename, {}))
+            candidates[rank] = record
+            self._by_name[filename] = candidates
+        return record
+
+    def remove_file(self, path: str):
+        """Удаление файла из индекса"""
+        classified = self._classify(os.path.realpath(path))
+        if classified is None:
+            return
+
+        key, filename, rank = classified
+        with self._lock:
+            self._touch(key, filename, rank)
+            if key is not None:
+                self._records.pop(key, None)
+            candidates = dict(self._by_name.get(filename, {}))
+            candidates.pop(rank, None)
+            if candidates:
+                self._by_name[filename] = candidates
+            else:
+                self._by_name.pop(filename, None)
+
+    def start_watching(self, interval: float = 60.0):
+        """
+        Фоновое обновление индекса
+
+        Используется inotify (пакет inotify_simple), если доступен,
+        иначе - периодическое перестроение раз в interval секунд.
+
+        Args:
+            interval: Период перестроения для режима без inotify
+        """
+        # Поток не переживает fork: в воркере gunicorn (--preload) запускается заново
+        if self._watcher is not None and self._watcher_pid == os.getpid():
+            return
+
+        try:
+            import inotify_simple
+            target = self._watch_inotify
+            args = (inotify_simple,)
+            print("✓ Индекс аудиофайлов обновляется через inotify")
+        except ImportError:
+            target = self._watch_polling
+            args = (interval,)
+            print(f"⚠️ inotify_simple не установлен, индекс обновляется раз в {interval:.0f} с")
+
+        self._stop_event.clear()
+        self._watcher_pid = os.getpid()
+        self._watcher = threading.Thread(target=target, args=args, name='audio-manifest-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Остановка фонового обновления"""
+        self._stop_event.set()
+        self._watcher = None
+
+    def _watch_polling(self, interval: float):
+        while not self._stop_event.wait(interval):
+            self.refresh()
+
+    def _watch_inotify(self, inotify_simple):
+        flags = inotify_simple.flags
+        file_mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.DELETE | flags.MOVED_FROM | flags.CREATE
+        inotify = inotify_simple.INotify()
+        watches = {}
+
+        def watch(directory: str):
+            try:
+                watches[inotify.add_watch(directory, file_mask)] = directory
+            except OSError:
+                pass
+
+        def subdirs(directory: str):
+            try:
+                with os.scandir(directory) as entries:
+                    return [e for e in entries if e.is_dir() and not e.name.startswith('.')]
+            except OSError:
+                return []
+
+        watch(self.base_dir)
+        for top in subdirs(self.base_dir):
+            watch(top.path)
+            if top.name in GENDERS:
+                for lang_dir in subdirs(top.path):
+                    watch(lang_dir.path)
+
+        # Изменения, произошедшие до установки наблюдения
+        self.refresh()
+
+        while not self._stop_event.is_set():
+            for event in inotify.read(timeout=1000):
+                directory = watches.get(event.wd)
+                if directory is None or not event.name:
+                    continue
+                path = os.path.join(directory, event.name)
+
+                if event.mask & flags.ISDIR:
+                    if event.mask & (flags.CREATE | flags.MOVED_TO):
+                        watch(path)
+                    continue
+
+                if event.mask & (flags.DELETE | flags.MOVED_FROM):
+                    self.remove_file(path)
+                elif event.mask & (flags.CLOSE_WRITE | flags.MOVED_TO):
+                    self.add_file(path)
+
+        inotify.close()
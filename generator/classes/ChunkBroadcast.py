@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Iterator, List, Optional
+
+
+class ChunkBroadcast:
+    """
+    Рассылка фрагментов одного потокового синтеза нескольким получателям
+
+    Производитель добавляет фрагменты через publish() и завершает поток
+    через close(). Каждый получатель итерирует рассылку с начала: уже
+    полученные фрагменты отдаются сразу, новые - по мере поступления.
+    Синхронные получатели (__iter__) ждут на Condition из любых потоков;
+    асинхронные (__aiter__) должны работать в том же event loop, что и
+    производитель.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._event: Optional[asyncio.Event] = None
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, chunk: bytes):
+        """Добавление фрагмента"""
+        with self._condition:
+            self._chunks.append(chunk)
+            self._condition.notify_all()
+        self._wake_async()
+
+    def close(self):
+        """Завершение потока: получатели дочитывают фрагменты и останавливаются"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            callbacks, self._callbacks = self._callbacks, []
+        self._wake_async()
+
+        for callback in callbacks:
+            callback()
+
+    def add_done_callback(self, callback: Callable[[], None]):
+        """Вызов callback после close() (сразу, если поток уже завершен)"""
+        with self._condition:
+            if not self._closed:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def _wake_async(self):
+        event, self._event = self._event, None
+        if event is not None:
+            event.set()
+
+    def __iter__(self) -> Iterator[bytes]:
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self._chunks) and not self._closed:
+                    self._condition.wait()
+                if index >= len(self._chunks):
+                    return
+                chunk = self._chunks[index]
+            index += 1
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        index = 0
+        while True:
+            if index < len(self._chunks):
+                index += 1
+                yield self._chunks[index - 1]
+            elif self._closed:
+                return
+            else:
+                if self._event is None:
+                    self._event = asyncio.Event()
+                await self._event.wait()
@@ -0,0 +1,208 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from mysql.connector import Error, errorcode, pooling
+
+logger = logging.getLogger(__name__)
+
+# Ошибки, после которых имеет смысл повторить операцию на новом соединении
+TRANSIENT_ERRORS = {
+    errorcode.CR_SERVER_GONE_ERROR,     # 2006
+    errorcode.CR_SERVER_LOST,           # 2013
+    errorcode.CR_CONN_HOST_ERROR,       # 2003
+    errorcode.CR_SERVER_LOST_EXTENDED,  # 2055
+    errorcode.ER_LOCK_DEADLOCK,         # 1213
+    errorcode.ER_LOCK_WAIT_TIMEOUT,     # 1205
+}
+
+
+def is_transient(error: Exception) -> bool:
+    """Временная ошибка (потеря соединения, дедлок, ожидание блокировки)"""
+    return isinstance(error, pooling.PoolError) or getattr(error, 'errno', None) in TRANSIENT_ERRORS
+
+
+class DatabasePool:
+    """
+    Пул соединений MySQL (mysql.connector.pooling), общий для утилит и API
+
+    Соединение проверяется (ping) при выдаче из пула. Временные ошибки
+    и исчерпание пула повторяются с экспоненциальной задержкой.
+    """
+
+    def __init__(self, host: str, database: str, user: str, password: str, port: int = 3306,
+                 pool_size: int = 5, pool_name: str = 'eng_phrases',
+                 max_retries: int = 3, retry_delay: float = 0.5):
+        """
+        Инициализация пула (соединения создаются при первом обращении)
+
+        Args:
+            host: Хост MySQL
+            database: Имя базы данных
+            user: Имя пользователя
+            password: Пароль
+            port: Порт MySQL
+            pool_size: Количество соединений в пуле
+            pool_name: Имя пула
+            max_retries: Количество повторов при временных ошибках
+            retry_delay: Начальная задержка между повторами в секундах
+        """
+        self.host = host
+        self.database = database
+        self.user = user
+        self.password = password
+        self.port = port
+        self.pool_size = pool_size
+        self.pool_name = pool_name
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self._pool: Optional[pooling.MySQLConnectionPool] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **overrides) -> 'DatabasePool':
+        """
+        Создание пула из переменных окружения
+
+        DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT, DB_POOL_SIZE
+        """
+        settings = {
+            'host': os.environ.get('DB_HOST', 'localhost'),
+            'database': os.environ.get('DB_NAME', 'eng_phrases'),
+            'user': os.environ.get('DB_USER', 'root'),
+            'password': os.environ.get('DB_PASSWORD', ''),
+            'port': int(os.environ.get('DB_PORT', '3306')),
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', '5')),
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    @property
+    def pool(self) -> pooling.MySQLConnectionPool:
+        """Пул соединений (создается при первом обращении)"""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=self.pool_name,
+                        pool_size=self.pool_size,
+                        pool_reset_session=True,
+                        host=self.host,
+                        database=self.database,
+                        user=self.user,
+                        password=self.password,
+                        port=self.port,
+                        charset='utf8mb4',
+                        collation='utf8mb4_unicode_ci'
+                    )
+                    logger.info(f"✓ Пул соединений MySQL создан ({self.pool_size} соединений)")
+        return self._pool
+
+    def _retry(self, operation: Callable[[], Any]) -> Any:
+        """
+        Выполнение операции с повторами при временных ошибках
+
+        Повторяется только внешняя операция: внутренние шаги
+        (создание пула, выдача соединения) сами не повторяются.
+        """
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                return operation()
+            except Error as e:
+                if attempt == self.max_retries or not is_transient(e):
+                    raise
+                logger.warning(f"⚠️ Временная ошибка MySQL ({e}), повтор через {delay:.1f} с")
+                time.sleep(delay)
+                delay *= 2
+
+    def _checkout(self):
+        """Выдача соединения из пула с проверкой (без повторов)"""
+        connection = self.pool.get_connection()
+        try:
+            # Соединение могло быть закрыто сервером за время простоя
+            connection.ping(reconnect=True, attempts=1, delay=0)
+        except Error:
+            connection.close()
+            raise
+        return connection
+
+    def get_connection(self):
+        """
+        Получение проверенного соединения из пула
+
+        Вызывающий обязан вернуть соединение в пул через close().
+
+        Returns:
+            PooledMySQLConnection
+        """
+        return self._retry(self._checkout)
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        """Соединение из пула, возвращаемое обратно по выходу из блока"""
+        connection = self.get_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    @contextmanager
+    def _transaction(connection, dictionary: bool) -> Iterator:
+        """Курсор с commit при успехе и rollback при исключении"""
+        cursor = connection.cursor(dictionary=dictionary)
+        try:
+            yield cursor
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def cursor(self, dictionary: bool = False) -> Iterator:
+        """
+        Курсор на соединении из пула
+
+        При нормальном выходе из блока изменения фиксируются (commit),
+        при исключении - откатываются.
+        """
+        with self.connection() as connection:
+            with self._transaction(connection, dictionary) as cursor:
+                yield cursor
+
+    def execute(self, query: str, params: Optional[tuple] = None, fetch: Optional[str] = 'all',
+                dictionary: bool = True) -> Any:
+        """
+        Выполнение одного запроса с повтором при временных ошибках
+
+        Args:
+            query: SQL запрос
+            params: Параметры запроса
+            fetch: 'all', 'one' или None (без чтения результата)
+            dictionary: Строки в виде словарей
+
+        Returns:
+            Результат fetchall()/fetchone() или количество измененных строк
+        """
+        def operation():
+            connection = self._checkout()
+            try:
+                with self._transaction(connection, dictionary) as cursor:
+                    cursor.execute(query, params or ())
+                    if fetch == 'all':
+                        return cursor.fetchall()
+                    if fetch == 'one':
+                        return cursor.fetchone()
+                    return cursor.rowcount
+            finally:
+                connection.close()
+
+        return self._retry(operation)
+
@@ -5,12 +5,18 @@
 
 import asyncio
 import json
-import hashlib
+import os
 import time
+import uuid
+import weakref
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import requests
 import edge_tts
+from .AsyncLoopRunner import AsyncLoopRunner
+from .ChunkBroadcast import ChunkBroadcast
+from .VoiceCatalog import VoiceCatalog
+from .PhraseKey import phrase_filename
 
 class EdgeTTSGenerator:
     """Генератор речи с использованием Edge-TTS"""
@@ -24,64 +30,23 @@ class EdgeTTSGenerator:
         """
         self.BASE_OUTPUT_DIR = base_output_dir
         
-        # Словарь с доступными голосами Edge-TTS по языкам и гендерам
-        self.VOICES = self._get_available_voices()
+        # Постоянный event loop в фоновом потоке, общий для всех синхронных вызовов
+        self._runner = AsyncLoopRunner('edge-tts-loop')
         
-        # Задержка между запросами
-        self.REQUEST_DELAY = 0.3
+        # Максимальное число одновременных запросов к Edge-TTS
+        self.MAX_CONCURRENT_REQUESTS = 4
+        self._semaphores = weakref.WeakKeyDictionary()
         
-        # Проверяем интернет-соединение
-        self._check_internet_connection()
-    
-    async def _load_voices_async(self):
-        """Асинхронная загрузка всех доступных голосов Edge-TTS"""
-        voices = await edge_tts.list_voices()
-        organized_voices = {}
-        
-        for voice in voices:
-            locale = voice['Locale']
-            short_name = voice['ShortName']
-            gender = voice['Gender'].lower()
-            
-            # Извлекаем код языка (первые 2 символа)
-            lang_code = locale[:2].lower() if len(locale) >= 2 else 'en'
-            
-            if lang_code not in organized_voices:
-                organized_voices[lang_code] = {'male': [], 'female': []}
-            
-            organized_voices[lang_code][gender].append(short_name)
+        # Ссылки на фоновые задачи потокового синтеза
+        self._stream_tasks = set()
         
-        return organized_voices
+        # Каталог голосов Edge-TTS: загружается из локального кэша при первом обращении
+        self.voice_catalog = VoiceCatalog(self._runner)
     
-    def _get_available_voices(self) -> Dict:
-        """
-        Получение списка доступных голосов Edge-TTS
-        
-        Returns:
-            Словарь с голосами, сгруппированными по языкам и гендерам
-        """
-        try:
-            # Запускаем асинхронную загрузку
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            voices = loop.run_until_complete(self._load_voices_async())
-            loop.close()
-            
-            print(f"✓ Загружено голосов Edge-TTS для {len(voices)} языков")
-            return voices
-        except Exception as e:
-            print(f"⚠️ Ошибка загрузки голосов Edge-TTS: {e}")
-            # Возвращаем стандартные голоса по умолчанию
-            return {
-                'en': {
-                    'male': ['en-US-ChristopherNeural', 'en-US-EricNeural', 'en-GB-RyanNeural'],
-                    'female': ['en-US-AriaNeural', 'en-US-JennyNeural', 'en-GB-SoniaNeural']
-                },
-                'ru': {
-                    'male': ['ru-RU-DmitryNeural', 'ru-RU-SergeyNeural'],
-                    'female': ['ru-RU-SvetlanaNeural', 'ru-RU-DariyaNeural']
-                }
-            }
+    @property
+    def VOICES(self) -> Dict:
+        """Словарь с доступными голосами Edge-TTS по языкам и гендерам"""
+        return self.voice_catalog.voices
     
     def _check_internet_connection(self) -> bool:
         """Проверка интернет-соединения"""
@@ -141,67 +106,81 @@ class EdgeTTSGenerator:
         # Возвращаем первый доступный голос
         return voices_list[0]
     
-    @staticmethod
-    def _generate_filename(phrase: str, language: str = 'en') -> str:
-        """
-        Генерация имени файла на основе фразы
-        
-        Args:
-            phrase: Текст фразы
-            language: Язык ('en' или 'ru')
-        
-        Returns:
-            str: Имя файла
-        """
-        # Нормализуем фразу
-        normalized_phrase = ' '.join(phrase.strip().split()).lower()
-        
-        phrase_hash = hashlib.md5(normalized_phrase.encode('utf-8')).hexdigest()
-        return f"{language}_{phrase_hash}.mp3"
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Семафор одновременных запросов для текущего event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+            self._semaphores[loop] = semaphore
+        return semaphore
     
-    async def _generate_audio_async(self, text: str, voice: str, output_file: str) -> bool:
+    async def _generate_audio_async(self, text: str, voice: str, output_file: str) -> int:
         """
         Асинхронная генерация аудиофайла
         
+        Аудио пишется во временный файл рядом с output_file и атомарно
+        переименовывается, поэтому читатели не видят недописанный MP3.
+        
         Args:
             text: Текст для преобразования
             voice: Имя голоса Edge-TTS
             output_file: Путь к выходному файлу
         
         Returns:
-            True если успешно
+            Размер записанного файла или 0 при ошибке
         """
+        temp_file = f"{output_file}.{uuid.uuid4().hex}.part"
+        
         try:
-            communicate = edge_tts.Communicate(text, voice)
+            audio = []
+            async with self._get_semaphore():
+                communicate = edge_tts.Communicate(text, voice)
+                
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio.append(chunk["data"])
             
-            # Сохраняем в файл
-            await communicate.save(output_file)
-            return True
+            return await asyncio.to_thread(self._write_audio, temp_file, output_file, b''.join(audio))
             
         except Exception as e:
             print(f"✗ Ошибка Edge-TTS: {e}")
-            return False
+            await asyncio.to_thread(self._remove_file, temp_file)
+            return 0
     
-    def generate_audio(self, text: str, language: str = 'en', 
-                      gender: str = 'female', voice_name: Optional[str] = None,
-                      category: Optional[str] = None) -> Optional[Dict]:
+    @staticmethod
+    def _write_audio(temp_file: str, output_file, data: bytes) -> int:
         """
-        Генерация аудиофайла для фразы
+        Запись аудио во временный файл и атомарная замена выходного
         
-        Args:
-            text: Текст фразы
-            language: Язык ('en' или 'ru')
-            gender: Гендер голоса ('male' или 'female')
-            voice_name: Конкретное имя голоса (если None, берется первый доступный для гендера)
-            category: Категория (опционально)
+        Выполняется в пуле потоков: запись на сетевой том не блокирует
+        event loop с ожидающими синтезами.
         
         Returns:
-            dict: Информация о сгенерированном файле или None при ошибке
+            Размер записанного файла
         """
-        if not text or not isinstance(text, str):
-            print("✗ Пустая фраза")
-            return None
+        if not data:
+            raise ValueError("пустой аудиофайл")
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+        os.replace(temp_file, output_file)
+        return len(data)
+    
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def _prepare_audio(self, text: str, language: str, gender: str,
+                       voice_name: Optional[str]) -> Tuple[str, str, str, Path]:
+        """
+        Подготовка генерации: нормализация текста, голос и путь к файлу
         
+        Returns:
+            Кортеж (текст, голос, имя файла, путь к файлу)
+        """
         # Нормализуем текст
         clean_text = ' '.join(text.strip().split())
         
@@ -209,7 +188,7 @@ class EdgeTTSGenerator:
         voice = self._get_voice_for_language(language, gender, voice_name)
         
         # Генерация имени файла
-        filename = self._generate_filename(clean_text, language)
+        filename = phrase_filename(clean_text, language)
         
         # Создаем подпапки: BASE_OUTPUT_DIR/gender/language
         save_dir = Path(self.BASE_OUTPUT_DIR) / gender / language
@@ -217,61 +196,273 @@ class EdgeTTSGenerator:
         save_dir.mkdir(parents=True, exist_ok=True)
         
         # Полный путь к файлу
-        filepath = save_dir / filename
+        return clean_text, voice, filename, save_dir / filename
+    
+    async def _prepare_audio_async(self, text: str, language: str, gender: str,
+                                   voice_name: Optional[str]) -> Tuple[str, str, str, Path, int]:
+        """
+        _prepare_audio и размер готового файла в пуле потоков (mkdir и stat
+        на сетевом томе не блокируют event loop)
+        
+        Returns:
+            Кортеж (текст, голос, имя файла, путь к файлу, размер или 0)
+        """
+        def prepare():
+            prepared = self._prepare_audio(text, language, gender, voice_name)
+            return prepared + (self._file_size(prepared[3]),)
+        
+        return await asyncio.to_thread(prepare)
+    
+    @staticmethod
+    def _file_size(filepath: Path) -> int:
+        """Размер файла или 0 если файла нет"""
+        try:
+            return filepath.stat().st_size
+        except OSError:
+            return 0
+    
+    def _audio_result(self, text: str, language: str, gender: str, voice: str,
+                      filepath: Path, file_size: int, already_exists: bool) -> Dict:
+        """Информация об аудиофайле"""
+        return {
+            'text': text,
+            'language': language,
+            'gender': gender,
+            'voice': voice,
+            'filename': filepath.name,
+            'filepath': str(filepath),
+            'file_size': file_size,
+            'already_exists': already_exists
+        }
+    
+    def _finish_generation(self, file_size: int, text: str, language: str, gender: str,
+                           voice: str, filepath: Path) -> Optional[Dict]:
+        """Проверка результата генерации"""
+        if file_size > 0:
+            print(f"  ✓ Создан: {filepath.name} ({file_size / 1024:.1f} KB)")
+            return self._audio_result(text, language, gender, voice, filepath, file_size, False)
+        
+        print(f"✗ Ошибка: файл не создан или пустой: {filepath.name}")
+        return None
+    
+    def generate_audio(self, text: str, language: str = 'en', 
+                      gender: str = 'female', voice_name: Optional[str] = None,
+                      category: Optional[str] = None) -> Optional[Dict]:
+        """
+        Генерация аудиофайла для фразы
+        
+        Args:
+            text: Текст фразы
+            language: Язык ('en' или 'ru')
+            gender: Гендер голоса ('male' или 'female')
+            voice_name: Конкретное имя голоса (если None, берется первый доступный для гендера)
+            category: Категория (опционально)
+        
+        Returns:
+            dict: Информация о сгенерированном файле или None при ошибке
+        """
+        if not text or not isinstance(text, str):
+            print("✗ Пустая фраза")
+            return None
+        
+        clean_text, voice, filename, filepath = self._prepare_audio(text, language, gender, voice_name)
         
         # Проверяем, существует ли уже файл
-        if filepath.exists() and filepath.stat().st_size > 0:
+        file_size = self._file_size(filepath)
+        if file_size > 0:
             print(f"✓ Файл уже существует: {filename}")
-            return {
-                'text': text,
-                'language': language,
-                'gender': gender,
-                'voice': voice,
-                'filename': filename,
-                'filepath': str(filepath),
-                'file_size': filepath.stat().st_size,
-                'already_exists': True
-            }
+            return self._audio_result(text, language, gender, voice, filepath, file_size, True)
         
         try:
             print(f"  Генерация аудио для: '{text[:50]}...'")
             print(f"  Голос: {voice} (гендер: {gender})")
             
-            # Запускаем асинхронную генерацию
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            success = loop.run_until_complete(
+            # Отправляем генерацию в фоновый loop и ждем результата;
+            # параллельные вызовы из разных потоков выполняются одновременно
+            file_size = self._runner.run(
                 self._generate_audio_async(clean_text, voice, str(filepath))
             )
             
-            loop.close()
+            return self._finish_generation(file_size, text, language, gender, voice, filepath)
+                
+        except Exception as e:
+            print(f"✗ Ошибка при генерации аудио для '{text[:30]}...': {str(e)}")
+            return None
+    
+    async def generate_audio_async(self, text: str, language: str = 'en',
+                                   gender: str = 'female',
+                                   voice_name: Optional[str] = None) -> Optional[Dict]:
+        """
+        Асинхронная генерация аудиофайла в текущем event loop
+        
+        Используется асинхронным сервером: Edge-TTS ожидается прямо
+        в loop сервера, без фонового потока.
+        
+        Args:
+            text: Текст фразы
+            language: Язык ('en' или 'ru')
+            gender: Гендер голоса ('male' или 'female')
+            voice_name: Конкретное имя голоса
+        
+        Returns:
+            dict: Информация о сгенерированном файле или None при ошибке
+        """
+        if not text or not isinstance(text, str):
+            print("✗ Пустая фраза")
+            return None
+        
+        clean_text, voice, filename, filepath, file_size = await self._prepare_audio_async(
+            text, language, gender, voice_name
+        )
+        
+        if file_size > 0:
+            print(f"✓ Файл уже существует: {filename}")
+            return self._audio_result(text, language, gender, voice, filepath, file_size, True)
+        
+        try:
+            print(f"  Генерация аудио для: '{text[:50]}...'")
+            print(f"  Голос: {voice} (гендер: {gender})")
             
-            # Задержка между запросами
-            time.sleep(self.REQUEST_DELAY)
+            file_size = await self._generate_audio_async(clean_text, voice, str(filepath))
             
-            if success and filepath.exists() and filepath.stat().st_size > 0:
-                file_size_kb = filepath.stat().st_size / 1024
-                print(f"  ✓ Создан: {filename} ({file_size_kb:.1f} KB)")
-                
-                return {
-                    'text': text,
-                    'language': language,
-                    'gender': gender,
-                    'voice': voice,
-                    'filename': filename,
-                    'filepath': str(filepath),
-                    'file_size': filepath.stat().st_size,
-                    'already_exists': False
-                }
-            else:
-                print(f"✗ Ошибка: файл не создан или пустой: {filename}")
-                return None
-                
+            return self._finish_generation(file_size, text, language, gender, voice, filepath)
+        
         except Exception as e:
             print(f"✗ Ошибка при генерации аудио для '{text[:30]}...': {str(e)}")
             return None
     
+    # Размер блока при отдаче уже существующего файла
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
+    async def _stream_to_file(self, text: str, voice: str, filepath: Path,
+                              sink: Callable[[bytes], None],
+                              on_complete: Optional[Callable[[str, int], None]] = None) -> bool:
+        """
+        Потоковый синтез: каждый фрагмент аудио передается в sink
+        и одновременно пишется в кэш-файл
+        
+        Синтез доводится до конца независимо от получателя, поэтому
+        файл попадает в кэш, даже если клиент отключился.
+        
+        Args:
+            text: Текст для преобразования
+            voice: Имя голоса Edge-TTS
+            filepath: Путь к выходному файлу
+            sink: Получатель фрагментов аудио
+            on_complete: Вызывается с (путь, размер) после записи файла
+        
+        Returns:
+            True если файл записан
+        """
+        temp_file = f"{filepath}.{uuid.uuid4().hex}.part"
+        
+        def finish(data: bytes) -> int:
+            file_size = self._write_audio(temp_file, filepath, data)
+            if on_complete:
+                on_complete(str(filepath), file_size)
+            return file_size
+        
+        try:
+            audio = []
+            async with self._get_semaphore():
+                communicate = edge_tts.Communicate(text, voice)
+                
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio.append(chunk["data"])
+                        sink(chunk["data"])
+            
+            # Файл пишется одним вызовом в пуле потоков, фрагменты ушли получателю сразу
+            file_size = await asyncio.to_thread(finish, b''.join(audio))
+            print(f"  ✓ Создан (поток): {filepath.name} ({file_size / 1024:.1f} KB)")
+            return True
+            
+        except Exception as e:
+            print(f"✗ Ошибка потокового Edge-TTS: {e}")
+            await asyncio.to_thread(self._remove_file, temp_file)
+            return False
+    
+    def _iter_file(self, filepath: Path) -> Iterator[bytes]:
+        """Чтение существующего файла блоками"""
+        with open(filepath, 'rb') as f:
+            while True:
+                chunk = f.read(self.STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    
+    def stream_audio(self, text: str, language: str = 'en', gender: str = 'female',
+                     voice_name: Optional[str] = None,
+                     on_complete: Optional[Callable[[str, int], None]] = None) -> Tuple[str, Iterable[bytes]]:
+        """
+        Потоковая генерация для синхронного сервера
+        
+        Синтез выполняется в фоновом loop, фрагменты рассылаются
+        через ChunkBroadcast (потокобезопасно).
+        
+        Args:
+            text: Текст фразы
+            language: Язык ('en' или 'ru')
+            gender: Гендер голоса ('male' или 'female')
+            voice_name: Конкретное имя голоса
+            on_complete: Вызывается с (путь, размер) после записи файла
+        
+        Returns:
+            Кортеж (имя файла, фрагменты MP3): итератор готового файла
+            или ChunkBroadcast синтеза, который могут читать несколько клиентов
+        """
+        clean_text, voice, filename, filepath = self._prepare_audio(text, language, gender, voice_name)
+        
+        if self._file_size(filepath) > 0:
+            return filename, self._iter_file(filepath)
+        
+        chunks = ChunkBroadcast()
+        future = self._runner.submit(
+            self._stream_to_file(clean_text, voice, filepath, chunks.publish, on_complete)
+        )
+        future.add_done_callback(lambda _: chunks.close())
+        
+        return filename, chunks
+    
+    async def stream_audio_async(self, text: str, language: str = 'en', gender: str = 'female',
+                                 voice_name: Optional[str] = None,
+                                 on_complete: Optional[Callable[[str, int], None]] = None) -> Tuple[str, ChunkBroadcast]:
+        """
+        Потоковая генерация в текущем event loop (для асинхронного сервера)
+        
+        Args:
+            text: Текст фразы
+            language: Язык ('en' или 'ru')
+            gender: Гендер голоса ('male' или 'female')
+            voice_name: Конкретное имя голоса
+            on_complete: Вызывается с (путь, размер) после записи файла
+        
+        Returns:
+            Кортеж (имя файла, ChunkBroadcast): закрытая рассылка готового
+            файла или рассылка идущего синтеза
+        """
+        clean_text, voice, filename, filepath, file_size = await self._prepare_audio_async(
+            text, language, gender, voice_name
+        )
+        
+        if file_size > 0:
+            # Готовый файл (десятки KB) читается целиком в пуле потоков;
+            # закрытая рассылка отдается каждому получателю заново
+            chunks = ChunkBroadcast()
+            chunks.publish(await asyncio.to_thread(filepath.read_bytes))
+            chunks.close()
+            return filename, chunks
+        
+        chunks = ChunkBroadcast()
+        task = asyncio.ensure_future(
+            self._stream_to_file(clean_text, voice, filepath, chunks.publish, on_complete)
+        )
+        self._stream_tasks.add(task)
+        task.add_done_callback(self._stream_tasks.discard)
+        task.add_done_callback(lambda _: chunks.close())
+        
+        return filename, chunks
+    
     def get_available_voices(self, language: str = 'en', gender: Optional[str] = None) -> List[str]:
         """
         Получение списка доступных голосов
@@ -309,4 +500,8 @@ class EdgeTTSGenerator:
                     for voice in voices[:10]:  # Показываем первые 10
                         print(f"    • {voice}")
                     if len(voices) > 10:
-                        print(f"    ... и еще {len(voices) - 10} голосов")
\ No newline at end of file
+                        print(f"    ... и еще {len(voices) - 10} голосов")
+    
+    def shutdown(self):
+        """Остановка фонового event loop"""
+        self._runner.stop()
\ No newline at end of file
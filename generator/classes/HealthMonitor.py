@@ -0,0 +1,156 @@
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import requests
+
+# Адрес сервиса Edge-TTS для проверки доступности
+TTS_ENDPOINT = 'https://speech.platform.bing.com'
+
+
+class HealthMonitor:
+    """
+    Фоновая проверка состояния сервера
+
+    Проверки (доступность TTS, свободное место, размер индекса, глубина
+    очереди генерации) выполняются в отдельном потоке раз в interval секунд.
+    Эндпоинты отдают последний снимок без сетевых запросов и обращений к диску.
+    """
+
+    def __init__(self, base_dir: str, manifest=None,
+                 queue_depth: Optional[Callable[[], int]] = None,
+                 interval: float = 30.0, min_free_mb: float = 100.0,
+                 tts_endpoint: str = TTS_ENDPOINT,
+                 extra_checks: Optional[Dict[str, Callable[[], object]]] = None):
+        """
+        Инициализация монитора
+
+        Args:
+            base_dir: Директория с аудиофайлами
+            manifest: Индекс аудиофайлов (AudioManifest) или None
+            queue_depth: Функция, возвращающая число генераций в процессе
+            interval: Период проверок в секундах
+            min_free_mb: Минимум свободного места, МБ
+            tts_endpoint: Адрес для проверки доступности TTS
+            extra_checks: Дополнительные показатели: имя -> функция без аргументов
+        """
+        self.base_dir = base_dir
+        self.manifest = manifest
+        self.queue_depth = queue_depth
+        self.interval = interval
+        self.min_free_mb = min_free_mb
+        self.tts_endpoint = tts_endpoint
+        self.extra_checks = extra_checks or {}
+
+        self._snapshot: Optional[Dict] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    @property
+    def snapshot(self) -> Optional[Dict]:
+        """Последний снимок состояния (None до первой проверки)"""
+        return self._snapshot
+
+    def _check_tts(self) -> bool:
+        """Доступность сервиса TTS: любой HTTP-ответ означает, что сервис доступен"""
+        try:
+            requests.head(self.tts_endpoint, timeout=5)
+            return True
+        except requests.RequestException:
+            return False
+
+    def check(self) -> Dict:
+        """
+        Выполнение всех проверок и обновление снимка
+
+        Returns:
+            Снимок состояния
+        """
+        started = time.perf_counter()
+        audio_directory = Path(self.base_dir).is_dir()
+
+        disk_free_mb = None
+        disk_total_mb = None
+        if audio_directory:
+            try:
+                usage = shutil.disk_usage(self.base_dir)
+                disk_free_mb = round(usage.free / (1024 * 1024), 1)
+                disk_total_mb = round(usage.total / (1024 * 1024), 1)
+            except OSError:
+                pass
+
+        checks = {
+            "server": "running",
+            "audio_directory": audio_directory,
+            "base_output_dir": self.base_dir,
+            "tts_reachable": self._check_tts(),
+            "disk_free_mb": disk_free_mb,
+            "disk_total_mb": disk_total_mb,
+            "disk_ok": disk_free_mb is not None and disk_free_mb >= self.min_free_mb,
+            "manifest_files": len(self.manifest) if self.manifest is not None else None,
+            "manifest_built": getattr(self.manifest, 'built', False),
+            "queue_depth": self.queue_depth() if self.queue_depth else 0,
+            "timestamp": str(datetime.now())
+        }
+        for name, check in self.extra_checks.items():
+            try:
+                checks[name] = check()
+            except Exception as e:
+                checks[name] = {"error": str(e)}
+        checks["check_duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        ready = checks["audio_directory"] and checks["disk_ok"]
+        healthy = ready and checks["tts_reachable"]
+
+        snapshot = {
+            "status": "healthy" if healthy else "degraded",
+            "ready": ready,
+            "checks": checks,
+            "checked_at": time.time()
+        }
+        self._snapshot = snapshot
+        return snapshot
+
+    def start(self):
+        """
+        Запуск фоновых проверок
+
+        Первая проверка выполняется сразу в вызывающем потоке: новый
+        процесс не отвечает 503 на /api/health и /api/health/ready, пока
+        фоновый поток не дождался ответа TTS. Поток не переживает fork:
+        в дочернем процессе (воркер gunicorn с --preload) повторный вызов
+        выполняет собственную проверку и запускает свой поток.
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+
+            self._stop_event.clear()
+            self._pid = os.getpid()
+            self._check_safely()
+            self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Остановка фоновых проверок"""
+        self._stop_event.set()
+        self._thread = None
+
+    def _check_safely(self):
+        try:
+            self.check()
+        except Exception as e:
+            print(f"⚠️ Ошибка проверки состояния: {e}")
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._check_safely()
@@ -0,0 +1,122 @@
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Sequence
+
+# Пробельные символы JavaScript (\s и String.prototype.trim), чтобы хэш
+# совпадал с SpeechSynthesizer.hash() в public/scripts/speech-synthesizer.js
+JS_WHITESPACE = ' \f\n\r\t\v\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff'
+JS_WHITESPACE_RE = re.compile(f"[{JS_WHITESPACE}]+")
+
+# Символы, которые str.split() и JavaScript \s трактуют по-разному
+SPLIT_MISMATCH_RE = re.compile('[\x1c-\x1f\x85\ufeff]')
+
+# Скобки с содержимым (пометки в корпусе фраз) не озвучиваются
+BRACKETS_RE = re.compile(r'\([^()]*\)|\[[^\[\]]*\]')
+
+# Размер кэша нормализации и хэшей (фраз корпуса и частых запросов)
+CACHE_SIZE = 65536
+
+
+def normalize_phrase(text: str) -> str:
+    """
+    Нормализация фразы как в клиенте: trim, NFC, схлопывание пробелов, нижний регистр
+
+    Args:
+        text: Текст фразы
+
+    Returns:
+        str: Нормализованная фраза
+    """
+    if not unicodedata.is_normalized('NFC', text):
+        text = unicodedata.normalize('NFC', text)
+
+    # Обычно пробелы совпадают и достаточно быстрого str.split()
+    if SPLIT_MISMATCH_RE.search(text):
+        return JS_WHITESPACE_RE.sub(' ', text.strip(JS_WHITESPACE)).lower()
+    return ' '.join(text.split()).lower()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clean_phrase(text: str) -> str:
+    """
+    Текст для озвучки: схлопывание пробелов и удаление пометок в скобках
+
+    Args:
+        text: Текст фразы из корпуса
+
+    Returns:
+        str: Очищенная фраза (регистр сохраняется)
+    """
+    return BRACKETS_RE.sub('', ' '.join(text.strip().split())).strip()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def phrase_hash(text: str) -> str:
+    """
+    MD5 нормализованной фразы (совпадает с хэшем клиента)
+
+    Args:
+        text: Текст фразы
+
+    Returns:
+        str: MD5 в шестнадцатеричном виде
+    """
+    return hashlib.md5(normalize_phrase(text).encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def phrase_key(text: str, lang: str) -> str:
+    """
+    Ключ аудиофайла фразы: {язык}_{md5}
+
+    Args:
+        text: Текст фразы
+        lang: Код языка ('en', 'ru')
+
+    Returns:
+        str: Ключ (имя файла без расширения)
+    """
+    return f"{lang}_{phrase_hash(text)}"
+
+
+def phrase_filename(text: str, lang: str) -> str:
+    """Имя аудиофайла фразы: {язык}_{md5}.mp3"""
+    return f"{phrase_key(text, lang)}.mp3"
+
+
+def phrase_hashes(texts: Sequence[str]) -> List[str]:
+    """
+    Хэши списка фраз (для корпуса целиком)
+
+    Одинаковые фразы хэшируются один раз; кэш lru_cache не используется,
+    чтобы проход по корпусу не вытеснял из него частые запросы сервера.
+
+    Args:
+        texts: Список фраз
+
+    Returns:
+        Список MD5 в порядке фраз
+    """
+    md5 = hashlib.md5
+    hashes = {}
+    for text in texts:
+        if text not in hashes:
+            hashes[text] = md5(normalize_phrase(text).encode('utf-8')).hexdigest()
+    return [hashes[text] for text in texts]
+
+
+def phrase_keys(texts: Sequence[str], lang: str) -> List[str]:
+    """
+    Ключи аудиофайлов списка фраз одного языка
+
+    Args:
+        texts: Список фраз
+        lang: Код языка
+
+    Returns:
+        Список ключей {язык}_{md5} в порядке фраз
+    """
+    prefix = f"{lang}_"
+    return [prefix + digest for digest in phrase_hashes(texts)]
@@ -0,0 +1,123 @@
+from typing import Dict, List, Optional, Tuple
+
+from .DatabasePool import DatabasePool
+
+
+class PhraseRepository:
+    """
+    Чтение фраз из MySQL для API
+
+    Страницы выбираются по ключу (type_id, id), что соответствует
+    индексу idx_type_id (InnoDB хранит id в каждом вторичном индексе),
+    поэтому стоимость страницы не зависит от ее номера.
+    """
+
+    MAX_LIMIT = 200
+
+    def __init__(self, pool: DatabasePool):
+        """
+        Инициализация репозитория
+
+        Args:
+            pool: Пул соединений MySQL
+        """
+        self.pool = pool
+
+    @staticmethod
+    def encode_cursor(type_id: int, phrase_id: int) -> str:
+        """Курсор следующей страницы"""
+        return f"{type_id}-{phrase_id}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[int, int]:
+        """
+        Разбор курсора страницы
+
+        Raises:
+            ValueError: если курсор имеет неверный формат
+        """
+        type_id, phrase_id = cursor.split('-', 1)
+        return int(type_id), int(phrase_id)
+
+    def list_phrases(self, category: Optional[str] = None, search: Optional[str] = None,
+                     cursor: Optional[str] = None, limit: int = 50) -> Dict:
+        """
+        Страница активных фраз
+
+        Args:
+            category: Название типа фразы (phrase_types.type_name)
+            search: Текст для полнотекстового поиска (индекс idx_text_search)
+            cursor: Курсор предыдущей страницы (next_cursor) или None для первой
+            limit: Размер страницы (не больше MAX_LIMIT)
+
+        Returns:
+            Словарь с ключами phrases и next_cursor (None на последней странице)
+
+        Raises:
+            ValueError: если курсор имеет неверный формат
+        """
+        limit = max(1, min(limit, self.MAX_LIMIT))
+
+        conditions = ["p.is_active = TRUE"]
+        params: List = []
+
+        if category:
+            conditions.append("pt.type_name = %s")
+            params.append(category)
+
+        if search:
+            conditions.append("MATCH(p.target_text, p.native_text) AGAINST (%s IN NATURAL LANGUAGE MODE)")
+            params.append(search)
+
+        if cursor:
+            type_id, phrase_id = self.decode_cursor(cursor)
+            conditions.append("(p.type_id > %s OR (p.type_id = %s AND p.id > %s))")
+            params.extend([type_id, type_id, phrase_id])
+
+        query = f"""
+        SELECT
+            p.id,
+            p.type_id,
+            pt.type_name,
+            p.target_text,
+            p.native_text
+        FROM phrases p
+        JOIN phrase_types pt ON p.type_id = pt.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY p.type_id, p.id
+        LIMIT %s
+        """
+        # Лишняя строка показывает, есть ли следующая страница
+        params.append(limit + 1)
+
+        rows = self.pool.execute(query, tuple(params))
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1]['type_id'], rows[-1]['id'])
+
+        return {
+            'phrases': [{
+                'id': row['id'],
+                'type': row['type_name'],
+                'target': row['target_text'],
+                'native': row['native_text']
+            } for row in rows],
+            'next_cursor': next_cursor
+        }
+
+    def list_categories(self) -> List[Dict]:
+        """
+        Типы фраз с количеством активных фраз
+
+        Returns:
+            Список словарей с ключами id, type_name, phrase_count
+        """
+        return self.pool.execute("""
+            SELECT pt.id, pt.type_name, COUNT(p.id) AS phrase_count
+            FROM phrase_types pt
+            LEFT JOIN phrases p ON p.type_id = pt.id AND p.is_active = TRUE
+            GROUP BY pt.id, pt.type_name
+            ORDER BY pt.id
+        """)
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых вызовов (single-flight)
+
+    Первый вызов с ключом выполняет функцию, остальные вызовы с тем же
+    ключом, пришедшие до ее завершения, ждут и получают тот же результат.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        """Количество выполняющихся вызовов"""
+        return len(self._calls) + len(self._tasks)
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Выполнение функции с объединением по ключу
+
+        Args:
+            key: Ключ объединения (например, путь к выходному файлу)
+            fn: Функция для выполнения
+            *args, **kwargs: Аргументы функции
+
+        Returns:
+            Кортеж (результат, shared), где shared=True если результат
+            получен от вызова, начатого другим потоком
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+        return result, False
+
+    async def do_async(self, key: str, fn: Callable[..., Awaitable], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Асинхронный вариант do() для корутин одного event loop
+
+        Общая задача защищена от отмены: если клиент, начавший генерацию,
+        отключится, остальные ожидающие все равно получат результат.
+
+        Args:
+            key: Ключ объединения
+            fn: Асинхронная функция
+            *args, **kwargs: Аргументы функции
+
+        Returns:
+            Кортеж (результат, shared)
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(fn(*args, **kwargs))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+        return await asyncio.shield(task), False
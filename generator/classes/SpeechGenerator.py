@@ -4,14 +4,20 @@
 # ============================================================
 
 from gtts import gTTS
+import asyncio
 import json
-import hashlib
 import os
+import threading
 from pathlib import Path
 import time
-from typing import Dict, List, Optional, Tuple
+import uuid
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 import requests
 from .EdgeTTSGenerator import EdgeTTSGenerator
+from .AudioManifest import AudioManifest
+from .SingleFlight import SingleFlight
+from .ChunkBroadcast import ChunkBroadcast
+from .PhraseKey import phrase_filename, phrase_hash
 
 class SpeechGenerator:
     def __init__(self, base_output_dir: Optional[str] = None, use_edge_tts: bool = True):
@@ -39,6 +45,17 @@ class SpeechGenerator:
         
         Path(self.BASE_OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
         
+        # Индекс существующих аудиофайлов (один проход по директории при старте)
+        self.manifest = AudioManifest(self.BASE_OUTPUT_DIR).build()
+        
+        # Объединение одновременных генераций одного и того же файла
+        self._inflight = SingleFlight()
+        
+        # Потоковые синтезы по ключу gender/language/filename: клиенты,
+        # пришедшие во время синтеза, читают ту же рассылку фрагментов
+        self._streams: Dict[str, ChunkBroadcast] = {}
+        self._streams_lock = threading.RLock()
+        
         # Настройки для gTTS
         self.LANGUAGE_MAP = {
             'target': 'en',    # Английский
@@ -47,9 +64,6 @@ class SpeechGenerator:
         
         # Задержка между запросами
         self.REQUEST_DELAY = 0.5
-        
-        # Проверяем интернет-соединение
-        self._check_internet_connection()
     
     def _check_internet_connection(self) -> bool:
         """Проверка интернет-соединения"""
@@ -89,15 +103,11 @@ class SpeechGenerator:
         except json.JSONDecodeError as e:
             raise ValueError(f"Ошибка чтения JSON файла: {e}")
     
-    def _generate_filename(self, phrase: str, language: str = 'en') -> str:
-        # Нормализуем фразу (удаляем лишние пробелы, приводим к нижнему регистру)
-        normalized_phrase = ' '.join(phrase.strip().split()).lower()
-        
-        # Создаем MD5 хэш нормализованной фразы
-        phrase_hash = hashlib.md5(normalized_phrase.encode('utf-8')).hexdigest()
-        
-        # Формат: language_hash.mp3
-        return f"{language}_{phrase_hash}.mp3"
+    def _record_result(self, result: Optional[Dict]) -> Optional[Dict]:
+        """Добавление записанного (или найденного) файла в индекс"""
+        if result and result.get('filepath'):
+            self.manifest.add_file(result['filepath'], result.get('file_size'))
+        return result
     
     def generate_audio(self, text: str, language: str = 'en', 
                       gender: Optional[str] = None,
@@ -121,12 +131,17 @@ class SpeechGenerator:
         # Нормализуем текст
         clean_text = ' '.join(text.strip().split())
         
+        filename = phrase_filename(clean_text, language)
+        
         if self.use_edge_tts:
             # Используем Edge-TTS с гендером
             if gender is None:
                 gender = 'female'  # Значение по умолчанию
-                
-            return self.edge_tts_generator.generate_audio(
+            
+            # Одновременные запросы одного файла ждут первую генерацию
+            result, _ = self._inflight.do(
+                f"{gender}/{language}/{filename}",
+                self.edge_tts_generator.generate_audio,
                 text=clean_text,
                 language=language,
                 gender=gender,
@@ -134,12 +149,188 @@ class SpeechGenerator:
             )
         else:
             # Используем gTTS (без поддержки гендера)
-            return self._generate_with_gtts(clean_text, language)
+            result, _ = self._inflight.do(
+                f"{language}/{filename}",
+                self._generate_with_gtts, clean_text, language
+            )
+        
+        return self._record_result(result)
+    
+    async def generate_audio_async(self, text: str, language: str = 'en',
+                                   gender: Optional[str] = None,
+                                   voice_name: Optional[str] = None) -> Optional[Dict]:
+        """
+        Асинхронная генерация аудиофайла (для асинхронного сервера)
+        
+        Args:
+            text: Текст фразы
+            language: Язык ('en' или 'ru')
+            gender: Гендер голоса ('male' или 'female') - только для Edge-TTS
+            voice_name: Конкретное имя голоса - только для Edge-TTS
+        
+        Returns:
+            dict: Информация о сгенерированном файле или None при ошибке
+        """
+        if not text or not isinstance(text, str):
+            print("✗ Пустая фраза")
+            return None
+        
+        clean_text = ' '.join(text.strip().split())
+        filename = phrase_filename(clean_text, language)
+        
+        if self.use_edge_tts:
+            if gender is None:
+                gender = 'female'
+            
+            result, _ = await self._inflight.do_async(
+                f"{gender}/{language}/{filename}",
+                self.edge_tts_generator.generate_audio_async,
+                text=clean_text,
+                language=language,
+                gender=gender,
+                voice_name=voice_name
+            )
+        else:
+            # gTTS синхронный - выполняем в пуле потоков
+            result, _ = await self._inflight.do_async(
+                f"{language}/{filename}",
+                asyncio.to_thread, self._generate_with_gtts, clean_text, language
+            )
+        
+        # add_file обращается к файловой системе (realpath, stat) - в пуле потоков
+        return await asyncio.to_thread(self._record_result, result)
+    
+    def _record_stream(self, filepath: str, file_size: int):
+        """Добавление файла, записанного при потоковой генерации, в индекс"""
+        self.manifest.add_file(filepath, file_size)
+    
+    def stream_audio(self, text: str, language: str = 'en',
+                     gender: Optional[str] = None,
+                     voice_name: Optional[str] = None) -> Optional[Tuple[str, Iterator[bytes]]]:
+        """
+        Потоковая генерация: фрагменты MP3 отдаются по мере синтеза
+        и одновременно пишутся в кэш-файл
+        
+        Args:
+            text: Текст фразы
+            language: Язык ('en' или 'ru')
+            gender: Гендер голоса ('male' или 'female')
+            voice_name: Конкретное имя голоса
+        
+        Returns:
+            Кортеж (имя файла, итератор фрагментов) или None при ошибке
+        """
+        if not text or not isinstance(text, str):
+            print("✗ Пустая фраза")
+            return None
+        
+        clean_text = ' '.join(text.strip().split())
+        
+        if not self.use_edge_tts:
+            # gTTS не поддерживает потоковую отдачу - генерируем файл целиком
+            result = self.generate_audio(clean_text, language)
+            if not result:
+                return None
+            return result['filename'], self._iter_file(result['filepath'])
+        
+        gender = gender or 'female'
+        filename = phrase_filename(clean_text, language)
+        key = f"{gender}/{language}/{filename}"
+        
+        # Тот же синтез уже идет - читаем его рассылку с начала
+        with self._streams_lock:
+            chunks = self._streams.get(key)
+            if chunks is None:
+                filename, chunks = self.edge_tts_generator.stream_audio(
+                    clean_text, language, gender, voice_name, on_complete=self._record_stream
+                )
+                if isinstance(chunks, ChunkBroadcast):
+                    self._track_stream(key, chunks)
+        
+        return filename, iter(chunks)
+    
+    async def stream_audio_async(self, text: str, language: str = 'en',
+                                 gender: Optional[str] = None,
+                                 voice_name: Optional[str] = None) -> Optional[Tuple[str, AsyncIterator[bytes]]]:
+        """
+        Асинхронная потоковая генерация (для асинхронного сервера)
+        
+        Args:
+            text: Текст фразы
+            language: Язык ('en' или 'ru')
+            gender: Гендер голоса ('male' или 'female')
+            voice_name: Конкретное имя голоса
+        
+        Returns:
+            Кортеж (имя файла, асинхронный итератор фрагментов) или None при ошибке
+        """
+        if not text or not isinstance(text, str):
+            print("✗ Пустая фраза")
+            return None
+        
+        clean_text = ' '.join(text.strip().split())
+        
+        if not self.use_edge_tts:
+            result = await self.generate_audio_async(clean_text, language)
+            if not result:
+                return None
+            
+            data = await asyncio.to_thread(Path(result['filepath']).read_bytes)
+            
+            async def iterate_file():
+                yield data
+            return result['filename'], iterate_file()
+        
+        gender = gender or 'female'
+        filename = phrase_filename(clean_text, language)
+        key = f"{gender}/{language}/{filename}"
+        
+        # Подготовка файла идет в пуле потоков, поэтому одновременные
+        # запуски того же синтеза объединяются до регистрации рассылки
+        chunks = self._streams.get(key)
+        if chunks is None:
+            (filename, chunks), _ = await self._inflight.do_async(
+                f"stream/{key}", self._start_stream_async, key, clean_text, language, gender, voice_name
+            )
+        
+        return filename, chunks.__aiter__()
+    
+    async def _start_stream_async(self, key: str, text: str, language: str, gender: str,
+                                  voice_name: Optional[str]) -> Tuple[str, ChunkBroadcast]:
+        """Запуск потокового синтеза и регистрация его рассылки"""
+        filename, chunks = await self.edge_tts_generator.stream_audio_async(
+            text, language, gender, voice_name, on_complete=self._record_stream
+        )
+        # Закрытая рассылка - готовый файл, регистрировать нечего
+        if not chunks.closed:
+            self._track_stream(key, chunks)
+        return filename, chunks
+    
+    def _track_stream(self, key: str, chunks: ChunkBroadcast):
+        """Регистрация потокового синтеза до его завершения"""
+        self._streams[key] = chunks
+        
+        def forget():
+            with self._streams_lock:
+                if self._streams.get(key) is chunks:
+                    del self._streams[key]
+        
+        chunks.add_done_callback(forget)
+    
+    @staticmethod
+    def _iter_file(filepath: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Чтение файла блоками"""
+        with open(filepath, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
     
     def _generate_with_gtts(self, text: str, language: str = 'en') -> Optional[Dict]:
         """Генерация с использованием gTTS"""
         # Генерация имени файла
-        filename = self._generate_filename(text, language)
+        filename = phrase_filename(text, language)
         
         # Создаем подпапку для языка
         save_dir = Path(self.BASE_OUTPUT_DIR) / language
@@ -175,8 +366,14 @@ class SpeechGenerator:
                 slow=False
             )
             
-            # Сохраняем в файл
-            tts.save(str(filepath))
+            # Сохраняем во временный файл и атомарно переименовываем
+            temp_file = f"{filepath}.{uuid.uuid4().hex}.part"
+            try:
+                tts.save(temp_file)
+                os.replace(temp_file, filepath)
+            finally:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
             
             # Добавляем задержку между запросами
             time.sleep(self.REQUEST_DELAY)
@@ -219,24 +416,21 @@ class SpeechGenerator:
         clean_text = ' '.join(text.strip().split())
         
         # Генерация имени файла
-        filename = self._generate_filename(clean_text, language)
+        text_hash = phrase_hash(clean_text)
+        filename = f"{language}_{text_hash}.mp3"
         
-        if self.use_edge_tts and gender:
-            # Для Edge-TTS проверяем в подпапке гендера
-            filepath = Path(self.BASE_OUTPUT_DIR) / gender / language / filename
-        else:
-            # Для gTTS или без гендера проверяем в подпапке языка
-            filepath = Path(self.BASE_OUTPUT_DIR) / language / filename
-        
-        exists = filepath.exists() and filepath.stat().st_size > 0
+        # Для Edge-TTS проверяем в подпапке гендера,
+        # для gTTS или без гендера - в подпапке языка
+        index_gender = gender if self.use_edge_tts and gender else None
+        record = self.manifest.get(index_gender, language, text_hash)
         
         return {
-            'exists': exists,
+            'exists': record is not None,
             'text': clean_text,
             'language': language,
             'gender': gender,
             'filename': filename,
-            'filepath': str(filepath) if exists else None,
+            'filepath': record.path if record else None,
             'engine': self.engine_type
         }
     
@@ -256,35 +450,33 @@ class SpeechGenerator:
         # Нормализуем текст
         clean_text = ' '.join(text.strip().split())
         
-        filename = self._generate_filename(clean_text, language)
+        text_hash = phrase_hash(clean_text)
+        filename = f"{language}_{text_hash}.mp3"
         
         if self.use_edge_tts:
             # Для Edge-TTS ищем в структуре гендер/язык
             if gender:
-                # Ищем в конкретном гендере
-                gender_dir = Path(self.BASE_OUTPUT_DIR) / gender
-                if gender_dir.exists():
-                    filepath = gender_dir / language / filename
-                    if filepath.exists() and filepath.stat().st_size > 0:
-                        return {
-                            'exists': True,
-                            'text': clean_text,
-                            'language': language,
-                            'gender': gender,
-                            'filename': filename,
-                            'filepath': str(filepath),
-                            'engine': self.engine_type
-                        }
+                record = self.manifest.get(gender, language, text_hash)
+                if record:
+                    return {
+                        'exists': True,
+                        'text': clean_text,
+                        'language': language,
+                        'gender': gender,
+                        'filename': filename,
+                        'filepath': record.path,
+                        'engine': self.engine_type
+                    }
         else:
             # Для gTTS ищем в структуре язык
-            lang_filepath = Path(self.BASE_OUTPUT_DIR) / language / filename
-            if lang_filepath.exists() and lang_filepath.stat().st_size > 0:
+            record = self.manifest.get(None, language, text_hash)
+            if record:
                 return {
                     'exists': True,
                     'text': clean_text,
                     'language': language,
                     'filename': filename,
-                    'filepath': str(lang_filepath),
+                    'filepath': record.path,
                     'engine': self.engine_type
                 }
         
@@ -316,4 +508,5 @@ class SpeechGenerator:
     
     def cleanup(self):
         """Очистка ресурсов"""
-        pass
\ No newline at end of file
+        if self.use_edge_tts:
+            self.edge_tts_generator.shutdown()
\ No newline at end of file
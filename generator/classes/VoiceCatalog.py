@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import edge_tts
+
+from .AsyncLoopRunner import AsyncLoopRunner
+
+# Стандартные голоса: используются, пока нет кэша и каталог не загружен
+DEFAULT_VOICES = {
+    'en': {
+        'male': ['en-US-ChristopherNeural', 'en-US-EricNeural', 'en-GB-RyanNeural'],
+        'female': ['en-US-AriaNeural', 'en-US-JennyNeural', 'en-GB-SoniaNeural']
+    },
+    'ru': {
+        'male': ['ru-RU-DmitryNeural', 'ru-RU-SergeyNeural'],
+        'female': ['ru-RU-SvetlanaNeural', 'ru-RU-DariyaNeural']
+    }
+}
+
+# Файл кэша по умолчанию: generator/cache/edge_tts_voices.json
+DEFAULT_CACHE_FILE = str(Path(__file__).resolve().parent.parent / 'cache' / 'edge_tts_voices.json')
+
+# Время жизни кэша по умолчанию - сутки
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class VoiceCatalog:
+    """
+    Каталог голосов Edge-TTS с локальным JSON-кэшем
+
+    Каталог загружается при первом обращении: из кэша, если он есть,
+    иначе используются стандартные голоса. Если кэша нет или он старше
+    ttl, список голосов обновляется в фоне, без блокировки вызывающего.
+    """
+
+    def __init__(self, runner: AsyncLoopRunner, cache_file: Optional[str] = None, ttl: Optional[float] = None):
+        """
+        Инициализация каталога
+
+        Args:
+            runner: Фоновый event loop для запросов к Edge-TTS
+            cache_file: Путь к JSON-кэшу (по умолчанию VOICE_CACHE_FILE из окружения)
+            ttl: Время жизни кэша в секундах (по умолчанию VOICE_CACHE_TTL из окружения)
+        """
+        self._runner = runner
+        self.cache_file = cache_file or os.environ.get('VOICE_CACHE_FILE', DEFAULT_CACHE_FILE)
+        self.ttl = ttl if ttl is not None else float(os.environ.get('VOICE_CACHE_TTL', DEFAULT_TTL))
+
+        self._voices: Optional[Dict[str, Dict[str, List[str]]]] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = None
+
+    @property
+    def voices(self) -> Dict[str, Dict[str, List[str]]]:
+        """Голоса, сгруппированные по языкам и гендерам"""
+        if self._voices is None:
+            with self._lock:
+                if self._voices is None:
+                    self._load_cache()
+
+        if self.is_stale():
+            self.refresh_in_background()
+
+        return self._voices
+
+    def is_stale(self) -> bool:
+        """Кэш отсутствует или старше ttl"""
+        return time.time() - self._fetched_at >= self.ttl
+
+    def _load_cache(self):
+        """Чтение кэша с диска (без обращения к сети)"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            self._voices = cached['voices']
+            self._fetched_at = float(cached.get('fetched_at', 0))
+            print(f"✓ Голоса Edge-TTS загружены из кэша: {len(self._voices)} языков")
+        except FileNotFoundError:
+            self._voices = DEFAULT_VOICES
+            print("⚠️ Кэш голосов Edge-TTS не найден, используются стандартные голоса")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self._voices = DEFAULT_VOICES
+            print(f"⚠️ Ошибка чтения кэша голосов Edge-TTS: {e}")
+
+    def _save_cache(self):
+        """Атомарная запись кэша"""
+        cache_path = Path(self.cache_file)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = f"{cache_path}.{uuid.uuid4().hex}.part"
+
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': self._fetched_at, 'voices': self._voices}, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, cache_path)
+        except OSError as e:
+            print(f"⚠️ Не удалось сохранить кэш голосов Edge-TTS: {e}")
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+
+    @staticmethod
+    async def _fetch_async() -> Dict[str, Dict[str, List[str]]]:
+        """Асинхронная загрузка всех доступных голосов Edge-TTS"""
+        voices = await edge_tts.list_voices()
+        organized_voices = {}
+
+        for voice in voices:
+            locale = voice['Locale']
+            short_name = voice['ShortName']
+            gender = voice['Gender'].lower()
+
+            # Извлекаем код языка (первые 2 символа)
+            lang_code = locale[:2].lower() if len(locale) >= 2 else 'en'
+
+            if lang_code not in organized_voices:
+                organized_voices[lang_code] = {'male': [], 'female': []}
+
+            organized_voices[lang_code].setdefault(gender, []).append(short_name)
+
+        return organized_voices
+
+    async def _refresh_async(self) -> bool:
+        try:
+            voices = await self._fetch_async()
+        except Exception as e:
+            print(f"⚠️ Ошибка загрузки голосов Edge-TTS: {e}")
+            return False
+
+        if not voices:
+            return False
+
+        self._voices = voices
+        self._fetched_at = time.time()
+        self._save_cache()
+        print(f"✓ Загружено голосов Edge-TTS для {len(voices)} языков")
+        return True
+
+    def refresh_in_background(self):
+        """
+        Обновление каталога в фоновом loop
+
+        Повторный вызов во время обновления ничего не делает.
+        """
+        with self._lock:
+            if self._refreshing is not None:
+                return
+            future = self._runner.submit(self._refresh_async())
+            self._refreshing = future
+
+        def done(_):
+            with self._lock:
+                self._refreshing = None
+                # Неудачная попытка повторяется не раньше чем через минуту
+                if self.is_stale():
+                    self._fetched_at = time.time() - self.ttl + 60
+
+        future.add_done_callback(done)
+
+    def refresh(self, timeout: Optional[float] = None) -> bool:
+        """
+        Синхронное обновление каталога
+
+        Args:
+            timeout: Максимальное время ожидания в секундах
+
+        Returns:
+            True если каталог обновлен
+        """
+        if self._voices is None:
+            self._load_cache()
+        return self._runner.run(self._refresh_async(), timeout)
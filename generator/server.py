@@ -5,8 +5,15 @@
 
 import sys
 import os
+import json
+import hashlib
+import time
+import threading
 from pathlib import Path
-from flask import Flask, request, jsonify, send_file
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
 from datetime import datetime
 
 app = Flask(__name__)
@@ -50,7 +57,7 @@ except Exception as e:
         
         def find_audio_file(self, text, language='en', gender=None):
             # Тестовая реализация для отладки
-            filename = f"{language}_{hashlib.md5(text.encode('utf-8')).hexdigest()}.mp3"
+            filename = phrase_filename(text, language)
             filepath = Path(self.base_dir) / "female" / language / filename
             
             if filepath.exists():
@@ -73,20 +80,95 @@ except Exception as e:
         
         def _check_internet_connection(self):
             return True
-        
-        def _get_all_categories(self):
-            # Простая реализация для тестирования
-            base_dir = Path(self.base_dir)
-            categories = []
-            if base_dir.exists():
-                for item in base_dir.iterdir():
-                    if item.is_dir():
-                        categories.append(item.name)
-            return categories
     
     speech_generator = DummySpeechGenerator()
     print("⚠️ Используется заглушка SpeechGenerator")
 
+# Пакетные запросы: максимум элементов и потоков синтеза
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', '500'))
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('BATCH_MAX_WORKERS', '4')),
+    thread_name_prefix='batch-synthesis'
+)
+# Элементы пакетов, ожидающие свободного потока синтеза (для /api/health)
+batch_queue = {'queued': 0}
+batch_queue_lock = threading.Lock()
+
+# Таблица имя файла -> путь, общая с путем записи генератора
+if hasattr(speech_generator, 'manifest'):
+    audio_manifest = speech_generator.manifest
+else:
+    from classes.AudioManifest import AudioManifest
+    audio_manifest = AudioManifest(BASE_OUTPUT_DIR).build()
+
+from classes.PhraseKey import phrase_filename, phrase_hash
+
+# Кэш содержимого часто запрашиваемых аудиофайлов (AUDIO_CACHE_MB, AUDIO_CACHE_ENTRY_KB)
+from classes.AudioByteCache import AudioByteCache
+
+audio_cache = AudioByteCache.from_env()
+
+# Время кэширования аудио клиентом: имена файлов содержат хэш фразы
+AUDIO_MAX_AGE = int(os.environ.get('AUDIO_MAX_AGE', '31536000'))
+
+# Способ отдачи аудиофайлов (AUDIO_SERVE_MODE):
+#   python     - частые файлы из кэша в памяти, остальные через send_file
+#   sendfile   - send_file без кэша: wsgi.file_wrapper (os.sendfile в gunicorn)
+#   x-accel    - только заголовок X-Accel-Redirect, файл отдает nginx
+#                (internal location AUDIO_ACCEL_PREFIX с alias на BASE_AUDIO_DIR)
+#   x-sendfile - только заголовок X-Sendfile (Apache mod_xsendfile, lighttpd)
+AUDIO_SERVE_MODES = ('python', 'sendfile', 'x-accel', 'x-sendfile')
+AUDIO_SERVE_MODE = os.environ.get('AUDIO_SERVE_MODE', 'python').strip().lower()
+if AUDIO_SERVE_MODE not in AUDIO_SERVE_MODES:
+    print(f"⚠️ Неизвестный AUDIO_SERVE_MODE '{AUDIO_SERVE_MODE}', используется python")
+    AUDIO_SERVE_MODE = 'python'
+AUDIO_ACCEL_PREFIX = os.environ.get('AUDIO_ACCEL_PREFIX', '/protected-audio').rstrip('/')
+
+# Пакеты аудиофайлов по категориям (utilites/AudioBundleBuilder.py)
+from classes.AudioBundle import AudioBundleStore
+
+audio_bundles = AudioBundleStore(os.path.join(BASE_OUTPUT_DIR, '.bundles'))
+
+# Размер части тела при отдаче данных из отображения пакета
+MEMORYVIEW_CHUNK = 64 * 1024
+
+# Фоновая проверка состояния: /api/health отдает последний снимок
+from classes.HealthMonitor import HealthMonitor
+
+def _queue_depth():
+    """Генерации в процессе и элементы пакетов в очереди пула синтеза"""
+    inflight = getattr(speech_generator, '_inflight', None)
+    with batch_queue_lock:
+        queued = batch_queue['queued']
+    return (len(inflight) if inflight is not None else 0) + queued
+
+health_monitor = HealthMonitor(
+    BASE_OUTPUT_DIR,
+    manifest=audio_manifest,
+    queue_depth=_queue_depth,
+    interval=float(os.environ.get('HEALTH_CHECK_INTERVAL', '30')),
+    min_free_mb=float(os.environ.get('HEALTH_MIN_FREE_MB', '100')),
+    extra_checks={'audio_cache': audio_cache.stats}
+)
+
+# Фоновое обновление индекса аудиофайлов (inotify или периодический проход);
+# AUDIO_MANIFEST_WATCH=0 отключает
+AUDIO_MANIFEST_WATCH = os.environ.get('AUDIO_MANIFEST_WATCH', '1').lower() in ('1', 'true', 'yes')
+
+@app.before_request
+def start_background_tasks():
+    """
+    Запуск фоновых потоков при первом запросе в каждом процессе
+
+    При импорте потоки запустились бы только в мастер-процессе gunicorn
+    (--preload), и воркеры отдавали бы снимок, замерший на момент fork.
+    Первый снимок снимается синхронно, поэтому уже первый запрос
+    к /api/health нового воркера получает актуальное состояние.
+    """
+    health_monitor.start()
+    if AUDIO_MANIFEST_WATCH:
+        audio_manifest.start_watching(float(os.environ.get('AUDIO_MANIFEST_REFRESH_INTERVAL', '60')))
+
 @app.before_request
 def handle_options():
     """
@@ -352,44 +434,335 @@ def check_audio():
             "timestamp": str(datetime.now())
         }), 500
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
+def _parse_batch_items(data):
     """
-    Проверка работоспособности сервера
+    Разбор и дедупликация элементов пакетного запроса
+    
+    Args:
+        data: JSON запроса - массив или объект с полем items
+    
+    Returns:
+        tuple: (уникальные элементы {ключ: элемент}, индексы по ключам,
+                ошибки по индексам) или None при неверном формате
+    """
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return None
+    
+    unique = {}
+    indexes = {}
+    errors = {}
+    
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = "Item must be an object"
+            continue
+        
+        text = str(item.get('text') or '').strip()
+        language = str(item.get('language') or 'en').strip().lower()
+        gender = str(item.get('gender') or 'male').strip().lower()
+        voice_name = str(item.get('voice_name') or '').strip()
+        
+        if not text:
+            errors[index] = "Text field is required"
+            continue
+        if language not in ['en', 'ru']:
+            errors[index] = "Language must be 'en' or 'ru'"
+            continue
+        if gender not in ['male', 'female']:
+            errors[index] = "Gender must be 'male' or 'female'"
+            continue
+        
+        # Ключ дедупликации: хэш нормализованного текста
+        key = (gender, language, phrase_hash(text))
+        
+        if key not in unique:
+            unique[key] = {
+                'text': text,
+                'language': language,
+                'gender': gender,
+                'voice_name': voice_name
+            }
+        indexes.setdefault(key, []).append(index)
+    
+    return unique, indexes, errors
+
+def _batch_error_results(errors):
+    """Результаты для некорректных элементов пакета"""
+    return [
+        {"index": [index], "status": "error", "message": message}
+        for index, message in errors.items()
+    ]
+
+def _wants_ndjson():
+    """Клиент запросил потоковый ответ NDJSON"""
+    return (request.args.get('stream', '').lower() in ('1', 'true', 'yes') or
+            'application/x-ndjson' in request.headers.get('Accept', ''))
+
+def _ndjson_response(results):
+    """Потоковый ответ: одна строка JSON на результат по мере готовности"""
+    def generate():
+        for result in results:
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _collect_batch_response(results, total, unique):
+    """
+    Ответ одним JSON с результатами в порядке индексов запроса
+
+    Args:
+        results: Результаты элементов (включая ошибки разбора)
+        total: Число элементов запроса
+        unique: Число уникальных корректных элементов
+    """
+    results = sorted(results, key=lambda result: result['index'][0])
+    return jsonify({
+        "status": "success",
+        "data": {
+            "count": total,
+            "unique": unique,
+            "results": results
+        },
+        "timestamp": str(datetime.now())
+    }), 200
+
+@app.route('/api/check-audio/batch', methods=['POST'])
+def check_audio_batch():
+    """
+    Пакетная проверка существования аудиофайлов
     """
     try:
-        print(f"\n[{datetime.now()}] GET /api/health")
+        print(f"\n[{datetime.now()}] POST /api/check-audio/batch")
         
-        # Проверка директорий
-        base_dir = Path(BASE_OUTPUT_DIR)
+        data = request.get_json(silent=True)
+        parsed = _parse_batch_items(data) if data is not None else None
         
-        checks = {
-            "server": "running",
-            "audio_directory": base_dir.exists(),
-            "base_output_dir": BASE_OUTPUT_DIR,
-            "json_file": json_file.exists(),
-            "internet_connection": speech_generator._check_internet_connection() if hasattr(speech_generator, '_check_internet_connection') else True,
-            "timestamp": str(datetime.now())
-        }
+        if parsed is None:
+            return jsonify({
+                "status": "error",
+                "message": "JSON array of {text, language, gender} items is required",
+                "timestamp": str(datetime.now())
+            }), 400
+        
+        unique, indexes, errors = parsed
+        total = sum(len(i) for i in indexes.values()) + len(errors)
         
-        all_ok = all([checks.get('audio_directory'), checks.get('json_file'), checks.get('internet_connection')])
+        if total > BATCH_MAX_ITEMS:
+            return jsonify({
+                "status": "error",
+                "message": f"Too many items (max {BATCH_MAX_ITEMS})",
+                "timestamp": str(datetime.now())
+            }), 413
+        
+        # Все проверки - поиск в индексе, один проход
+        results = _batch_error_results(errors)
+        for key, item in unique.items():
+            found_file = speech_generator.find_audio_file(item['text'], item['language'], gender=item['gender'])
+            results.append({
+                "index": indexes[key],
+                "status": "found" if found_file else "not_found",
+                "text": item['text'],
+                "language": item['language'],
+                "gender": item['gender'],
+                "filename": found_file['filename'] if found_file else None
+            })
+        
+        print(f"Checked {len(unique)} unique of {total} items")
         
-        status = "healthy" if all_ok else "degraded"
-        print(f"Health check: {status}")
+        if _wants_ndjson():
+            return _ndjson_response(results)
+        return _collect_batch_response(results, total, len(unique))
         
+    except Exception as e:
+        print(f"Ошибка в /api/check-audio/batch: {str(e)}")
         return jsonify({
-            "status": status,
-            "checks": checks
-        }), 200 if all_ok else 503
+            "status": "error",
+            "message": f"Error: {str(e)}",
+            "timestamp": str(datetime.now())
+        }), 500
+
+def _submit_batch_item(item):
+    """Постановка элемента пакета в пул синтеза с учетом очереди"""
+    with batch_queue_lock:
+        batch_queue['queued'] += 1
+    return batch_executor.submit(_generate_batch_item, item)
+
+def _generate_batch_item(item):
+    """Генерация одного элемента пакета (выполняется в пуле потоков)"""
+    # Элемент покинул очередь: дальше он учитывается как генерация в процессе
+    with batch_queue_lock:
+        batch_queue['queued'] -= 1
+    
+    generation_result = speech_generator.generate_audio(
+        item['text'], item['language'], gender=item['gender'],
+        voice_name=item['voice_name'] if item['voice_name'] else None
+    )
+    
+    if not generation_result:
+        return {"status": "error", "message": "Failed to generate audio file"}
+    
+    return {
+        "status": "ok" if generation_result.get('already_exists') else "success",
+        "filename": generation_result['filename'],
+        "voice": generation_result.get('voice', 'default'),
+        "file_size_kb": round(generation_result['file_size'] / 1024, 2)
+    }
+
+@app.route('/api/generate-audio/batch', methods=['POST'])
+def generate_audio_batch():
+    """
+    Пакетная генерация аудиофайлов: существующие файлы возвращаются сразу,
+    недостающие синтезируются параллельно
+    """
+    try:
+        print(f"\n[{datetime.now()}] POST /api/generate-audio/batch")
+        
+        data = request.get_json(silent=True)
+        parsed = _parse_batch_items(data) if data is not None else None
+        
+        if parsed is None:
+            return jsonify({
+                "status": "error",
+                "message": "JSON array of {text, language, gender} items is required",
+                "timestamp": str(datetime.now())
+            }), 400
+        
+        unique, indexes, errors = parsed
+        total = sum(len(i) for i in indexes.values()) + len(errors)
+        
+        if total > BATCH_MAX_ITEMS:
+            return jsonify({
+                "status": "error",
+                "message": f"Too many items (max {BATCH_MAX_ITEMS})",
+                "timestamp": str(datetime.now())
+            }), 413
+        
+        ready = _batch_error_results(errors)
+        futures = {}
+        
+        # Существующие файлы - из индекса, недостающие - в пул синтеза
+        for key, item in unique.items():
+            base = {
+                "index": indexes[key],
+                "text": item['text'],
+                "language": item['language'],
+                "gender": item['gender']
+            }
+            check_result = speech_generator.check_audio_exists(item['text'], item['language'], gender=item['gender'])
+            
+            if check_result['exists']:
+                ready.append(dict(base, status="ok", filename=check_result['filename']))
+            else:
+                futures[_submit_batch_item(item)] = base
+        
+        print(f"Batch: {total} items, {len(unique)} unique, {len(futures)} to generate")
+        
+        def completed():
+            yield from ready
+            for future in as_completed(futures):
+                base = futures[future]
+                try:
+                    yield dict(base, **future.result())
+                except Exception as e:
+                    yield dict(base, status="error", message=str(e))
+        
+        if _wants_ndjson():
+            return _ndjson_response(completed())
+        return _collect_batch_response(list(completed()), total, len(unique))
         
     except Exception as e:
-        print(f"Ошибка в health check: {str(e)}")
+        print(f"Критическая ошибка в /api/generate-audio/batch: {str(e)}")
+        import traceback
+        traceback.print_exc()
         return jsonify({
-            "status": "unhealthy",
-            "error": str(e),
+            "status": "error",
+            "message": f"Internal server error: {str(e)}",
             "timestamp": str(datetime.now())
         }), 500
 
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    """
+    Проверка работоспособности сервера: последний снимок фоновых проверок
+    """
+    snapshot = health_monitor.snapshot
+    
+    if snapshot is None:
+        return jsonify({
+            "status": "starting",
+            "message": "Health checks have not completed yet",
+            "timestamp": str(datetime.now())
+        }), 503
+    
+    return jsonify({
+        "status": snapshot['status'],
+        "checks": snapshot['checks'],
+        "age_seconds": round(time.time() - snapshot['checked_at'], 1)
+    }), 200 if snapshot['status'] == 'healthy' else 503
+
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """
+    Liveness: процесс отвечает на запросы
+    """
+    return jsonify({
+        "status": "alive",
+        "timestamp": str(datetime.now())
+    }), 200
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """
+    Readiness: директория с аудио доступна и есть свободное место
+    """
+    snapshot = health_monitor.snapshot
+    ready = bool(snapshot and snapshot['ready'])
+    
+    return jsonify({
+        "status": "ready" if ready else "not_ready",
+        "timestamp": str(datetime.now())
+    }), 200 if ready else 503
+
+def _audio_response(record, data=None):
+    """
+    Ответ с аудиофайлом: ETag, Last-Modified, Cache-Control,
+    304 на условные запросы и 206 на запросы диапазона
+
+    В режимах x-accel и x-sendfile тело не отправляется: файл отдает
+    фронтовой сервер по заголовку, Python проверяет только условный запрос.
+    
+    Args:
+        record: Запись индекса (AudioRecord)
+        data: Содержимое файла из кэша или None для отдачи с диска
+    """
+    offload = AUDIO_SERVE_MODE in ('x-accel', 'x-sendfile')
+    
+    if offload:
+        response = Response(mimetype='audio/mpeg')
+    elif data is None:
+        response = send_file(record.path, mimetype='audio/mpeg', conditional=False, etag=False, max_age=AUDIO_MAX_AGE)
+    else:
+        response = Response(data, mimetype='audio/mpeg')
+    
+    response.headers['ETag'] = record.etag
+    response.last_modified = record.mtime_ns // 1_000_000_000
+    # В индексе только файлы вида {язык}_{md5}.mp3
+    response.cache_control.public = True
+    response.cache_control.max_age = AUDIO_MAX_AGE
+    response.cache_control.immutable = True
+    
+    if offload:
+        response = response.make_conditional(request)
+        if response.status_code == 200:
+            if AUDIO_SERVE_MODE == 'x-accel':
+                relative_path = Path(record.path).relative_to(audio_manifest.base_dir).as_posix()
+                response.headers['X-Accel-Redirect'] = f"{AUDIO_ACCEL_PREFIX}/{quote(relative_path)}"
+            else:
+                response.headers['X-Sendfile'] = record.path
+        return response
+    
+    return response.make_conditional(request, accept_ranges=True, complete_length=record.size)
+
 @app.route('/api/get-audio/<path:filename>', methods=['GET'])
 def get_audio(filename):
     """
@@ -402,38 +775,28 @@ def get_audio(filename):
         safe_filename = os.path.basename(filename)
         print(f"Looking for file: {safe_filename}")
         
-        # Ищем во всех возможных местах
-        search_paths = []
-        
-        # Сначала в структуре gender/language
-        for gender in ['male', 'female']:
-            for lang in ['en', 'ru']:
-                search_paths.append(Path(BASE_OUTPUT_DIR) / gender / lang / safe_filename)
-        
-        # Затем в структуре language
-        for lang in ['en', 'ru']:
-            search_paths.append(Path(BASE_OUTPUT_DIR) / lang / safe_filename)
-        
-        # Ищем в категориях если доступно
-        if hasattr(speech_generator, '_get_all_categories'):
-            categories = speech_generator._get_all_categories()
-            for category in categories:
-                search_paths.append(Path(BASE_OUTPUT_DIR) / category / safe_filename)
-        
-        # И в корне
-        search_paths.append(Path(BASE_OUTPUT_DIR) / safe_filename)
+        # Поиск в индексе: без обращения к файловой системе
+        record = audio_manifest.resolve(safe_filename)
         
-        # Ищем файл
-        for filepath in search_paths:
-            if filepath.exists() and filepath.is_file():
-                print(f"Found file at: {filepath}")
-                return send_file(str(filepath), mimetype='audio/mpeg')
+        if record:
+            print(f"Found file at: {record.path}")
+            try:
+                # Частые фразы отдаются из памяти, остальные - с диска
+                data = None
+                if AUDIO_SERVE_MODE == 'python':
+                    data = audio_cache.load(record.path, record.size, record.mtime_ns)
+                return _audio_response(record, data)
+            except RequestedRangeNotSatisfiable as e:
+                return e
+            except FileNotFoundError:
+                # Файл удален в обход индекса
+                audio_manifest.remove_file(record.path)
+                audio_cache.discard(record.path)
         
-        print(f"File not found in {len(search_paths)} locations")
+        print("File not found")
         return jsonify({
             "status": "error",
             "message": "Audio file not found",
-            "searched_paths": [str(p) for p in search_paths],
             "timestamp": str(datetime.now())
         }), 404
         
@@ -445,6 +808,338 @@ def get_audio(filename):
             "timestamp": str(datetime.now())
         }), 500
 
+@app.route('/api/audio-cache', methods=['GET'])
+def audio_cache_stats():
+    """
+    Счетчики кэша аудиофайлов в памяти
+    """
+    return jsonify({
+        "status": "success",
+        "cache": audio_cache.stats(),
+        "timestamp": str(datetime.now())
+    }), 200
+
+def _iter_memoryview(view):
+    """
+    Тело ответа из среза отображения пакета
+
+    WSGI требует bytes (PEP 3333), поэтому срез копируется частями
+    по MEMORYVIEW_CHUNK непосредственно перед записью в сокет.
+    """
+    for start in range(0, len(view), MEMORYVIEW_CHUNK):
+        yield view[start:start + MEMORYVIEW_CHUNK].tobytes()
+
+def _memoryview_response(response, view):
+    """
+    Условный ответ и Range над memoryview без чтения файла
+
+    Args:
+        response: Пустой ответ с заголовками (ETag, Cache-Control)
+        view: Данные из отображения пакета
+
+    Raises:
+        RequestedRangeNotSatisfiable: если диапазон не может быть удовлетворен
+    """
+    response = response.make_conditional(request, accept_ranges=True, complete_length=len(view))
+    if response.status_code == 206:
+        view = view[response.content_range.start:response.content_range.stop]
+    elif response.status_code != 200:
+        return response
+
+    # Диапазон вырезается из среза до копирования
+    response.response = _iter_memoryview(view)
+    response.content_length = len(view)
+    return response
+
+def _bundle_not_found():
+    return jsonify({
+        "status": "error",
+        "message": "Bundle not found",
+        "timestamp": str(datetime.now())
+    }), 404
+
+def _bundle_headers(response, bundle):
+    """ETag и Last-Modified пакета; пакет пересобирается, поэтому клиент перепроверяет его"""
+    response.headers['ETag'] = bundle.etag
+    response.last_modified = bundle.mtime_ns // 1_000_000_000
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/bundles', methods=['GET'])
+def list_bundles():
+    """
+    Список пакетов аудиофайлов по категориям (utilites/AudioBundleBuilder.py)
+    """
+    return jsonify({
+        "status": "success",
+        "bundles": audio_bundles.list(),
+        "timestamp": str(datetime.now())
+    }), 200
+
+@app.route('/api/bundles/<gender>/<language>/<name>', methods=['GET'])
+def get_bundle(gender, language, name):
+    """
+    Пакет категории целиком; поддерживает Range для загрузки частями
+    """
+    try:
+        bundle = audio_bundles.get(gender, language, name)
+        if bundle is None:
+            return _bundle_not_found()
+
+        response = send_file(bundle.path, mimetype='application/octet-stream', conditional=False, etag=False)
+        _bundle_headers(response, bundle)
+        return response.make_conditional(request, accept_ranges=True, complete_length=bundle.size)
+    except RequestedRangeNotSatisfiable as e:
+        return e
+    except (OSError, ValueError) as e:
+        print(f"Ошибка в /api/bundles: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Error: {str(e)}",
+            "timestamp": str(datetime.now())
+        }), 500
+
+@app.route('/api/bundles/<gender>/<language>/<name>/index', methods=['GET'])
+def get_bundle_index(gender, language, name):
+    """
+    Индекс пакета: md5 фразы -> [смещение, длина] в файле пакета
+
+    Клиент загружает пакет целиком или запрашивает диапазоны по индексу.
+    """
+    try:
+        bundle = audio_bundles.get(gender, language, name)
+        if bundle is None:
+            return _bundle_not_found()
+
+        response = jsonify({
+            "status": "success",
+            "size": bundle.size,
+            "count": bundle.count,
+            "data_offset": bundle.data_offset,
+            "entries": {phrase_md5: [offset, length] for phrase_md5, offset, length in bundle.entries()},
+            "timestamp": str(datetime.now())
+        })
+        _bundle_headers(response, bundle)
+        return response.make_conditional(request)
+    except ValueError as e:
+        print(f"Ошибка в /api/bundles: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Error: {str(e)}",
+            "timestamp": str(datetime.now())
+        }), 500
+
+@app.route('/api/bundles/<gender>/<language>/<name>/<phrase_md5>.mp3', methods=['GET'])
+def get_bundle_audio(gender, language, name, phrase_md5):
+    """
+    Аудиофайл одной фразы из пакета (без отдельного файла на диске)
+    """
+    try:
+        bundle = audio_bundles.get(gender, language, name)
+        view = bundle.view(phrase_md5) if bundle is not None else None
+        if view is None:
+            return jsonify({
+                "status": "error",
+                "message": "Audio file not found",
+                "timestamp": str(datetime.now())
+            }), 404
+
+        # URL фразы не меняется при пересборке пакета: клиент перепроверяет по ETag версии пакета
+        response = Response(mimetype='audio/mpeg')
+        _bundle_headers(response, bundle)
+        response.headers['ETag'] = bundle.entry_etag(phrase_md5)
+        return _memoryview_response(response, view)
+    except RequestedRangeNotSatisfiable as e:
+        return e
+    except ValueError as e:
+        print(f"Ошибка в /api/bundles: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Error: {str(e)}",
+            "timestamp": str(datetime.now())
+        }), 500
+
+@app.route('/api/stream-audio', methods=['GET', 'POST'])
+def stream_audio():
+    """
+    Потоковая генерация аудио: фрагменты MP3 отдаются клиенту по мере
+    синтеза и одновременно сохраняются в кэш-файл
+    
+    Параметры (query string для GET или JSON для POST): text, language, gender, voice_name
+    """
+    try:
+        print(f"\n[{datetime.now()}] {request.method} /api/stream-audio")
+        
+        data = request.get_json(silent=True) if request.method == 'POST' else request.args
+        
+        if not data:
+            return jsonify({
+                "status": "error",
+                "message": "No parameters provided",
+                "timestamp": str(datetime.now())
+            }), 400
+        
+        text = (data.get('text') or '').strip()
+        language = (data.get('language') or 'en').strip().lower()
+        gender = (data.get('gender') or 'male').strip().lower()
+        voice_name = (data.get('voice_name') or '').strip()
+        
+        if not text:
+            return jsonify({
+                "status": "error",
+                "message": "Text field is required",
+                "timestamp": str(datetime.now())
+            }), 400
+        
+        if language not in ['en', 'ru']:
+            return jsonify({
+                "status": "error",
+                "message": "Language must be 'en' or 'ru'",
+                "timestamp": str(datetime.now())
+            }), 400
+        
+        if gender not in ['male', 'female']:
+            return jsonify({
+                "status": "error",
+                "message": "Gender must be 'male' or 'female'",
+                "timestamp": str(datetime.now())
+            }), 400
+        
+        stream = None
+        if hasattr(speech_generator, 'stream_audio'):
+            stream = speech_generator.stream_audio(
+                text, language, gender=gender, voice_name=voice_name if voice_name else None
+            )
+        
+        if stream:
+            filename, chunks = stream
+            # Ждем первый фрагмент: пока заголовки не отправлены, ошибку можно вернуть статусом
+            first_chunk = next(chunks, None)
+        
+        if not stream or first_chunk is None:
+            print("Ошибка: не удалось сгенерировать аудио")
+            return jsonify({
+                "status": "error",
+                "message": "Failed to generate audio",
+                "timestamp": str(datetime.now())
+            }), 500
+        
+        def generate():
+            yield first_chunk
+            yield from chunks
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='audio/mpeg',
+            headers={'X-Audio-Filename': filename}
+        )
+        
+    except Exception as e:
+        print(f"Ошибка в /api/stream-audio: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Error: {str(e)}",
+            "timestamp": str(datetime.now())
+        }), 500
+
+# Репозиторий фраз MySQL: пул соединений создается при первом запросе
+_phrase_repository = None
+
+def get_phrase_repository():
+    """Ленивая инициализация пула соединений и репозитория фраз"""
+    global _phrase_repository
+    if _phrase_repository is None:
+        from classes.DatabasePool import DatabasePool
+        from classes.PhraseRepository import PhraseRepository
+        _phrase_repository = PhraseRepository(DatabasePool.from_env(pool_name='api'))
+    return _phrase_repository
+
+def _etag_response(data):
+    """JSON-ответ с ETag по содержимому data и ответом 304 на If-None-Match"""
+    etag = hashlib.md5(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    
+    response = jsonify({
+        "status": "success",
+        "data": data,
+        "timestamp": str(datetime.now())
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response.make_conditional(request)
+
+@app.route('/api/phrases', methods=['GET'])
+def get_phrases():
+    """
+    Страница фраз из базы данных
+    
+    Параметры: category (тип фразы), q (полнотекстовый поиск),
+    cursor (next_cursor предыдущей страницы), limit (до 200)
+    """
+    try:
+        print(f"\n[{datetime.now()}] GET /api/phrases")
+        
+        category = request.args.get('category', '').strip()
+        search = request.args.get('q', '').strip()
+        cursor = request.args.get('cursor', '').strip()
+        
+        try:
+            limit = int(request.args.get('limit', '50'))
+        except ValueError:
+            limit = 0
+        
+        if limit <= 0:
+            return jsonify({
+                "status": "error",
+                "message": "limit must be a positive integer",
+                "timestamp": str(datetime.now())
+            }), 400
+        
+        try:
+            page = get_phrase_repository().list_phrases(
+                category=category or None,
+                search=search or None,
+                cursor=cursor or None,
+                limit=limit
+            )
+        except ValueError:
+            return jsonify({
+                "status": "error",
+                "message": "Invalid cursor",
+                "timestamp": str(datetime.now())
+            }), 400
+        
+        page['count'] = len(page['phrases'])
+        return _etag_response(page)
+        
+    except Exception as e:
+        print(f"Ошибка в /api/phrases: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Database unavailable: {str(e)}",
+            "timestamp": str(datetime.now())
+        }), 503
+
+@app.route('/api/phrases/categories', methods=['GET'])
+def get_phrase_categories():
+    """
+    Список типов фраз с количеством активных фраз
+    """
+    try:
+        categories = get_phrase_repository().list_categories()
+        return _etag_response({
+            "categories": categories,
+            "count": len(categories)
+        })
+        
+    except Exception as e:
+        print(f"Ошибка в /api/phrases/categories: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Database unavailable: {str(e)}",
+            "timestamp": str(datetime.now())
+        }), 503
+
 # Простой тестовый эндпоинт для проверки
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
@@ -458,9 +1153,21 @@ def test_endpoint():
         "endpoints": {
             "generate_audio": "POST /api/generate-audio",
             "check_audio": "POST /api/check-audio",
+            "generate_audio_batch": "POST /api/generate-audio/batch",
+            "check_audio_batch": "POST /api/check-audio/batch",
             "get_voices": "GET /api/get-voices",
             "health": "GET /api/health",
-            "get_audio": "GET /api/get-audio/<filename>"
+            "health_live": "GET /api/health/live",
+            "health_ready": "GET /api/health/ready",
+            "get_audio": "GET /api/get-audio/<filename>",
+            "audio_cache": "GET /api/audio-cache",
+            "bundles": "GET /api/bundles",
+            "bundle": "GET /api/bundles/<gender>/<language>/<name>",
+            "bundle_index": "GET /api/bundles/<gender>/<language>/<name>/index",
+            "bundle_audio": "GET /api/bundles/<gender>/<language>/<name>/<md5>.mp3",
+            "stream_audio": "GET|POST /api/stream-audio",
+            "phrases": "GET /api/phrases",
+            "phrase_categories": "GET /api/phrases/categories"
         }
     }), 200
 
@@ -476,6 +1183,7 @@ def server_info():
         "version": "1.0.0",
         "engine": "Edge-TTS",
         "base_directory": BASE_OUTPUT_DIR,
+        "audio_serve_mode": AUDIO_SERVE_MODE,
         "timestamp": str(datetime.now())
     }), 200
 
@@ -516,9 +1224,21 @@ if __name__ == '__main__':
     print(f"  GET  /api/info         - информация о сервере")
     print(f"  POST /api/generate-audio - генерация аудио")
     print(f"  POST /api/check-audio    - проверка существования файла")
+    print(f"  POST /api/generate-audio/batch - пакетная генерация аудио")
+    print(f"  POST /api/check-audio/batch    - пакетная проверка файлов")
     print(f"  GET  /api/get-voices     - получение списка голосов")
     print(f"  GET  /api/health         - проверка работоспособности")
+    print(f"  GET  /api/health/live    - liveness-проверка")
+    print(f"  GET  /api/health/ready   - readiness-проверка")
     print(f"  GET  /api/get-audio/<filename> - получение аудиофайла")
+    print(f"  GET  /api/audio-cache    - счетчики кэша аудиофайлов")
+    print(f"  GET  /api/bundles        - список пакетов аудиофайлов")
+    print(f"  GET  /api/bundles/<gender>/<language>/<name> - пакет категории (Range)")
+    print(f"  GET  /api/bundles/<gender>/<language>/<name>/index - индекс пакета")
+    print(f"  GET  /api/bundles/<gender>/<language>/<name>/<md5>.mp3 - аудио из пакета")
+    print(f"  GET  /api/stream-audio   - потоковая генерация аудио")
+    print(f"  GET  /api/phrases        - страница фраз из базы данных")
+    print(f"  GET  /api/phrases/categories - типы фраз")
     print("="*60)
     print(f"\nСервер запущен: {datetime.now()}")
     print("Ожидание запросов...")
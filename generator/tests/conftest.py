@@ -0,0 +1,36 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Модули генератора (classes.*) и утилиты (utilites/*.py) импортируются как в скриптах
+GENERATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(GENERATOR_DIR / 'utilites'))
+sys.path.insert(0, str(GENERATOR_DIR))
+
+
+@pytest.fixture(scope='session')
+def mysql_pool():
+    """
+    Пул к локальной тестовой базе MySQL
+
+    База задается переменной TEST_DB_NAME, сервер и учетная запись -
+    переменными DB_* (DatabasePool.from_env). Тесты пересоздают таблицы,
+    поэтому рабочую базу указывать нельзя. Без TEST_DB_NAME или без
+    сервера тесты пропускаются.
+    """
+    pytest.importorskip('mysql.connector')
+    from mysql.connector import Error
+    from classes.DatabasePool import DatabasePool
+
+    database = os.environ.get('TEST_DB_NAME')
+    if not database:
+        pytest.skip("TEST_DB_NAME не задана: тесты с MySQL пропущены")
+
+    pool = DatabasePool.from_env(database=database, pool_size=3, pool_name='eng_phrases_tests', max_retries=1)
+    try:
+        pool.get_connection().close()
+    except Error as e:
+        pytest.skip(f"MySQL недоступна: {e}")
+    return pool
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from classes.AsyncLoopRunner import AsyncLoopRunner
+from TTSLoopBenchmark import bench_new_loop_per_phrase, bench_runner_concurrent, bench_runner_sequential
+
+
+async def current_loop():
+    return asyncio.get_running_loop()
+
+
+@pytest.fixture
+def runner():
+    runner = AsyncLoopRunner(name='test-loop-runner')
+    yield runner
+    runner.stop()
+
+
+def test_run_reuses_one_loop(runner):
+    first = runner.run(current_loop())
+    second = runner.run(current_loop())
+
+    assert first is second is runner.loop
+    assert first.is_running()
+
+
+def test_loop_shared_between_threads(runner):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        loops = list(executor.map(lambda _: runner.run(current_loop()), range(32)))
+
+    assert {id(loop) for loop in loops} == {id(runner.loop)}
+
+
+def test_submit_returns_future(runner):
+    async def add(a, b):
+        await asyncio.sleep(0.01)
+        return a + b
+
+    future = runner.submit(add(2, 3))
+
+    assert isinstance(future, Future)
+    assert future.result(timeout=5) == 5
+
+
+def test_run_propagates_exceptions(runner):
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        runner.run(fail(), timeout=5)
+
+    # Loop продолжает работать после ошибки корутины
+    assert runner.run(current_loop()) is runner.loop
+
+
+def test_stop_closes_loop_and_thread(runner):
+    loop = runner.run(current_loop())
+    threads = {thread.name for thread in threading.enumerate()}
+    assert 'test-loop-runner' in threads
+
+    runner.stop()
+
+    assert loop.is_closed()
+    assert 'test-loop-runner' not in {thread.name for thread in threading.enumerate()}
+
+
+def test_restart_after_stop(runner):
+    old_loop = runner.run(current_loop())
+    runner.stop()
+
+    new_loop = runner.run(current_loop())
+
+    assert new_loop is not old_loop
+    assert new_loop.is_running()
+
+
+def test_stop_is_idempotent(runner):
+    runner.stop()
+    runner.run(current_loop())
+    runner.stop()
+    runner.stop()
+
+
+# Нагрузка для сравнения схем: заглушка синтеза из utilites/TTSLoopBenchmark.py
+BENCH_PHRASES = [f"phrase number {i}" for i in range(20)]
+BENCH_LATENCY = 0.02
+BENCH_REQUEST_DELAY = 0.01
+
+
+def test_overhead_new_loop_vs_runner(runner, tmp_path, record_property):
+    count = len(BENCH_PHRASES)
+    old = bench_new_loop_per_phrase(BENCH_PHRASES, str(tmp_path), BENCH_LATENCY, BENCH_REQUEST_DELAY)
+    sequential = bench_runner_sequential(runner, BENCH_PHRASES, str(tmp_path), BENCH_LATENCY)
+    concurrent = bench_runner_concurrent(runner, BENCH_PHRASES, str(tmp_path), BENCH_LATENCY,
+                                         workers=8, max_concurrent=4)
+
+    overhead = {
+        'new_loop_ms': (old / count - BENCH_LATENCY) * 1000,
+        'runner_ms': (sequential / count - BENCH_LATENCY) * 1000,
+    }
+    overhead['runner_concurrent_wall_ms'] = concurrent / count * 1000
+    for name, value in overhead.items():
+        record_property(name, round(value, 2))
+    print(f"\nНакладные на фразу: новый loop + задержка {overhead['new_loop_ms']:.2f} мс, "
+          f"постоянный loop {overhead['runner_ms']:.2f} мс, "
+          f"параллельно {overhead['runner_concurrent_wall_ms']:.2f} мс на фразу всего")
+
+    # Старая схема платит задержку на каждой фразе, постоянный loop - нет
+    assert overhead['new_loop_ms'] >= BENCH_REQUEST_DELAY * 1000
+    assert overhead['runner_ms'] < BENCH_REQUEST_DELAY * 1000
+    # Параллельные вызовы делят один loop: 4 синтеза одновременно
+    assert concurrent < sequential / 2
@@ -0,0 +1,170 @@
+import hashlib
+import os
+
+import pytest
+
+from classes.AudioBundle import AudioBundle, AudioBundleStore, bundle_name
+
+
+def md5(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+@pytest.fixture
+def audio_files(tmp_path):
+    """Аудиофайлы разной длины: md5 -> (путь, содержимое)"""
+    files = {}
+    for index in range(50):
+        data = bytes([index]) * (100 + index * 37)
+        path = tmp_path / 'voices' / f'{index}.mp3'
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(data)
+        files[md5(f'phrase {index}'.encode())] = (str(path), data)
+    return files
+
+
+@pytest.fixture
+def bundle_path(tmp_path, audio_files):
+    path = tmp_path / 'bundles' / 'male' / 'en' / 'travel.bundle'
+    result = AudioBundle.build(str(path), [(key, file[0]) for key, file in audio_files.items()])
+    assert result == {'count': len(audio_files), 'size': path.stat().st_size, 'missing': 0}
+    return path
+
+
+def test_round_trip(bundle_path, audio_files):
+    with AudioBundle(str(bundle_path)) as bundle:
+        assert len(bundle) == len(audio_files)
+        for key, (_, data) in audio_files.items():
+            assert key in bundle
+            assert bundle.read(key) == data
+
+            view = bundle.view(key)
+            assert isinstance(view, memoryview)
+            assert view == data
+
+            offset, length = bundle.find(key)
+            assert length == len(data)
+            assert bundle.data()[offset:offset + length] == data
+
+
+def test_entries_sorted_and_cover_data_area(bundle_path, audio_files):
+    with AudioBundle(str(bundle_path)) as bundle:
+        entries = list(bundle.entries())
+
+        assert [key for key, _, _ in entries] == sorted(audio_files)
+        assert entries[0][1] == bundle.data_offset
+        last_key, last_offset, last_length = max(entries, key=lambda entry: entry[1])
+        assert last_offset + last_length == bundle.size
+
+
+def test_unknown_and_invalid_keys(bundle_path):
+    with AudioBundle(str(bundle_path)) as bundle:
+        assert bundle.find('0' * 32) is None
+        assert bundle.view('f' * 32) is None
+        assert bundle.read('not-hex') is None
+
+
+def test_build_skips_missing_and_duplicates(tmp_path, audio_files):
+    items = [(key, file[0]) for key, file in audio_files.items()]
+    first_key, (first_path, first_data) = next(iter(audio_files.items()))
+    items += [(first_key, first_path), (md5(b'missing'), str(tmp_path / 'missing.mp3'))]
+
+    path = tmp_path / 'dup.bundle'
+    result = AudioBundle.build(str(path), items)
+
+    assert result['count'] == len(audio_files)
+    assert result['missing'] == 1
+    with AudioBundle(str(path)) as bundle:
+        assert bundle.read(first_key) == first_data
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.part')] == []
+
+
+def test_empty_bundle(tmp_path):
+    path = tmp_path / 'empty.bundle'
+    assert AudioBundle.build(str(path), [])['count'] == 0
+    with AudioBundle(str(path)) as bundle:
+        assert len(bundle) == 0
+        assert bundle.find('0' * 32) is None
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'foreign.bundle'
+    path.write_bytes(b'ID3' + b'\x00' * 64)
+
+    with pytest.raises(ValueError):
+        AudioBundle(str(path))
+
+
+def test_truncated_bundle_rejects_entries(bundle_path, audio_files):
+    size = bundle_path.stat().st_size
+    with open(bundle_path, 'r+b') as f:
+        f.truncate(size - 10)
+
+    with AudioBundle(str(bundle_path)) as bundle:
+        offsets = {}
+        for key in audio_files:
+            try:
+                offsets[key] = bundle.find(key)
+            except ValueError:
+                offsets[key] = None
+
+        # Обрезана только последняя запись области данных
+        assert list(offsets.values()).count(None) == 1
+        with pytest.raises(ValueError):
+            list(bundle.entries())
+
+
+def test_entry_etag_changes_on_rebuild(tmp_path, bundle_path, audio_files):
+    key, (path, data) = next(iter(audio_files.items()))
+    with AudioBundle(str(bundle_path)) as bundle:
+        before = bundle.entry_etag(key)
+
+    # Тот же хэш фразы и та же длина, другой звук
+    with open(path, 'wb') as f:
+        f.write(bytes([255]) * len(data))
+    stat = bundle_path.stat()
+    AudioBundle.build(str(bundle_path), [(k, file[0]) for k, file in audio_files.items()])
+    os.utime(bundle_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    with AudioBundle(str(bundle_path)) as bundle:
+        assert bundle.read(key) == bytes([255]) * len(data)
+        assert bundle.entry_etag(key) != before
+
+
+def test_close_with_held_slice(bundle_path, audio_files):
+    key, (_, data) = next(iter(audio_files.items()))
+    bundle = AudioBundle(str(bundle_path))
+    view = bundle.view(key)
+
+    bundle.close()
+
+    assert view == data
+
+
+def test_store_reopens_rebuilt_bundle(tmp_path, bundle_path, audio_files):
+    store = AudioBundleStore(str(tmp_path / 'bundles'))
+    first = store.get('male', 'en', 'travel')
+    assert store.get('male', 'en', 'travel') is first
+
+    stat = bundle_path.stat()
+    AudioBundle.build(str(bundle_path), [(key, file[0]) for key, file in list(audio_files.items())[:5]])
+    os.utime(bundle_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    second = store.get('male', 'en', 'travel')
+    assert second is not first
+    assert len(second) == 5
+    store.close()
+
+
+def test_store_rejects_unsafe_names(tmp_path, bundle_path):
+    store = AudioBundleStore(str(tmp_path / 'bundles'))
+
+    assert store.get('male', 'en', '..') is None
+    assert store.get('male', '../male/en', 'travel') is None
+    assert store.get('male', 'en', 'missing') is None
+
+
+def test_bundle_name():
+    assert bundle_name('Greetings (basic)') == 'greetings_basic'
+    assert bundle_name('Путешествия') == 'путешествия'
+    assert bundle_name('!!!') == 'category'
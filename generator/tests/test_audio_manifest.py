@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from classes.AudioManifest import AudioManifest
+
+PHRASE_HASH = '0123456789abcdef0123456789abcdef'
+FILENAME = f'en_{PHRASE_HASH}.mp3'
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    (tmp_path / 'male' / 'en').mkdir(parents=True)
+    return AudioManifest(str(tmp_path)).build()
+
+
+@pytest.fixture
+def no_stat(monkeypatch):
+    """Любое обращение к os.stat после построения индекса - ошибка теста"""
+    def fail(*args, **kwargs):
+        raise AssertionError(f"os.stat на промахе: {args[0]}")
+    monkeypatch.setattr(os, 'stat', fail)
+
+
+def test_resolve_miss_does_not_touch_filesystem(tmp_path, manifest, no_stat):
+    # Файл записан другим процессом после построения индекса
+    (tmp_path / 'male' / 'en' / FILENAME).write_bytes(b'mp3')
+
+    assert manifest.resolve(FILENAME) is None
+    assert manifest.resolve('not-audio.txt') is None
+
+
+def test_resolve_sees_file_after_add_file_and_refresh(tmp_path, manifest):
+    path = tmp_path / 'male' / 'en' / FILENAME
+    path.write_bytes(b'mp3')
+    manifest.add_file(str(path))
+    assert manifest.resolve(FILENAME).path == str(path)
+
+    legacy = tmp_path / 'en' / FILENAME
+    legacy.parent.mkdir()
+    legacy.write_bytes(b'mp3 legacy')
+    os.remove(path)
+    manifest.refresh()
+    assert manifest.resolve(FILENAME).path == str(legacy)
+
+
+def test_get_miss_does_not_touch_filesystem(tmp_path, manifest, no_stat):
+    (tmp_path / 'male' / 'en' / FILENAME).write_bytes(b'mp3')
+
+    assert manifest.get('male', 'en', PHRASE_HASH) is None
+    assert manifest.get(None, 'en', PHRASE_HASH) is None
+
+
+def test_refresh_merges_files_from_other_processes(tmp_path, manifest):
+    path = tmp_path / 'male' / 'en' / FILENAME
+    path.write_bytes(b'mp3')
+    manifest.refresh()
+
+    record = manifest.get('male', 'en', PHRASE_HASH)
+    assert record.path == str(path)
+    assert record.size == 3
+
+    os.remove(path)
+    manifest.refresh()
+    assert manifest.get('male', 'en', PHRASE_HASH) is None
@@ -0,0 +1,246 @@
+import pytest
+from mysql.connector import Error, errorcode, pooling
+
+from classes.DatabasePool import DatabasePool, is_transient
+
+
+def mysql_error(errno: int) -> Error:
+    return Error(msg=f"error {errno}", errno=errno)
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self.closed = False
+
+    def execute(self, query, params=()):
+        self.connection.queries.append((query, params))
+        if self.connection.execute_errors:
+            raise self.connection.execute_errors.pop(0)
+        self.rowcount = len(self.connection.rows)
+
+    def fetchall(self):
+        return list(self.connection.rows)
+
+    def fetchone(self):
+        return self.connection.rows[0] if self.connection.rows else None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, pool, ping_error=None):
+        self.pool = pool
+        self.ping_error = ping_error
+        self.rows = pool.rows
+        self.execute_errors = pool.execute_errors
+        self.queries = pool.queries
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def ping(self, reconnect=True, attempts=1, delay=0):
+        if self.ping_error is not None:
+            raise self.ping_error
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    """Заглушка MySQLConnectionPool: ошибки выдачи и ping по очереди"""
+
+    def __init__(self, outcomes=None, ping_errors=None, rows=None):
+        self.outcomes = list(outcomes or [])
+        self.ping_errors = list(ping_errors or [])
+        self.rows = rows or []
+        self.execute_errors = []
+        self.queries = []
+        self.connections = []
+
+    def get_connection(self):
+        if self.outcomes:
+            raise self.outcomes.pop(0)
+        ping_error = self.ping_errors.pop(0) if self.ping_errors else None
+        connection = FakeConnection(self, ping_error=ping_error)
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr('classes.DatabasePool.time.sleep', calls.append)
+    return calls
+
+
+def make_pool(fake: FakePool, max_retries: int = 3) -> DatabasePool:
+    db = DatabasePool('localhost', 'test', 'user', '', max_retries=max_retries, retry_delay=0.5)
+    db._pool = fake
+    return db
+
+
+def test_is_transient():
+    assert is_transient(mysql_error(errorcode.CR_SERVER_GONE_ERROR))
+    assert is_transient(mysql_error(errorcode.ER_LOCK_DEADLOCK))
+    assert is_transient(pooling.PoolError(msg="Failed getting connection; pool exhausted"))
+    assert not is_transient(mysql_error(errorcode.ER_PARSE_ERROR))
+
+
+def test_retry_transient_then_success(sleeps):
+    db = make_pool(FakePool())
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise mysql_error(errorcode.CR_SERVER_LOST)
+        return 'ok'
+
+    assert db._retry(operation) == 'ok'
+    assert len(attempts) == 3
+    # Экспоненциальная задержка
+    assert sleeps == [0.5, 1.0]
+
+
+def test_retry_does_not_repeat_permanent_errors(sleeps):
+    db = make_pool(FakePool())
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        raise mysql_error(errorcode.ER_PARSE_ERROR)
+
+    with pytest.raises(Error):
+        db._retry(operation)
+    assert len(attempts) == 1
+    assert sleeps == []
+
+
+def test_retry_gives_up_after_max_retries(sleeps):
+    db = make_pool(FakePool(), max_retries=2)
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        raise mysql_error(errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+    with pytest.raises(Error):
+        db._retry(operation)
+    assert len(attempts) == 3
+    assert len(sleeps) == 2
+
+
+def test_connection_returns_to_pool(sleeps):
+    fake = FakePool()
+    db = make_pool(fake)
+
+    with db.connection() as connection:
+        assert not connection.closed
+    assert connection.closed
+
+    with pytest.raises(RuntimeError):
+        with db.connection() as connection:
+            raise RuntimeError("fail")
+    assert connection.closed
+
+
+def test_connection_retries_exhausted_pool_and_dead_connection(sleeps):
+    dead = mysql_error(errorcode.CR_SERVER_GONE_ERROR)
+    fake = FakePool([pooling.PoolError(msg="pool exhausted")], ping_errors=[dead])
+    db = make_pool(fake)
+
+    with db.connection() as connection:
+        pass
+
+    # Соединение с неудачным ping закрыто, выдано следующее
+    assert len(fake.connections) == 2
+    assert fake.connections[0].closed
+    assert connection is fake.connections[1]
+    assert len(sleeps) == 2
+
+
+def test_execute_commits_and_fetches(sleeps):
+    fake = FakePool(rows=[{'id': 1}, {'id': 2}])
+    db = make_pool(fake)
+
+    assert db.execute("SELECT id FROM phrases") == [{'id': 1}, {'id': 2}]
+    assert db.execute("SELECT id FROM phrases", fetch='one') == {'id': 1}
+    assert db.execute("UPDATE phrases SET is_active = TRUE", fetch=None) == 2
+    assert all(connection.commits == 1 and connection.closed for connection in fake.connections)
+
+
+def test_execute_rolls_back_and_retries_deadlock(sleeps):
+    fake = FakePool(rows=[{'id': 1}])
+    fake.execute_errors.append(mysql_error(errorcode.ER_LOCK_DEADLOCK))
+    db = make_pool(fake)
+
+    assert db.execute("SELECT id FROM phrases") == [{'id': 1}]
+    first, second = fake.connections
+    assert (first.rollbacks, first.commits, first.closed) == (1, 0, True)
+    assert (second.rollbacks, second.commits, second.closed) == (0, 1, True)
+
+
+def test_cursor_rolls_back_on_exception(sleeps):
+    fake = FakePool()
+    db = make_pool(fake)
+
+    with pytest.raises(ValueError):
+        with db.cursor() as cursor:
+            cursor.execute("DELETE FROM phrases")
+            raise ValueError("stop")
+
+    connection = fake.connections[0]
+    assert (connection.rollbacks, connection.commits) == (1, 0)
+    assert cursor.closed and connection.closed
+
+
+def test_mysql_execute_and_rollback(mysql_pool):
+    assert mysql_pool.execute("SELECT 1 AS one") == [{'one': 1}]
+    assert mysql_pool.execute("SELECT %s AS value", ('phrase',), fetch='one') == {'value': 'phrase'}
+
+    mysql_pool.execute("DROP TABLE IF EXISTS pool_test", fetch=None)
+    mysql_pool.execute("CREATE TABLE pool_test (id INT PRIMARY KEY) ENGINE=InnoDB", fetch=None)
+    try:
+        assert mysql_pool.execute("INSERT INTO pool_test VALUES (1), (2)", fetch=None) == 2
+
+        with pytest.raises(RuntimeError):
+            with mysql_pool.cursor() as cursor:
+                cursor.execute("INSERT INTO pool_test VALUES (3)")
+                raise RuntimeError("rollback")
+
+        assert mysql_pool.execute("SELECT COUNT(*) AS count FROM pool_test", fetch='one') == {'count': 2}
+    finally:
+        mysql_pool.execute("DROP TABLE IF EXISTS pool_test", fetch=None)
+
+
+def test_mysql_killed_connection_is_replaced(mysql_pool):
+    import mysql.connector
+
+    with mysql_pool.connection() as connection:
+        victim_id = connection.connection_id
+
+    # Простаивающее в пуле соединение закрывается сервером (как по wait_timeout)
+    killer = mysql.connector.connect(host=mysql_pool.host, port=mysql_pool.port, user=mysql_pool.user,
+                                     password=mysql_pool.password, database=mysql_pool.database)
+    try:
+        cursor = killer.cursor()
+        cursor.execute(f"KILL {victim_id}")
+        cursor.close()
+    finally:
+        killer.close()
+
+    # ping при выдаче переподключает соединение: запросы проходят на всех соединениях пула
+    for _ in range(mysql_pool.pool_size + 1):
+        assert mysql_pool.execute("SELECT 1 AS one", fetch='one') == {'one': 1}
@@ -0,0 +1,63 @@
+import hashlib
+
+import pytest
+
+from classes.PhraseKey import (clean_phrase, normalize_phrase, phrase_filename, phrase_hash,
+                               phrase_hashes, phrase_key, phrase_keys)
+from PhraseKeyBenchmark import EDGE_CASES, js_hashes, load_corpus
+
+from conftest import GENERATOR_DIR
+
+
+@pytest.fixture(scope='module')
+def texts():
+    corpus = load_corpus(str(GENERATOR_DIR / 'phrases.json'))
+    return [text for _, text in corpus] + EDGE_CASES
+
+
+def test_normalize_matches_client_rules():
+    assert normalize_phrase('  Hello \t  World\n') == 'hello world'
+    # NFC: составной и готовый символ дают одну строку
+    assert normalize_phrase('Cafe\u0301') == normalize_phrase('Caf\u00e9') == 'caf\u00e9'
+    # Пробелы JavaScript \s, которые str.split() не считает пробелами, и наоборот
+    assert normalize_phrase('Zero\ufeffwidth') == 'zero width'
+    assert normalize_phrase('Field\x1fseparator') == 'field\x1fseparator'
+
+
+def test_hash_and_key_format():
+    digest = hashlib.md5('hello world'.encode('utf-8')).hexdigest()
+
+    assert phrase_hash('Hello   World') == digest
+    assert phrase_key('Hello World', 'en') == f'en_{digest}'
+    assert phrase_filename('Hello World', 'ru') == f'ru_{digest}.mp3'
+
+
+def test_clean_phrase_drops_bracket_notes():
+    assert clean_phrase('  Take  off (a plane) [phr. v.] ') == 'Take off'
+
+
+def test_batch_matches_single(texts):
+    assert phrase_hashes(texts) == [phrase_hash(text) for text in texts]
+    assert phrase_keys(texts, 'en') == [phrase_key(text, 'en') for text in texts]
+
+
+def test_matches_client_hash(texts):
+    client = js_hashes(texts)
+    if client is None:
+        pytest.skip("node не установлен")
+
+    mismatches = [text for text, ours, theirs in zip(texts, phrase_hashes(texts), client) if ours != theirs]
+    assert mismatches == []
+
+
+def test_matches_tts3_filenames(tmp_path):
+    generator_module = pytest.importorskip('SpeechGenerator_tts3')
+    generator = generator_module.EnhancedSpeechGenerator(use_edge_tts=False, output_dir=str(tmp_path))
+    corpus = load_corpus(str(GENERATOR_DIR / 'phrases.json'))
+    phrase_types = {'en': 'target', 'ru': 'native'}
+
+    mismatches = [
+        text for language, text in corpus
+        if generator._plan_audio(text, phrase_types[language])['filename'] != phrase_filename(text, language)
+    ]
+    assert mismatches == []
@@ -0,0 +1,168 @@
+import pytest
+
+from classes.PhraseRepository import PhraseRepository
+
+
+class StubPool:
+    """Заглушка DatabasePool.execute: запоминает запросы, отдает заданные строки"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def execute(self, query, params=None, **kwargs):
+        self.calls.append((query, params))
+        return self.rows[:params[-1]] if params else self.rows
+
+
+# Фразы тестовой базы: (тип, английский, русский, активна); типы вперемешку,
+# чтобы порядок (type_id, id) отличался от порядка вставки
+PHRASES = [
+    ('travel', 'Where is the airport?', 'Где аэропорт?', True),
+    ('food', 'I would like a coffee', 'Я бы хотел кофе', True),
+    ('travel', 'Where is the train station?', 'Где вокзал?', True),
+    ('travel', 'An old airport phrase', 'Старая фраза', False),
+    ('food', 'The bill, please', 'Счет, пожалуйста', True),
+    ('travel', 'I need a taxi', 'Мне нужно такси', True),
+    ('travel', 'The airport bus is late', 'Автобус в аэропорт опаздывает', True),
+    ('food', 'Is this dish spicy?', 'Это блюдо острое?', True),
+    ('travel', 'How much is a ticket?', 'Сколько стоит билет?', True),
+]
+
+
+def rows(count, type_id=1, start=1):
+    return [{'id': start + index, 'type_id': type_id, 'type_name': f'type {type_id}',
+             'target_text': f'target {start + index}', 'native_text': f'native {start + index}'}
+            for index in range(count)]
+
+
+@pytest.mark.parametrize('type_id, phrase_id', [(1, 1), (7, 123456), (0, 0)])
+def test_cursor_round_trip(type_id, phrase_id):
+    cursor = PhraseRepository.encode_cursor(type_id, phrase_id)
+
+    assert PhraseRepository.decode_cursor(cursor) == (type_id, phrase_id)
+
+
+@pytest.mark.parametrize('cursor', ['', '5', 'a-b', '1-x', '-1', '1-2-3'])
+def test_decode_rejects_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        PhraseRepository.decode_cursor(cursor)
+
+
+def test_first_page_has_next_cursor():
+    pool = StubPool(rows(5, type_id=2, start=10))
+    page = PhraseRepository(pool).list_phrases(limit=3)
+
+    assert [phrase['id'] for phrase in page['phrases']] == [10, 11, 12]
+    assert page['phrases'][0] == {'id': 10, 'type': 'type 2', 'target': 'target 10', 'native': 'native 10'}
+    assert page['next_cursor'] == '2-12'
+    # Запрашивается на одну строку больше страницы
+    assert pool.calls[0][1] == (4,)
+
+
+def test_last_page_has_no_cursor():
+    page = PhraseRepository(StubPool(rows(2))).list_phrases(limit=3)
+
+    assert len(page['phrases']) == 2
+    assert page['next_cursor'] is None
+
+
+def test_cursor_and_filters_become_keyset_params():
+    pool = StubPool([])
+    PhraseRepository(pool).list_phrases(category='travel', search='airport', cursor='2-12', limit=10)
+
+    query, params = pool.calls[0]
+    assert params == ('travel', 'airport', 2, 2, 12, 11)
+    assert "(p.type_id > %s OR (p.type_id = %s AND p.id > %s))" in query
+    assert "ORDER BY p.type_id, p.id" in query
+
+
+def test_limit_is_clamped():
+    pool = StubPool([])
+    repository = PhraseRepository(pool)
+
+    repository.list_phrases(limit=0)
+    repository.list_phrases(limit=10_000)
+
+    assert [params[-1] for _, params in pool.calls] == [2, PhraseRepository.MAX_LIMIT + 1]
+
+
+def test_invalid_cursor_fails_before_query():
+    pool = StubPool([])
+
+    with pytest.raises(ValueError):
+        PhraseRepository(pool).list_phrases(cursor='bogus')
+    assert pool.calls == []
+
+
+@pytest.fixture(scope='module')
+def phrase_db(mysql_pool):
+    """Таблицы PhraseDatabaseImporter (с FULLTEXT индексом) и тестовые фразы"""
+    from PhraseDatabaseImporter import PhraseDatabaseImporter
+
+    importer = PhraseDatabaseImporter(mysql_pool.host, mysql_pool.database, mysql_pool.user,
+                                      mysql_pool.password, mysql_pool.port, pool=mysql_pool)
+    importer.connect()
+    try:
+        importer.create_tables()
+    finally:
+        importer.disconnect()
+
+    with mysql_pool.cursor() as cursor:
+        cursor.executemany("INSERT INTO phrase_types (type_name) VALUES (%s)", [('travel',), ('food',)])
+        cursor.executemany(
+            "INSERT INTO phrases (type_id, target_text, native_text, is_active) "
+            "SELECT id, %s, %s, %s FROM phrase_types WHERE type_name = %s",
+            [(target, native, active, type_name) for type_name, target, native, active in PHRASES]
+        )
+
+    yield PhraseRepository(mysql_pool)
+
+    mysql_pool.execute("DROP TABLE IF EXISTS phrases", fetch=None)
+    mysql_pool.execute("DROP TABLE IF EXISTS phrase_types", fetch=None)
+
+
+def read_all(repository, **filters):
+    """Все страницы подряд: (страницы, фразы)"""
+    pages, phrases, cursor = [], [], None
+    while True:
+        page = repository.list_phrases(cursor=cursor, **filters)
+        pages.append(page)
+        phrases.extend(page['phrases'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages, phrases
+
+
+def test_mysql_keyset_pages_cover_active_phrases(phrase_db):
+    pages, phrases = read_all(phrase_db, limit=3)
+
+    active = [phrase for phrase in PHRASES if phrase[3]]
+    assert [len(page['phrases']) for page in pages] == [3, 3, 2]
+    assert len({phrase['id'] for phrase in phrases}) == len(active)
+    # Сначала все фразы первого типа (travel), внутри типа - по id
+    assert [phrase['type'] for phrase in phrases] == ['travel'] * 5 + ['food'] * 3
+    assert [phrase['target'] for phrase in phrases] == \
+        [target for _, target, _, _ in sorted(active, key=lambda p: p[0] != 'travel')]
+    ids = [phrase['id'] for phrase in phrases]
+    assert ids[:5] == sorted(ids[:5]) and ids[5:] == sorted(ids[5:])
+
+
+def test_mysql_category_filter(phrase_db):
+    _, phrases = read_all(phrase_db, category='food', limit=2)
+
+    assert [phrase['native'] for phrase in phrases] == ['Я бы хотел кофе', 'Счет, пожалуйста', 'Это блюдо острое?']
+
+
+def test_mysql_fulltext_search_with_cursor(phrase_db):
+    pages, phrases = read_all(phrase_db, search='airport', limit=1)
+
+    # Неактивная фраза с тем же словом не попадает в выдачу
+    assert len(pages) == 2
+    assert {phrase['target'] for phrase in phrases} == {'Where is the airport?', 'The airport bus is late'}
+
+
+def test_mysql_list_categories(phrase_db):
+    categories = phrase_db.list_categories()
+
+    assert [(row['type_name'], row['phrase_count']) for row in categories] == [('travel', 5), ('food', 3)]
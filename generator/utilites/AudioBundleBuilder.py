@@ -0,0 +1,166 @@
+import sys
+import json
+import os
+import time
+import uuid
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.AudioBundle import AudioBundle, BUNDLE_SUFFIX, BUNDLES_INDEX, bundle_name
+from classes.PhraseKey import clean_phrase, phrase_hashes
+
+# Настройка логирования
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+# Язык фраз по полю JSON
+LANGUAGE_BY_TYPE = {'target': 'en', 'native': 'ru'}
+
+
+class AudioBundleBuilder:
+    def __init__(self, json_file: str, base_dir: str, output_dir: str = None,
+                 genders: List[str] = None):
+        """
+        Инициализация сборщика пакетов
+
+        Для каждой категории phrases.json, языка и гендера все аудиофайлы
+        фраз собираются в один файл пакета (classes/AudioBundle.py).
+
+        Args:
+            json_file: Путь к JSON файлу с фразами
+            base_dir: Директория с аудиофайлами
+            output_dir: Директория пакетов (по умолчанию base_dir/.bundles)
+            genders: Гендеры голосов (по умолчанию male и female)
+        """
+        self.json_file = json_file
+        self.base_dir = Path(base_dir)
+        self.output_dir = Path(output_dir) if output_dir else self.base_dir / '.bundles'
+        self.genders = genders or ['male', 'female']
+
+        # Статистика
+        self.stats = {
+            'categories': 0,
+            'bundles': 0,
+            'files': 0,
+            'missing': 0,
+            'bytes': 0
+        }
+
+    def _audio_path(self, gender: str, language: str, phrase_hash: str) -> str:
+        """Путь к аудиофайлу: gender/language, иначе старая папка language"""
+        filename = f"{language}_{phrase_hash}.mp3"
+        path = self.base_dir / gender / language / filename
+        if not path.exists():
+            legacy = self.base_dir / language / filename
+            if legacy.exists():
+                return str(legacy)
+        return str(path)
+
+    def run(self) -> Dict:
+        """
+        Сборка всех пакетов и индекса bundles.json
+
+        Returns:
+            Словарь со статистикой
+        """
+        start_time = time.perf_counter()
+
+        with open(self.json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        bundles = []
+        for category, phrases_list in data.items():
+            self.stats['categories'] += 1
+            name = bundle_name(category)
+
+            for phrase_type, language in LANGUAGE_BY_TYPE.items():
+                texts = [clean_phrase(pair[phrase_type]) for pair in phrases_list
+                         if pair.get(phrase_type, '').strip()]
+                hashes = phrase_hashes(texts)
+
+                for gender in self.genders:
+                    files = [(digest, self._audio_path(gender, language, digest)) for digest in hashes]
+                    output = self.output_dir / gender / language / f"{name}{BUNDLE_SUFFIX}"
+
+                    result = AudioBundle.build(str(output), files)
+                    self.stats['missing'] += result['missing']
+
+                    if result['count'] == 0:
+                        os.remove(output)
+                        continue
+
+                    self.stats['bundles'] += 1
+                    self.stats['files'] += result['count']
+                    self.stats['bytes'] += result['size']
+                    bundles.append({
+                        'category': category,
+                        'name': name,
+                        'language': language,
+                        'gender': gender,
+                        'count': result['count'],
+                        'size': result['size'],
+                        'missing': result['missing']
+                    })
+                    logger.info(f"✓ {gender}/{language}/{name}: {result['count']} файлов, "
+                                f"{result['size'] / 1024:.1f} KB (нет файлов: {result['missing']})")
+
+        self._save_index(bundles)
+
+        self.stats['elapsed'] = time.perf_counter() - start_time
+        self.print_stats()
+        return self.stats
+
+    def _save_index(self, bundles: List[Dict]):
+        """Атомарная запись bundles.json"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        index_file = self.output_dir / BUNDLES_INDEX
+        temp_file = index_file.with_name(f"{index_file.name}.{uuid.uuid4().hex}.part")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'built_at': time.time(), 'bundles': bundles}, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, index_file)
+        logger.info(f"✓ Индекс пакетов сохранен: {index_file}")
+
+    def print_stats(self):
+        """Вывод статистики"""
+        print("\n" + "="*60)
+        print("СТАТИСТИКА СБОРКИ ПАКЕТОВ")
+        print("="*60)
+        print(f"Категорий: {self.stats['categories']}")
+        print(f"Пакетов: {self.stats['bundles']}")
+        print(f"Файлов в пакетах: {self.stats['files']}")
+        print(f"Отсутствующих файлов: {self.stats['missing']}")
+        print(f"Объем: {self.stats['bytes'] / (1024 * 1024):.2f} MB")
+        print(f"Время: {self.stats['elapsed']:.1f} с")
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(
+        description='Сборка пакетов аудиофайлов по категориям phrases.json'
+    )
+
+    parser.add_argument('json_file', help='Путь к JSON файлу с фразами')
+    parser.add_argument('directory', help='Директория с аудиофайлами')
+    parser.add_argument('--output', help='Директория пакетов (по умолчанию: <directory>/.bundles)')
+    parser.add_argument('--genders', nargs='+', default=['male', 'female'],
+                        help='Гендеры голосов (по умолчанию: male female)')
+
+    args = parser.parse_args()
+
+    if not Path(args.json_file).exists():
+        logger.error(f"Файл не найден: {args.json_file}")
+        sys.exit(1)
+
+    AudioBundleBuilder(args.json_file, args.directory, args.output, args.genders).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import os
+import errno
+import hashlib
+import time
+import uuid
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Настройка логирования
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+
+class AudioDeduplicator:
+    def __init__(self, base_dir: str, mode: str = 'hardlink', workers: int = 8, dry_run: bool = False):
+        """
+        Инициализация дедупликатора аудиофайлов
+
+        Одинаковые по содержимому файлы заменяются жесткими ссылками на один
+        экземпляр. Пути и имена файлов не меняются, поэтому сервер и индекс
+        аудиофайлов продолжают работать как раньше.
+
+        Args:
+            base_dir: Директория с аудиофайлами
+            mode: 'hardlink' - ссылки на первый из одинаковых файлов,
+                  'blob' - ссылки на экземпляр в хранилище .blobs/<md5>.mp3
+            workers: Количество потоков хэширования
+            dry_run: Режим тестирования (только отчет, без изменений)
+        """
+        self.base_dir = Path(base_dir).resolve()
+        self.mode = mode
+        self.workers = workers
+        self.dry_run = dry_run
+        self.blob_dir = self.base_dir / '.blobs'
+
+        # Статистика
+        self.stats = {
+            'total_files': 0,
+            'hashed_files': 0,
+            'duplicate_groups': 0,
+            'files_linked': 0,
+            'bytes_reclaimed': 0,
+            'errors': 0
+        }
+
+    def scan(self) -> List[Tuple[str, os.stat_result]]:
+        """
+        Сканирование директории через os.scandir (скрытые папки пропускаются)
+
+        Returns:
+            Список (путь, stat) MP3 файлов
+        """
+        files = []
+        stack = [str(self.base_dir)]
+
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith('.'):
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and entry.name.lower().endswith('.mp3'):
+                            files.append((entry.path, entry.stat(follow_symlinks=False)))
+            except OSError as e:
+                logger.error(f"Ошибка чтения директории {directory}: {e}")
+                self.stats['errors'] += 1
+
+        logger.info(f"Найдено {len(files)} MP3 файлов")
+        return files
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """MD5 содержимого файла"""
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def find_duplicates(self, files: List[Tuple[str, os.stat_result]]) -> Dict[str, List[List[Tuple[str, os.stat_result]]]]:
+        """
+        Поиск одинаковых файлов: группировка по размеру, затем хэш содержимого
+
+        Хэшируются только файлы, у которых есть другой файл того же размера.
+        Пути, уже связанные жесткими ссылками (один inode), хэшируются один раз.
+
+        Returns:
+            Словарь md5 -> список inode, каждый inode - список (путь, stat)
+        """
+        by_size: Dict[Tuple[int, int], Dict[int, List[Tuple[str, os.stat_result]]]] = {}
+        for path, stat in files:
+            by_size.setdefault((stat.st_dev, stat.st_size), {}).setdefault(stat.st_ino, []).append((path, stat))
+
+        candidates = []
+        for inodes in by_size.values():
+            if len(inodes) > 1:
+                candidates.extend(inodes.values())
+
+        logger.info(f"Кандидатов на сравнение (одинаковый размер): {len(candidates)}")
+
+        def hash_one(paths):
+            try:
+                return self.file_hash(paths[0][0]), paths
+            except OSError as e:
+                logger.error(f"Ошибка чтения {paths[0][0]}: {e}")
+                return None, paths
+
+        by_hash: Dict[str, List[List[Tuple[str, os.stat_result]]]] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for content_hash, paths in executor.map(hash_one, candidates):
+                if content_hash is None:
+                    self.stats['errors'] += 1
+                    continue
+                self.stats['hashed_files'] += 1
+                by_hash.setdefault(content_hash, []).append(paths)
+
+        return {content_hash: inodes for content_hash, inodes in by_hash.items() if len(inodes) > 1}
+
+    def _link(self, source: str, target: str):
+        """Атомарная замена target жесткой ссылкой на source"""
+        temp_file = f"{target}.{uuid.uuid4().hex}.part"
+        os.link(source, temp_file)
+        try:
+            os.replace(temp_file, target)
+        except OSError:
+            os.remove(temp_file)
+            raise
+
+    def _canonical(self, content_hash: str, inodes: List[List[Tuple[str, os.stat_result]]]) -> Tuple[str, List]:
+        """
+        Выбор экземпляра, на который будут указывать ссылки
+
+        Returns:
+            Кортеж (путь экземпляра, список inode для замены ссылками)
+        """
+        # Экземпляр - inode с наибольшим числом ссылок: меньше замен
+        inodes = sorted(inodes, key=lambda paths: (-len(paths), paths[0][0]))
+
+        if self.mode != 'blob':
+            return inodes[0][0][0], inodes[1:]
+
+        blob_path = self.blob_dir / content_hash[:2] / f"{content_hash}.mp3"
+
+        if not blob_path.exists():
+            if self.dry_run:
+                return str(blob_path), inodes[1:]
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.link(inodes[0][0][0], blob_path)
+
+        blob_ino = blob_path.stat().st_ino
+        return str(blob_path), [paths for paths in inodes if paths[0][1].st_ino != blob_ino]
+
+    def deduplicate(self, duplicates: Dict[str, List[List[Tuple[str, os.stat_result]]]]):
+        """Замена дубликатов жесткими ссылками"""
+        for content_hash, inodes in duplicates.items():
+            self.stats['duplicate_groups'] += 1
+            try:
+                canonical, to_link = self._canonical(content_hash, inodes)
+            except OSError as e:
+                logger.error(f"Ошибка создания экземпляра {content_hash}: {e}")
+                self.stats['errors'] += 1
+                continue
+
+            for paths in to_link:
+                linked = 0
+                for path, stat in paths:
+                    if self.dry_run:
+                        logger.debug(f"DRY RUN: {path} -> {canonical}")
+                    else:
+                        try:
+                            self._link(canonical, path)
+                            logger.debug(f"Ссылка: {path} -> {canonical}")
+                        except OSError as e:
+                            if e.errno == errno.EXDEV:
+                                logger.warning(f"Другая файловая система, пропущен: {path}")
+                            else:
+                                logger.error(f"Ошибка замены {path}: {e}")
+                            self.stats['errors'] += 1
+                            continue
+                    linked += 1
+
+                self.stats['files_linked'] += linked
+
+                # Место освобождается, только если заменены все ссылки на inode
+                stat = paths[0][1]
+                if linked == len(paths) and stat.st_nlink <= len(paths):
+                    self.stats['bytes_reclaimed'] += stat.st_size
+
+    def run(self) -> Dict:
+        """
+        Запуск дедупликации
+
+        Returns:
+            Словарь со статистикой
+        """
+        logger.info(f"Начинаем сканирование директории: {self.base_dir}")
+        logger.info(f"Режим: {self.mode}, тестирование: {'ДА' if self.dry_run else 'НЕТ'}, потоков: {self.workers}")
+
+        start_time = time.perf_counter()
+
+        files = self.scan()
+        self.stats['total_files'] = len(files)
+
+        duplicates = self.find_duplicates(files)
+        self.deduplicate(duplicates)
+
+        self.stats['elapsed'] = time.perf_counter() - start_time
+        self.print_stats()
+
+        return self.stats
+
+    def print_stats(self):
+        """Вывод статистики"""
+        print("\n" + "="*60)
+        print("СТАТИСТИКА ДЕДУПЛИКАЦИИ")
+        print("="*60)
+        print(f"Всего MP3 файлов: {self.stats['total_files']}")
+        print(f"Хэшировано файлов: {self.stats['hashed_files']}")
+        print(f"Групп одинаковых файлов: {self.stats['duplicate_groups']}")
+        print(f"Заменено ссылками: {self.stats['files_linked']}")
+        print(f"Освобождено: {self.stats['bytes_reclaimed'] / (1024 * 1024):.2f} MB")
+        print(f"Ошибок: {self.stats['errors']}")
+        print(f"Время: {self.stats['elapsed']:.1f} с")
+
+        if self.dry_run:
+            print("\n⚠️  РЕЖИМ ТЕСТИРОВАНИЯ - файлы не были изменены!")
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(
+        description='Дедупликация аудиофайлов по содержимому (жесткие ссылки)'
+    )
+
+    parser.add_argument('directory', help='Директория с аудиофайлами')
+    parser.add_argument('--mode', choices=['hardlink', 'blob'], default='hardlink',
+                        help='hardlink - ссылки на первый файл, blob - на экземпляр в .blobs/ (по умолчанию: hardlink)')
+    parser.add_argument('--workers', type=int, default=8, help='Потоков хэширования (по умолчанию: 8)')
+    parser.add_argument('--dry-run', action='store_true', help='Только отчет, без изменений')
+    parser.add_argument('--verbose', action='store_true', help='Подробный вывод (debug уровень)')
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    if not Path(args.directory).exists():
+        logger.error(f"Директория не существует: {args.directory}")
+        return
+
+    AudioDeduplicator(args.directory, args.mode, args.workers, args.dry_run).run()
+
+
+if __name__ == "__main__":
+    main()
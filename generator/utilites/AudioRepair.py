@@ -0,0 +1,194 @@
+import sys
+import json
+import time
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.AudioBatchProcessor import AudioBatchProcessor
+from SpeechGenerator_tts3 import EnhancedSpeechGenerator
+
+# Настройка логирования
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+
+class AudioRepair:
+    def __init__(self, json_file: str, base_dir: str, use_edge_tts: bool = True,
+                 workers: int = 3, requests_per_second: float = 5.0, max_retries: int = 3,
+                 verify_workers: int = 8, dry_run: bool = False):
+        """
+        Инициализация восстановления аудиофайлов
+
+        Сначала выполняется проверка (AudioBatchProcessor), затем в
+        конвейер синтеза отправляются только отсутствующие и поврежденные
+        файлы. Остальные фразы повторно не хэшируются и не проверяются.
+
+        Args:
+            json_file: Путь к JSON файлу с фразами
+            base_dir: Директория с аудиофайлами
+            use_edge_tts: Использовать Edge-TTS (True) или gTTS (False)
+            workers: Количество одновременных запросов синтеза
+            requests_per_second: Ограничение частоты запросов (0 - без ограничения)
+            max_retries: Количество повторов при ошибке синтеза
+            verify_workers: Количество потоков проверки MP3
+            dry_run: Режим тестирования (только отчет, без генерации)
+        """
+        self.json_file = json_file
+        self.base_dir = base_dir
+        self.verify_workers = verify_workers
+        self.dry_run = dry_run
+
+        self.processor = AudioBatchProcessor(base_dir)
+        self.generator = EnhancedSpeechGenerator(
+            use_edge_tts=use_edge_tts,
+            output_dir=base_dir,
+            max_workers=workers,
+            requests_per_second=requests_per_second,
+            max_retries=max_retries
+        )
+
+        # Статистика
+        self.stats = {
+            'missing': 0,
+            'corrupt': 0,
+            'repaired': 0,
+            'failed': 0,
+            'repaired_files': [],
+            'failed_files': []
+        }
+
+    def _plan(self, entry: Dict) -> Optional[Dict]:
+        """
+        Задание синтеза для записи отчета проверки
+
+        Путь и гендер берутся из отчета, поэтому файл создается там же,
+        где его ожидает сервер (gender/language или старая папка языка).
+        Поврежденный файл (запись с reason) перезаписывается.
+        """
+        plan = self.generator._plan_audio(entry['phrase'], entry['type'])
+        if plan is None:
+            return None
+
+        plan['filepath'] = Path(entry.get('expected_path') or entry['path'])
+        plan['filename'] = plan['filepath'].name
+        plan['voice_type'] = entry.get('gender')
+        plan['force'] = 'reason' in entry
+        return plan
+
+    def repair(self, entries: List[Dict]) -> List[Optional[Dict]]:
+        """Синтез списка файлов из отчета проверки (missing_files и corrupt_files)"""
+        plans = [self._plan(entry) for entry in entries]
+        return self.generator.generate_plans(plans)
+
+    def run(self) -> Dict:
+        """
+        Запуск: проверка, синтез недостающего, повторная проверка
+
+        Returns:
+            Словарь со статистикой
+        """
+        start_time = time.perf_counter()
+
+        verification = self.processor.verify_audio_files(self.json_file, workers=self.verify_workers)
+        missing = verification['missing_files']
+        corrupt = verification['corrupt_files']
+
+        self.stats['missing'] = len(missing)
+        self.stats['corrupt'] = len(corrupt)
+
+        logger.info(f"Отсутствует: {len(missing)}, повреждено: {len(corrupt)}")
+
+        if not missing and not corrupt:
+            logger.info("✓ Восстанавливать нечего")
+        elif self.dry_run:
+            for entry in missing + corrupt:
+                logger.info(f"DRY RUN: {entry.get('expected_path') or entry['path']}")
+        else:
+            entries = missing + corrupt
+            results = self.repair(entries)
+
+            for entry, result in zip(entries, results):
+                path = entry.get('expected_path') or entry['path']
+                if result:
+                    self.stats['repaired'] += 1
+                    self.stats['repaired_files'].append(path)
+                else:
+                    self.stats['failed'] += 1
+                    self.stats['failed_files'].append({'path': path, 'phrase': entry['phrase']})
+
+            # Повторная проверка: неизмененные файлы берутся из кэша
+            verification = self.processor.verify_audio_files(self.json_file, workers=self.verify_workers)
+
+        self.stats['remaining_missing'] = len(verification['missing_files'])
+        self.stats['remaining_corrupt'] = len(verification['corrupt_files'])
+        self.stats['elapsed'] = round(time.perf_counter() - start_time, 3)
+
+        report_file = Path(self.base_dir) / 'repair_report.json'
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(self.stats, f, ensure_ascii=False, indent=2)
+        logger.info(f"✓ Отчет восстановления сохранен: {report_file}")
+
+        self.print_stats()
+        return self.stats
+
+    def print_stats(self):
+        """Вывод статистики"""
+        print("\n" + "="*60)
+        print("СТАТИСТИКА ВОССТАНОВЛЕНИЯ")
+        print("="*60)
+        print(f"Отсутствовало файлов: {self.stats['missing']}")
+        print(f"Повреждено файлов: {self.stats['corrupt']}")
+        print(f"Восстановлено: {self.stats['repaired']}")
+        print(f"Ошибок: {self.stats['failed']}")
+        print(f"Осталось отсутствующих: {self.stats['remaining_missing']}")
+        print(f"Осталось поврежденных: {self.stats['remaining_corrupt']}")
+        print(f"Время: {self.stats['elapsed']:.1f} с")
+
+        if self.dry_run:
+            print("\n⚠️  РЕЖИМ ТЕСТИРОВАНИЯ - файлы не были созданы!")
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(
+        description='Проверка аудиофайлов и генерация только отсутствующих и поврежденных'
+    )
+
+    parser.add_argument('json_file', help='Путь к JSON файлу с фразами')
+    parser.add_argument('directory', help='Директория с аудиофайлами')
+    parser.add_argument('--use-gtts', action='store_true', help='Использовать gTTS вместо Edge-TTS')
+    parser.add_argument('--workers', type=int, default=3, help='Количество одновременных запросов синтеза')
+    parser.add_argument('--rps', type=float, default=5.0,
+                        help='Ограничение частоты запросов в секунду (0 - без ограничения)')
+    parser.add_argument('--retries', type=int, default=3, help='Количество повторов при ошибке')
+    parser.add_argument('--verify-workers', type=int, default=8, help='Потоков проверки MP3 (по умолчанию: 8)')
+    parser.add_argument('--dry-run', action='store_true', help='Только отчет, без генерации')
+
+    args = parser.parse_args()
+
+    if not Path(args.json_file).exists():
+        logger.error(f"Файл не найден: {args.json_file}")
+        sys.exit(1)
+
+    AudioRepair(
+        args.json_file,
+        args.directory,
+        use_edge_tts=not args.use_gtts,
+        workers=args.workers,
+        requests_per_second=args.rps,
+        max_retries=args.retries,
+        verify_workers=args.verify_workers,
+        dry_run=args.dry_run
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
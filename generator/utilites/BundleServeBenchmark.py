@@ -0,0 +1,215 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Добавляем путь к модулям генератора
+GENERATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(GENERATOR_DIR))
+
+from classes.AudioBundle import AudioBundle, BUNDLES_INDEX
+
+
+def load_targets(base_dir: str, limit: int):
+    """
+    Пары URL для одних и тех же фраз: файл через send_file и срез пакета
+
+    Returns:
+        Список кортежей (url /api/get-audio, url /api/bundles)
+    """
+    bundles_dir = os.path.join(base_dir, '.bundles')
+    with open(os.path.join(bundles_dir, BUNDLES_INDEX), 'r', encoding='utf-8') as f:
+        bundles = json.load(f)['bundles']
+
+    targets = []
+    for info in bundles:
+        gender, language, name = info['gender'], info['language'], info['name']
+        path = os.path.join(bundles_dir, gender, language, f"{name}.bundle")
+        with AudioBundle(path) as bundle:
+            for phrase_md5, _, _ in bundle.entries():
+                targets.append((
+                    f"/api/get-audio/{language}_{phrase_md5}.mp3",
+                    f"/api/bundles/{gender}/{language}/{name}/{phrase_md5}.mp3"
+                ))
+                if len(targets) >= limit:
+                    return targets
+    return targets
+
+
+def server_command(server: str, port: int):
+    """Команда запуска сервера: uvicorn для ASGI, gunicorn (или Flask) для WSGI"""
+    if server == 'asgi':
+        return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port), '--log-level', 'warning']
+    if shutil.which('gunicorn'):
+        return ['gunicorn', 'server:app', '-b', f'127.0.0.1:{port}', '-w', '1', '--threads', '16']
+    return [sys.executable, '-m', 'flask', '--app', 'server', 'run', '--port', str(port), '--with-threads']
+
+
+def read_rss(pid: int):
+    """Текущий и пиковый RSS процесса в МБ из /proc/<pid>/status (только Linux)"""
+    values = {}
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('VmRSS', 'VmHWM'):
+                    values[key] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return values.get('VmRSS'), values.get('VmHWM')
+
+
+def wait_ready(port: int, timeout: float = 60) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/health/live')
+            if connection.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def run_load(port: int, urls, concurrency: int, duration: float):
+    """
+    Нагрузка: concurrency потоков с keep-alive соединениями в течение duration секунд
+
+    Returns:
+        (задержки в секундах, ошибки, байт получено)
+    """
+    latencies = []
+    errors = 0
+    received = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed: int):
+        nonlocal errors, received
+        rng = random.Random(seed)
+        local, local_errors, local_bytes = [], 0, 0
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while time.perf_counter() < deadline:
+            url = rng.choice(urls)
+            start = time.perf_counter()
+            try:
+                connection.request('GET', url)
+                response = connection.getresponse()
+                body = response.read()
+                if response.status != 200:
+                    local_errors += 1
+                local_bytes += len(body)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+            received += local_bytes
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for seed in range(concurrency):
+            executor.submit(worker, seed)
+
+    return latencies, errors, received
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def bench_scenario(name: str, args, urls, env_overrides: dict) -> dict:
+    """Отдельный процесс сервера на сценарий, чтобы RSS не смешивался"""
+    env = dict(os.environ, BASE_AUDIO_DIR=os.path.abspath(args.directory), **env_overrides)
+    process = subprocess.Popen(server_command(args.server, args.port), cwd=str(GENERATOR_DIR), env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready(args.port):
+            print(f"✗ {name}: сервер не запустился")
+            return None
+
+        rss_start, _ = read_rss(process.pid)
+        # Прогрев: индекс, отображение пакетов, page cache
+        run_load(args.port, urls, args.concurrency, min(2.0, args.duration))
+        latencies, errors, received = run_load(args.port, urls, args.concurrency, args.duration)
+        rss_end, rss_peak = read_rss(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    return {
+        'name': name,
+        'requests': len(latencies),
+        'rps': len(latencies) / args.duration,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'errors': errors,
+        'mb_received': received / (1024 * 1024),
+        'rss_start_mb': rss_start,
+        'rss_end_mb': rss_end,
+        'rss_peak_mb': rss_peak
+    }
+
+
+def format_mb(value) -> str:
+    return f"{value:8.1f}" if value is not None else f"{'-':>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Сравнение отдачи аудио: send_file (/api/get-audio) и срезы пакетов из mmap (/api/bundles)'
+    )
+    parser.add_argument('directory', help='Директория с аудиофайлами и собранными пакетами (.bundles)')
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi',
+                        help='Сервер: wsgi (server.py) или asgi (asgi.py), по умолчанию: wsgi')
+    parser.add_argument('--port', type=int, default=5099, help='Порт сервера (по умолчанию: 5099)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Параллельных клиентов (по умолчанию: 16)')
+    parser.add_argument('--duration', type=float, default=10, help='Длительность замера, с (по умолчанию: 10)')
+    parser.add_argument('--phrases', type=int, default=2000, help='Число разных фраз (по умолчанию: 2000)')
+    args = parser.parse_args()
+
+    targets = load_targets(args.directory, args.phrases)
+    if not targets:
+        print("✗ Пакеты не найдены: сначала запустите utilites/AudioBundleBuilder.py")
+        sys.exit(1)
+    print(f"Фраз: {len(targets)}, сервер: {args.server}, клиентов: {args.concurrency}, {args.duration} с\n")
+
+    # send_file без кэша в памяти против срезов отображения пакетов
+    scenarios = [
+        ('send_file', [file_url for file_url, _ in targets], {'AUDIO_SERVE_MODE': 'sendfile'}),
+        ('mmap bundle', [bundle_url for _, bundle_url in targets], {'AUDIO_SERVE_MODE': 'sendfile'}),
+    ]
+
+    results = []
+    for name, urls, env_overrides in scenarios:
+        result = bench_scenario(name, args, urls, env_overrides)
+        if result:
+            results.append(result)
+
+    print(f"{'Сценарий':<14} {'запросов':>9} {'rps':>9} {'p50 мс':>8} {'p99 мс':>8} {'ошибок':>7} "
+          f"{'RSS нач':>8} {'RSS кон':>8} {'RSS пик':>8}")
+    for r in results:
+        print(f"{r['name']:<14} {r['requests']:>9} {r['rps']:>9.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['errors']:>7} {format_mb(r['rss_start_mb'])} {format_mb(r['rss_end_mb'])} "
+              f"{format_mb(r['rss_peak_mb'])}")
+    print("\nRSS включает страницы пакетов, отображенные в память процесса (они общие с page cache).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 import os
+import errno
+import hashlib
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import argparse
 import logging
-from typing import List, Tuple, Dict
+from typing import List, Optional, Set, Tuple, Dict
 
 # Настройка логирования
 logging.basicConfig(
@@ -42,9 +47,16 @@ class MP3FileOrganizer:
             'files_moved': 0,
             'files_skipped': 0,
             'folders_created': 0,
+            'duplicates_removed': 0,
+            'already_in_place': 0,
             'errors': 0
         }
         
+        # Блокировки для параллельного режима
+        self._stats_lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+        self._target_locks = [threading.Lock() for _ in range(64)]
+        
     def scan_directory(self) -> List[Path]:
         """
         Сканирование директории на наличие MP3 файлов
@@ -142,13 +154,13 @@ class MP3FileOrganizer:
                     new_name = f"{src_file.stem}_{counter}{src_file.suffix}"
                     target_file = target_folder / new_name
                     counter += 1
-                logger.info(f"Изменили имя на: {target_file.name}")
+                logger.debug(f"Изменили имя на: {target_file.name}")
             
             if self.dry_run:
-                logger.info(f"DRY RUN: Переместили бы {src_file} -> {target_file}")
+                logger.debug(f"DRY RUN: Переместили бы {src_file} -> {target_file}")
             else:
                 shutil.move(str(src_file), str(target_file))
-                logger.info(f"Перемещено: {src_file.name} -> {target_folder.name}/")
+                logger.debug(f"Перемещено: {src_file.name} -> {target_folder.name}/")
             
             self.stats['files_moved'] += 1
             return True
@@ -207,7 +219,7 @@ class MP3FileOrganizer:
         
         # Обрабатываем каждый файл
         for i, mp3_file in enumerate(mp3_files, 1):
-            logger.info(f"[{i}/{len(mp3_files)}] Обработка: {mp3_file.name}")
+            logger.debug(f"[{i}/{len(mp3_files)}] Обработка: {mp3_file.name}")
             self.process_file(mp3_file)
         
         # Выводим статистику
@@ -215,6 +227,240 @@ class MP3FileOrganizer:
         
         return self.stats
     
+    # ------------------------------------------------------------------
+    # Параллельный режим
+    # ------------------------------------------------------------------
+    
+    def scan_directory_fast(self) -> List[Path]:
+        """
+        Сканирование через os.scandir (без stat для каждого файла)
+        
+        Returns:
+            Список путей к MP3 файлам
+        """
+        mp3_files = []
+        stack = [str(self.base_dir)]
+        
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith('.'):
+                                stack.append(entry.path)
+                        elif entry.name.lower().endswith('.mp3'):
+                            mp3_files.append(Path(entry.path))
+            except OSError as e:
+                logger.error(f"Ошибка чтения директории {directory}: {e}")
+        
+        logger.info(f"Найдено {len(mp3_files)} MP3 файлов")
+        return mp3_files
+    
+    @staticmethod
+    def file_hash(path: Path) -> str:
+        """MD5 содержимого файла"""
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def same_content(self, first: Path, second: Path) -> bool:
+        """Сравнение файлов: сначала размер, затем хэш содержимого"""
+        if first.stat().st_size != second.stat().st_size:
+            return False
+        return self.file_hash(first) == self.file_hash(second)
+    
+    def load_journal(self, journal_file: Path) -> Set[str]:
+        """
+        Чтение журнала завершенных перемещений
+        
+        Returns:
+            Множество путей, по которым файлы уже размещены
+        """
+        done = set()
+        if not journal_file.exists():
+            return done
+        
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) == 3:
+                    done.add(parts[2])
+        
+        logger.info(f"Журнал {journal_file.name}: {len(done)} завершенных операций")
+        return done
+    
+    def _record(self, journal, action: str, src_file: Path, target_file: Path):
+        """Запись завершенной операции в журнал (action, источник, назначение)"""
+        if journal is None:
+            return
+        with self._journal_lock:
+            journal.write(f"{action}\t{src_file}\t{target_file}\n")
+            journal.flush()
+    
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    @staticmethod
+    def _rename(src_file: Path, target_file: Path):
+        """
+        Перемещение: os.rename в пределах файловой системы,
+        копирование через временный файл между файловыми системами
+        """
+        try:
+            os.rename(src_file, target_file)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            temp_file = target_file.with_name(target_file.name + '.part')
+            shutil.copy2(src_file, temp_file)
+            os.replace(temp_file, target_file)
+            os.remove(src_file)
+    
+    def move_file_deduplicated(self, src_file: Path, target_folder: Path, journal=None) -> str:
+        """
+        Перемещение с разрешением конфликтов по содержимому
+        
+        Если в целевой папке есть файл с тем же именем и тем же содержимым,
+        исходный файл удаляется как дубликат. Если содержимое отличается,
+        к имени добавляется начало хэша содержимого.
+        
+        Args:
+            src_file: Исходный файл
+            target_folder: Целевая папка
+            journal: Открытый файл журнала или None
+        
+        Returns:
+            'moved', 'duplicate', 'in_place' или 'conflict' (файл оставлен на месте)
+        """
+        target_file = target_folder / src_file.name
+        
+        if src_file.parent == target_folder:
+            return 'in_place'
+        
+        # Два источника с одинаковым именем не должны записать один и тот же файл
+        with self._target_locks[hash(target_file.name) % len(self._target_locks)]:
+            if target_file.exists():
+                if self.same_content(src_file, target_file):
+                    if not self.dry_run:
+                        os.remove(src_file)
+                    self._record(journal, 'duplicate', src_file, target_file)
+                    logger.debug(f"Дубликат удален: {src_file}")
+                    return 'duplicate'
+                
+                # Разное содержимое: имя с хэшем детерминировано, повторный запуск даст то же имя
+                content_hash = self.file_hash(src_file)[:8]
+                target_file = target_folder / f"{src_file.stem}_{content_hash}{src_file.suffix}"
+                if target_file.exists():
+                    # Восемь символов хэша - не гарантия: файл мог положить не этот скрипт
+                    if not self.same_content(src_file, target_file):
+                        logger.error(f"Конфликт: {target_file} существует с другим содержимым, "
+                                     f"{src_file} оставлен на месте")
+                        return 'conflict'
+                    if not self.dry_run:
+                        os.remove(src_file)
+                    self._record(journal, 'duplicate', src_file, target_file)
+                    logger.debug(f"Дубликат удален: {src_file}")
+                    return 'duplicate'
+                logger.debug(f"Конфликт имен, новое имя: {target_file.name}")
+            
+            if self.dry_run:
+                logger.debug(f"DRY RUN: Переместили бы {src_file} -> {target_file}")
+            else:
+                self._rename(src_file, target_file)
+                self._record(journal, 'moved', src_file, target_file)
+                logger.debug(f"Перемещено: {src_file.name} -> {target_folder.name}/")
+        
+        return 'moved'
+    
+    def run_parallel(self, workers: int = 8, journal_file: Optional[str] = None,
+                     progress_every: int = 10000) -> Dict:
+        """
+        Параллельная организация файлов с журналом для продолжения после сбоя
+        
+        Args:
+            workers: Количество потоков
+            journal_file: Путь к журналу (по умолчанию .mp3_organizer_journal в base_dir)
+            progress_every: Интервал (в файлах) вывода прогресса
+        
+        Returns:
+            Словарь со статистикой
+        """
+        logger.info(f"Начинаем сканирование директории: {self.base_dir}")
+        logger.info(f"Режим тестирования: {'ДА' if self.dry_run else 'НЕТ'}, потоков: {workers}")
+        
+        start_time = time.perf_counter()
+        
+        journal_path = Path(journal_file) if journal_file else self.base_dir / '.mp3_organizer_journal'
+        done = self.load_journal(journal_path)
+        
+        mp3_files = self.scan_directory_fast()
+        self.stats['total_mp3_files'] = len(mp3_files)
+        
+        if not mp3_files:
+            logger.warning("MP3 файлы не найдены!")
+            return self.stats
+        
+        # Назначение для каждого файла; папки создаются заранее, один раз
+        tasks = []
+        for mp3_file in mp3_files:
+            if str(mp3_file) in done:
+                self.stats['already_in_place'] += 1
+                continue
+            
+            prefix, folder_name = self.get_prefix_folder(mp3_file.name)
+            if not prefix:
+                logger.debug(f"Неизвестный префикс у файла: {mp3_file.name}")
+                self.stats['files_skipped'] += 1
+                continue
+            
+            tasks.append((mp3_file, self.base_dir / folder_name))
+        
+        for target_folder in {target for _, target in tasks}:
+            self.create_target_folder(target_folder)
+        
+        processed = 0
+        
+        def process(task):
+            src_file, target_folder = task
+            try:
+                result = self.move_file_deduplicated(src_file, target_folder, journal)
+            except Exception as e:
+                logger.error(f"Ошибка перемещения файла {src_file}: {e}")
+                self._count('errors')
+                return
+            
+            self._count({
+                'moved': 'files_moved',
+                'duplicate': 'duplicates_removed',
+                'in_place': 'already_in_place',
+                'conflict': 'errors'
+            }[result])
+        
+        journal = None if self.dry_run else open(journal_path, 'a', encoding='utf-8')
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(process, tasks):
+                    processed += 1
+                    if processed % progress_every == 0:
+                        elapsed = time.perf_counter() - start_time
+                        logger.info(f"Обработано {processed}/{len(tasks)} "
+                                    f"({processed / elapsed:.0f} файлов/с)")
+        finally:
+            if journal is not None:
+                journal.close()
+        
+        elapsed = time.perf_counter() - start_time
+        self.stats['elapsed'] = elapsed
+        self.stats['files_per_second'] = len(mp3_files) / elapsed if elapsed > 0 else 0
+        
+        self.print_stats()
+        
+        return self.stats
+    
     def print_stats(self):
         """Вывод статистики обработки"""
         print("\n" + "="*60)
@@ -224,7 +470,12 @@ class MP3FileOrganizer:
         print(f"Перемещено файлов: {self.stats['files_moved']}")
         print(f"Пропущено файлов: {self.stats['files_skipped']}")
         print(f"Создано папок: {self.stats['folders_created']}")
+        if self.stats['duplicates_removed'] or self.stats['already_in_place']:
+            print(f"Удалено дубликатов: {self.stats['duplicates_removed']}")
+            print(f"Уже на месте: {self.stats['already_in_place']}")
         print(f"Ошибок: {self.stats['errors']}")
+        if 'elapsed' in self.stats:
+            print(f"Время: {self.stats['elapsed']:.1f} с ({self.stats['files_per_second']:.0f} файлов/с)")
         
         if self.dry_run:
             print("\n⚠️  РЕЖИМ ТЕСТИРОВАНИЯ - файлы не были перемещены!")
@@ -271,6 +522,24 @@ def main():
         help='Подробный вывод (debug уровень)'
     )
     
+    parser.add_argument(
+        '--parallel',
+        action='store_true',
+        help='Параллельное перемещение с журналом и разрешением конфликтов по содержимому'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Количество потоков для --parallel (по умолчанию: 8)'
+    )
+    
+    parser.add_argument(
+        '--journal',
+        help='Путь к журналу для --parallel (по умолчанию: <directory>/.mp3_organizer_journal)'
+    )
+    
     parser.add_argument(
         '--add-prefix',
         action='append',
@@ -300,7 +569,10 @@ def main():
                 logger.info(f"Добавлено соответствие: {prefix} -> {folder}")
     
     # Запускаем обработку
-    organizer.run()
+    if args.parallel:
+        organizer.run_parallel(args.workers, args.journal)
+    else:
+        organizer.run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
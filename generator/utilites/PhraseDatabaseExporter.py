@@ -1,49 +1,55 @@
 # export_phrases.py
-import mysql.connector
 from mysql.connector import Error
 import json
+import os
+import sys
+import time
 import argparse
 import logging
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
+
+# Добавляем путь к модулям генератора
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.DatabasePool import DatabasePool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class PhraseDatabaseExporter:
-    def __init__(self, host: str, database: str, user: str, password: str, port: int = 3306):
+    def __init__(self, host: str, database: str, user: str, password: str, port: int = 3306,
+                 pool: Optional[DatabasePool] = None):
         self.host = host
         self.database = database
         self.user = user
         self.password = password
         self.port = port
         
+        self.pool = pool or DatabasePool(host, database, user, password, port,
+                                         pool_size=1, pool_name='phrase_exporter')
+        
         self.connection = None
         self.cursor = None
     
     def connect(self):
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                port=self.port,
-                charset='utf8mb4'
-            )
-            
-            if self.connection.is_connected():
-                self.cursor = self.connection.cursor(dictionary=True)
-                logger.info("✓ Подключение к MySQL успешно")
+            self.connection = self.pool.get_connection()
+            self.cursor = self.connection.cursor(dictionary=True)
+            logger.info("✓ Подключение к MySQL успешно")
                 
         except Error as e:
             logger.error(f"Ошибка подключения к MySQL: {e}")
             raise
     
     def disconnect(self):
-        if self.connection and self.connection.is_connected():
-            self.cursor.close()
+        if self.connection:
+            if self.cursor:
+                self.cursor.close()
             self.connection.close()
+            self.connection = None
+            self.cursor = None
             logger.info("✗ Отключение от MySQL")
     
     def export_to_json(self, output_file: str, export_format: str = 'grouped'):
@@ -107,6 +113,128 @@ class PhraseDatabaseExporter:
         except Error as e:
             logger.error(f"Ошибка экспорта: {e}")
     
+    @staticmethod
+    def _indented(obj, level: int) -> str:
+        """JSON объекта в раскладке json.dump(indent=2) на заданном уровне вложенности"""
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=str).replace('\n', '\n' + '  ' * level)
+    
+    def export_streaming(self, output_file: str, export_format: str = 'grouped', chunk_size: int = 1000):
+        """
+        Потоковый экспорт: строки читаются небуферизованным курсором
+        пакетами по chunk_size и сразу пишутся в файл
+        
+        Память не зависит от количества фраз. Форматы grouped и flat дают
+        тот же файл, что и export_to_json; ndjson - одна фраза на строку.
+        
+        Args:
+            output_file: Путь к выходному файлу
+            export_format: Формат экспорта ('grouped', 'flat' или 'ndjson')
+            chunk_size: Количество строк, читаемых за раз
+        """
+        query = """
+        SELECT 
+            pt.type_name,
+            p.target_text,
+            p.native_text
+        FROM phrases p
+        JOIN phrase_types pt ON p.type_id = pt.id
+        WHERE p.is_active = TRUE
+        ORDER BY pt.type_name, p.id
+        """
+        
+        start_time = time.perf_counter()
+        temp_file = f"{output_file}.{os.getpid()}.part"
+        cursor = self.connection.cursor(dictionary=True, buffered=False)
+        
+        total = 0
+        types = 0
+        current_type = None
+        
+        try:
+            cursor.execute(query)
+            
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                if export_format == 'grouped':
+                    f.write('{')
+                elif export_format == 'flat':
+                    f.write('[')
+                
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    
+                    for row in rows:
+                        if export_format == 'ndjson':
+                            f.write(json.dumps(row, ensure_ascii=False, default=str))
+                            f.write('\n')
+                        
+                        elif export_format == 'flat':
+                            f.write(',\n  ' if total else '\n  ')
+                            f.write(self._indented(row, 1))
+                        
+                        else:
+                            # Строки отсортированы по type_name: группа заканчивается при смене типа
+                            if row['type_name'] != current_type:
+                                if current_type is not None:
+                                    f.write('\n  ],')
+                                f.write(f"\n  {json.dumps(row['type_name'], ensure_ascii=False)}: [\n    ")
+                                current_type = row['type_name']
+                                types += 1
+                            else:
+                                f.write(',\n    ')
+                            f.write(self._indented({
+                                'target': row['target_text'],
+                                'native': row['native_text']
+                            }, 2))
+                        
+                        total += 1
+                    
+                    logger.debug(f"  Записано строк: {total}")
+                
+                if export_format == 'grouped':
+                    f.write('\n  ]\n}' if total else '}')
+                elif export_format == 'flat':
+                    f.write('\n]' if total else ']')
+            
+            os.replace(temp_file, output_file)
+            
+        except BaseException as e:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            
+            # Небуферизованный курсор: непрочитанные строки нужно дочитать,
+            # иначе cursor.close() скроет исходную ошибку, а соединение
+            # вернется в пул с незавершенным результатом
+            try:
+                self.connection.consume_results()
+            except Error as consume_error:
+                logger.warning(f"Не удалось дочитать результат запроса: {consume_error}")
+            
+            if isinstance(e, Error):
+                logger.error(f"Ошибка экспорта: {e}")
+                return
+            raise
+        finally:
+            try:
+                cursor.close()
+            except Error as e:
+                logger.warning(f"Ошибка закрытия курсора: {e}")
+        
+        elapsed = time.perf_counter() - start_time
+        
+        if not total:
+            logger.warning("Нет данных для экспорта")
+        
+        logger.info(f"✓ Данные экспортированы в: {output_file}")
+        logger.info(f"Формат: {export_format}")
+        logger.info(f"Количество записей: {total}")
+        if export_format == 'grouped':
+            logger.info(f"Количество категорий: {types}")
+        logger.info(f"Время: {elapsed:.2f} с ({total / elapsed if elapsed > 0 else 0:.0f} строк/с)")
+    
     def show_sample(self, data: dict, sample_size: int = 3):
         """Показать образец данных"""
         print(f"\n{'='*60}")
@@ -137,8 +265,11 @@ def main():
     parser.add_argument('--user', default='root', help='Имя пользователя MySQL')
     parser.add_argument('--password', default='', help='Пароль MySQL')
     parser.add_argument('--port', type=int, default=3306, help='Порт MySQL')
-    parser.add_argument('--format', choices=['grouped', 'flat'], default='grouped', 
-                       help='Формат экспорта (grouped или flat)')
+    parser.add_argument('--format', choices=['grouped', 'flat', 'ndjson'], default='grouped', 
+                       help='Формат экспорта (grouped, flat или ndjson - всегда потоковый)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Потоковый экспорт без загрузки всех строк в память')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Строк за одно чтение при потоковом экспорте')
     
     args = parser.parse_args()
     
@@ -152,7 +283,10 @@ def main():
     
     try:
         exporter.connect()
-        exporter.export_to_json(args.output_file, args.format)
+        if args.stream or args.format == 'ndjson':
+            exporter.export_streaming(args.output_file, args.format, args.chunk_size)
+        else:
+            exporter.export_to_json(args.output_file, args.format)
     except Exception as e:
         logger.error(f"Ошибка: {e}")
     finally:
@@ -1,13 +1,20 @@
 import json
+import hashlib
 import mysql.connector
 from mysql.connector import Error
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import sys
+import time
 from pathlib import Path
 import argparse
 import logging
 from datetime import datetime
 
+# Добавляем путь к модулям генератора
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.DatabasePool import DatabasePool
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO,
@@ -17,7 +24,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class PhraseDatabaseImporter:
-    def __init__(self, host: str, database: str, user: str, password: str, port: int = 3306):
+    def __init__(self, host: str, database: str, user: str, password: str, port: int = 3306,
+                 pool: Optional[DatabasePool] = None):
         """
         Инициализация импортера базы данных
         
@@ -27,6 +35,7 @@ class PhraseDatabaseImporter:
             user: Имя пользователя
             password: Пароль
             port: Порт MySQL
+            pool: Общий пул соединений (если None - создается свой на одно соединение)
         """
         self.host = host
         self.database = database
@@ -34,36 +43,37 @@ class PhraseDatabaseImporter:
         self.password = password
         self.port = port
         
+        self.pool = pool or DatabasePool(host, database, user, password, port,
+                                         pool_size=1, pool_name='phrase_importer')
+        
         # Подключение к базе данных
         self.connection = None
         self.cursor = None
         
     def connect(self):
-        """Подключение к базе данных MySQL"""
+        """
+        Получение соединения из пула
+        
+        Raises:
+            mysql.connector.Error: если подключиться не удалось
+        """
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                port=self.port,
-                charset='utf8mb4',
-                collation='utf8mb4_unicode_ci'
-            )
-            
-            if self.connection.is_connected():
-                self.cursor = self.connection.cursor()
-                logger.info("✓ Подключение к MySQL успешно")
+            self.connection = self.pool.get_connection()
+            self.cursor = self.connection.cursor()
+            logger.info("✓ Подключение к MySQL успешно")
                 
         except Error as e:
             logger.error(f"Ошибка подключения к MySQL: {e}")
-            sys.exit(1)
+            raise
     
     def disconnect(self):
-        """Отключение от базы данных"""
-        if self.connection and self.connection.is_connected():
-            self.cursor.close()
+        """Возврат соединения в пул"""
+        if self.connection:
+            if self.cursor:
+                self.cursor.close()
             self.connection.close()
+            self.connection = None
+            self.cursor = None
             logger.info("✗ Отключение от MySQL")
     
     def check_table_exists(self, table_name: str) -> bool:
@@ -139,12 +149,14 @@ class PhraseDatabaseImporter:
                 native_text TEXT NOT NULL,
                 direction VARCHAR(10) DEFAULT 'en-ru',
                 is_active BOOLEAN DEFAULT TRUE,
+                content_hash CHAR(32) NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 FOREIGN KEY (type_id) REFERENCES phrase_types(id) ON DELETE CASCADE,
                 INDEX idx_type_id (type_id),
                 INDEX idx_direction (direction),
                 INDEX idx_active (is_active),
+                UNIQUE INDEX uniq_content_hash (content_hash),
                 FULLTEXT idx_text_search (target_text, native_text)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
             """
@@ -257,6 +269,383 @@ class PhraseDatabaseImporter:
             self.connection.rollback()
             return False
     
+    def ensure_schema(self):
+        """
+        Однократная проверка структуры таблиц перед пакетным импортом
+        
+        Если таблиц нет или структура не совпадает - таблицы создаются заново.
+        """
+        required_columns = {
+            'phrase_types': ['type_name'],
+            'phrases': ['type_id', 'target_text', 'native_text', 'direction']
+        }
+        
+        for table_name, columns in required_columns.items():
+            if not self.check_table_exists(table_name):
+                logger.warning(f"Таблица {table_name} не существует. Создаем...")
+                self.create_tables()
+                return
+            
+            if not all(self.check_column_exists(table_name, column) for column in columns):
+                logger.warning(f"Неправильная структура таблицы {table_name}. Создаем заново...")
+                self.create_tables()
+                return
+        
+        logger.info("✓ Структура таблиц проверена")
+    
+    def get_or_create_phrase_types(self, type_names: List[str]) -> Dict[str, int]:
+        """
+        Получение ID всех типов фраз одним запросом, недостающие создаются пакетом
+        
+        Args:
+            type_names: Названия типов фраз
+        
+        Returns:
+            Словарь название -> ID
+        """
+        try:
+            self.cursor.execute("SELECT type_name, id FROM phrase_types")
+            type_ids = {type_name: type_id for type_name, type_id in self.cursor.fetchall()}
+            
+            missing = [(type_name,) for type_name in type_names if type_name not in type_ids]
+            if missing:
+                self.cursor.executemany("INSERT INTO phrase_types (type_name) VALUES (%s)", missing)
+                self.connection.commit()
+                
+                self.cursor.execute("SELECT type_name, id FROM phrase_types")
+                type_ids = {type_name: type_id for type_name, type_id in self.cursor.fetchall()}
+                logger.info(f"✓ Создано новых типов фраз: {len(missing)}")
+            
+            return type_ids
+            
+        except Error as e:
+            logger.error(f"Ошибка при создании типов фраз: {e}")
+            self.connection.rollback()
+            raise
+    
+    def insert_phrases_bulk(self, rows: List[Tuple[int, str, str, str]], chunk_size: int = 1000) -> Tuple[int, int]:
+        """
+        Пакетная вставка фраз: executemany по chunk_size строк, commit на каждый пакет
+        
+        Args:
+            rows: Кортежи (type_id, target_text, native_text, direction)
+            chunk_size: Размер пакета
+        
+        Returns:
+            Кортеж (добавлено строк, строк с ошибками)
+        """
+        query = """
+        INSERT INTO phrases (type_id, target_text, native_text, direction)
+        VALUES (%s, %s, %s, %s)
+        """
+        
+        inserted = 0
+        errors = 0
+        
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                # mysql.connector переписывает executemany для INSERT в один многострочный VALUES
+                self.cursor.executemany(query, chunk)
+                self.connection.commit()
+                inserted += len(chunk)
+                logger.debug(f"  ✓ Пакет {start // chunk_size + 1}: {len(chunk)} фраз")
+                
+            except Error as e:
+                logger.error(f"Ошибка при добавлении пакета строк {start + 1}-{start + len(chunk)}: {e}")
+                self.connection.rollback()
+                errors += len(chunk)
+        
+        return inserted, errors
+    
+    def import_json_file_bulk(self, json_file_path: str, clear_existing: bool = False, chunk_size: int = 1000):
+        """
+        Пакетный импорт данных из JSON файла
+        
+        Схема проверяется один раз, типы фраз создаются одним пакетом,
+        фразы вставляются пакетами по chunk_size строк.
+        
+        Args:
+            json_file_path: Путь к JSON файлу
+            clear_existing: Очистить существующие данные
+            chunk_size: Размер пакета вставки
+        """
+        # Проверяем существование файла
+        if not Path(json_file_path).exists():
+            logger.error(f"Файл не найден: {json_file_path}")
+            return
+        
+        try:
+            # Читаем JSON файл
+            with open(json_file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            logger.info(f"✓ Файл прочитан: {json_file_path}")
+            logger.info(f"Количество категорий: {len(data)}")
+            
+            # Очищаем существующие данные если нужно
+            if clear_existing:
+                self.clear_all_data()
+            
+            start_time = time.perf_counter()
+            
+            self.ensure_schema()
+            type_ids = self.get_or_create_phrase_types(list(data.keys()))
+            
+            # Статистика
+            stats = {
+                'total_types': len(data),
+                'total_phrases': 0,
+                'errors': 0
+            }
+            
+            rows = []
+            for type_name, phrases_list in data.items():
+                type_id = type_ids[type_name]
+                for i, phrase_pair in enumerate(phrases_list, 1):
+                    target_text = phrase_pair.get('target', '').strip()
+                    native_text = phrase_pair.get('native', '').strip()
+                    
+                    if not target_text or not native_text:
+                        logger.warning(f"  '{type_name}', фраза #{i}: пропущена (пустой текст)")
+                        continue
+                    
+                    rows.append((type_id, target_text, native_text, 'en-ru'))
+            
+            logger.info(f"Фраз к добавлению: {len(rows)}, размер пакета: {chunk_size}")
+            
+            stats['total_phrases'], stats['errors'] = self.insert_phrases_bulk(rows, chunk_size)
+            
+            stats['elapsed'] = time.perf_counter() - start_time
+            stats['rows_per_second'] = stats['total_phrases'] / stats['elapsed'] if stats['elapsed'] > 0 else 0
+            
+            # Выводим статистику
+            self.print_stats(stats)
+            
+            # Экспортируем данные для проверки
+            self.export_sample_data()
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"Ошибка чтения JSON файла: {e}")
+        except Exception as e:
+            logger.error(f"Неизвестная ошибка: {e}")
+    
+    @staticmethod
+    def content_hash(type_name: str, target_text: str, native_text: str) -> str:
+        """
+        Хэш содержимого фразы для синхронизации
+        
+        Эквивалентно MD5(CONCAT_WS(CHAR(31), type_name, target_text, native_text)) в MySQL.
+        
+        Args:
+            type_name: Название типа фразы
+            target_text: Текст на целевом языке
+            native_text: Текст на родном языке
+        
+        Returns:
+            MD5 хэш (32 символа)
+        """
+        return hashlib.md5('\x1f'.join((type_name, target_text, native_text)).encode('utf-8')).hexdigest()
+    
+    def ensure_sync_schema(self, chunk_size: int = 1000):
+        """
+        Миграция для синхронизации: столбец content_hash с уникальным индексом
+        
+        Существующие таблицы не удаляются. Строкам без хэша хэш вычисляется,
+        активные дубликаты (одинаковое содержимое) деактивируются.
+        
+        Args:
+            chunk_size: Размер пакета обновления
+        """
+        try:
+            if not self.check_table_exists('phrases') or not self.check_table_exists('phrase_types'):
+                logger.warning("Таблицы не существуют. Создаем...")
+                self.create_tables()
+                return
+            
+            if not self.check_column_exists('phrases', 'content_hash'):
+                logger.info("Добавление столбца content_hash...")
+                self.cursor.execute("ALTER TABLE phrases ADD COLUMN content_hash CHAR(32) NULL AFTER is_active")
+                self.cursor.execute("ALTER TABLE phrases ADD UNIQUE INDEX uniq_content_hash (content_hash)")
+                self.connection.commit()
+                logger.info("✓ Столбец content_hash добавлен")
+            
+            # Строки, добавленные без хэша (обычный импорт или до миграции)
+            self.cursor.execute("""
+                SELECT p.id, pt.type_name, p.target_text, p.native_text
+                FROM phrases p
+                JOIN phrase_types pt ON p.type_id = pt.id
+                WHERE p.content_hash IS NULL AND p.is_active = TRUE
+                ORDER BY p.id
+            """)
+            unhashed = self.cursor.fetchall()
+            
+            if not unhashed:
+                return
+            
+            self.cursor.execute("SELECT content_hash FROM phrases WHERE content_hash IS NOT NULL")
+            known = {row[0] for row in self.cursor.fetchall()}
+            
+            updates = []
+            duplicates = []
+            for phrase_id, type_name, target_text, native_text in unhashed:
+                phrase_hash = self.content_hash(type_name, target_text.strip(), native_text.strip())
+                if phrase_hash in known:
+                    duplicates.append((phrase_id,))
+                else:
+                    known.add(phrase_hash)
+                    updates.append((phrase_hash, phrase_id))
+            
+            for start in range(0, len(updates), chunk_size):
+                self.cursor.executemany(
+                    "UPDATE phrases SET content_hash = %s WHERE id = %s",
+                    updates[start:start + chunk_size]
+                )
+                self.connection.commit()
+            
+            for start in range(0, len(duplicates), chunk_size):
+                self.cursor.executemany(
+                    "UPDATE phrases SET is_active = FALSE WHERE id = %s",
+                    duplicates[start:start + chunk_size]
+                )
+                self.connection.commit()
+            
+            logger.info(f"✓ Хэши вычислены: {len(updates)} строк, деактивировано дубликатов: {len(duplicates)}")
+            
+        except Error as e:
+            logger.error(f"Ошибка миграции для синхронизации: {e}")
+            self.connection.rollback()
+            raise
+    
+    def _update_by_hashes(self, query: str, hashes: List[str], chunk_size: int) -> int:
+        """
+        Пакетное обновление строк по списку хэшей (WHERE content_hash IN (...))
+        
+        Returns:
+            Количество обновленных строк
+        """
+        updated = 0
+        for start in range(0, len(hashes), chunk_size):
+            chunk = hashes[start:start + chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            self.cursor.execute(query.format(placeholders=placeholders), chunk)
+            # Строки, которые действительно изменились, а не число переданных хэшей
+            updated += self.cursor.rowcount
+            self.connection.commit()
+        return updated
+    
+    def sync_json_file(self, json_file_path: str, chunk_size: int = 1000):
+        """
+        Инкрементальная синхронизация базы с JSON файлом
+        
+        Содержимое сравнивается по content_hash: новые фразы добавляются,
+        ранее деактивированные снова активируются, фразы, которых больше нет
+        в файле, деактивируются (is_active = FALSE). Таблицы не пересоздаются,
+        повторный запуск с тем же файлом ничего не меняет.
+        
+        Args:
+            json_file_path: Путь к JSON файлу
+            chunk_size: Размер пакета
+        """
+        # Проверяем существование файла
+        if not Path(json_file_path).exists():
+            logger.error(f"Файл не найден: {json_file_path}")
+            return
+        
+        try:
+            # Читаем JSON файл
+            with open(json_file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            logger.info(f"✓ Файл прочитан: {json_file_path}")
+            logger.info(f"Количество категорий: {len(data)}")
+            
+            start_time = time.perf_counter()
+            
+            self.ensure_sync_schema(chunk_size)
+            type_ids = self.get_or_create_phrase_types(list(data.keys()))
+            
+            # Желаемое состояние: хэш -> строка
+            desired = {}
+            for type_name, phrases_list in data.items():
+                for i, phrase_pair in enumerate(phrases_list, 1):
+                    target_text = phrase_pair.get('target', '').strip()
+                    native_text = phrase_pair.get('native', '').strip()
+                    
+                    if not target_text or not native_text:
+                        logger.warning(f"  '{type_name}', фраза #{i}: пропущена (пустой текст)")
+                        continue
+                    
+                    phrase_hash = self.content_hash(type_name, target_text, native_text)
+                    desired[phrase_hash] = (type_ids[type_name], target_text, native_text, 'en-ru', phrase_hash)
+            
+            # Текущее состояние базы
+            self.cursor.execute("SELECT content_hash, is_active FROM phrases WHERE content_hash IS NOT NULL")
+            existing = {phrase_hash: bool(is_active) for phrase_hash, is_active in self.cursor.fetchall()}
+            
+            to_insert = [row for phrase_hash, row in desired.items() if phrase_hash not in existing]
+            to_activate = [phrase_hash for phrase_hash in desired if existing.get(phrase_hash) is False]
+            to_deactivate = [phrase_hash for phrase_hash, is_active in existing.items()
+                             if is_active and phrase_hash not in desired]
+            
+            logger.info(f"Изменения: добавить {len(to_insert)}, активировать {len(to_activate)}, "
+                        f"деактивировать {len(to_deactivate)}")
+            
+            stats = {
+                'total_types': len(data),
+                'inserted': 0,
+                'activated': 0,
+                'deactivated': 0,
+                'unchanged': len(desired) - len(to_insert) - len(to_activate),
+                'errors': 0
+            }
+            
+            insert_query = """
+            INSERT INTO phrases (type_id, target_text, native_text, direction, content_hash)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE is_active = TRUE
+            """
+            for start in range(0, len(to_insert), chunk_size):
+                chunk = to_insert[start:start + chunk_size]
+                try:
+                    self.cursor.executemany(insert_query, chunk)
+                    self.connection.commit()
+                    stats['inserted'] += len(chunk)
+                except Error as e:
+                    logger.error(f"Ошибка при добавлении пакета строк {start + 1}-{start + len(chunk)}: {e}")
+                    self.connection.rollback()
+                    stats['errors'] += len(chunk)
+            
+            stats['activated'] = self._update_by_hashes(
+                "UPDATE phrases SET is_active = TRUE WHERE is_active = FALSE AND content_hash IN ({placeholders})",
+                to_activate, chunk_size
+            )
+            stats['deactivated'] = self._update_by_hashes(
+                "UPDATE phrases SET is_active = FALSE WHERE is_active = TRUE AND content_hash IN ({placeholders})",
+                to_deactivate, chunk_size
+            )
+            
+            stats['elapsed'] = time.perf_counter() - start_time
+            
+            print(f"\n{'='*60}")
+            print("СТАТИСТИКА СИНХРОНИЗАЦИИ:")
+            print(f"{'='*60}")
+            print(f"Категорий в файле: {stats['total_types']}")
+            print(f"Добавлено фраз: {stats['inserted']}")
+            print(f"Активировано: {stats['activated']}")
+            print(f"Деактивировано: {stats['deactivated']}")
+            print(f"Без изменений: {stats['unchanged']}")
+            print(f"Ошибок: {stats['errors']}")
+            print(f"Время: {stats['elapsed']:.2f} с")
+            
+            return stats
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"Ошибка чтения JSON файла: {e}")
+        except Exception as e:
+            logger.error(f"Неизвестная ошибка: {e}")
+            self.connection.rollback()
+    
     def import_json_file(self, json_file_path: str, clear_existing: bool = False):
         """
         Импорт данных из JSON файла
@@ -282,6 +671,8 @@ class PhraseDatabaseImporter:
             if clear_existing:
                 self.clear_all_data()
             
+            start_time = time.perf_counter()
+            
             # Статистика
             stats = {
                 'total_types': 0,
@@ -327,6 +718,9 @@ class PhraseDatabaseImporter:
                     logger.error(f"Ошибка обработки категории '{type_name}': {e}")
                     stats['errors'] += 1
             
+            stats['elapsed'] = time.perf_counter() - start_time
+            stats['rows_per_second'] = stats['total_phrases'] / stats['elapsed'] if stats['elapsed'] > 0 else 0
+            
             # Выводим статистику
             self.print_stats(stats)
             
@@ -461,6 +855,8 @@ class PhraseDatabaseImporter:
         print(f"Обработано категорий: {stats['total_types']}")
         print(f"Добавлено фраз: {stats['total_phrases']}")
         print(f"Ошибок: {stats['errors']}")
+        if 'elapsed' in stats:
+            print(f"Время: {stats['elapsed']:.2f} с ({stats['rows_per_second']:.0f} строк/с)")
 
 def create_database_if_not_exists(host: str, user: str, password: str, database: str, port: int = 3306):
     """
@@ -493,7 +889,7 @@ def create_database_if_not_exists(host: str, user: str, password: str, database:
         
     except Error as e:
         logger.error(f"Ошибка создания базы данных: {e}")
-        sys.exit(1)
+        raise
 
 def main():
     """Основная функция"""
@@ -507,18 +903,25 @@ def main():
     parser.add_argument('--port', type=int, default=3306, help='Порт MySQL (по умолчанию: 3306)')
     parser.add_argument('--create-db', action='store_true', help='Создать базу данных если не существует')
     parser.add_argument('--clear', action='store_true', help='Очистить существующие данные перед импортом')
+    parser.add_argument('--bulk', action='store_true', help='Пакетный импорт (executemany, commit на пакет)')
+    parser.add_argument('--sync', action='store_true',
+                        help='Инкрементальная синхронизация без пересоздания таблиц')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Размер пакета для --bulk и --sync (по умолчанию: 1000)')
     
     args = parser.parse_args()
     
     # Создаем базу данных если нужно
     if args.create_db:
-        create_database_if_not_exists(
-            host=args.host,
-            user=args.user,
-            password=args.password,
-            database=args.database,
-            port=args.port
-        )
+        try:
+            create_database_if_not_exists(
+                host=args.host,
+                user=args.user,
+                password=args.password,
+                database=args.database,
+                port=args.port
+            )
+        except Error:
+            sys.exit(1)
     
     # Создаем импортер
     importer = PhraseDatabaseImporter(
@@ -533,11 +936,19 @@ def main():
         # Подключаемся к базе данных
         importer.connect()
         
+        if args.sync:
+            # Синхронизация: таблицы не удаляются
+            importer.sync_json_file(args.json_file, chunk_size=args.chunk_size)
+            return
+        
         # Создаем таблицы
         importer.create_tables()
         
         # Импортируем данные
-        importer.import_json_file(args.json_file, clear_existing=args.clear)
+        if args.bulk:
+            importer.import_json_file_bulk(args.json_file, clear_existing=args.clear, chunk_size=args.chunk_size)
+        else:
+            importer.import_json_file(args.json_file, clear_existing=args.clear)
         
     except Exception as e:
         logger.error(f"Ошибка: {e}")
@@ -0,0 +1,179 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Добавляем путь к модулям генератора
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.PhraseKey import clean_phrase, phrase_filename, phrase_hash, phrase_key, phrase_keys
+
+# Хэш клиента: SpeechSynthesizer.hash() из public/scripts/speech-synthesizer.js
+# (CryptoJS.MD5 от строки хэширует ее UTF-8 представление, как crypto в node)
+JS_HASH = r"""
+const crypto = require('crypto');
+const phrases = JSON.parse(require('fs').readFileSync(process.argv[1], 'utf8'));
+const hash = (phrase) => crypto.createHash('md5').update(
+    phrase.trim().normalize('NFC').split(/\s+/).join(' ').toLowerCase(), 'utf8').digest('hex');
+process.stdout.write(JSON.stringify(phrases.map(hash)));
+"""
+
+# Случаи, на которых расходятся наивная нормализация Python и JavaScript
+EDGE_CASES = [
+    'Hello  world',
+    '  Leading and trailing\t',
+    'Non\u00a0breaking\u2009space',
+    'Cafe\u0301 au lait',
+    'Caf\u00e9 au lait',
+    '\u039f\u0394\u039f\u03a3',
+    'Stra\u00dfe',
+    'Zero\ufeffwidth',
+    'Field\x1fseparator',
+    '\u0401\u0436\u0438\u043a \u0432 \u0442\u0443\u043c\u0430\u043d\u0435',
+    'Line\u2028separator',
+]
+
+
+def legacy_hash(text: str) -> str:
+    """Прежняя нормализация в генераторах (без NFC и пробелов JavaScript)"""
+    return hashlib.md5(' '.join(text.strip().split()).lower().encode('utf-8')).hexdigest()
+
+
+def load_corpus(json_file: str):
+    """Очищенные фразы корпуса: (язык, текст)"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    corpus = []
+    for phrases_list in data.values():
+        for phrase_pair in phrases_list:
+            for phrase_type, language in (('target', 'en'), ('native', 'ru')):
+                phrase = phrase_pair.get(phrase_type, '').strip()
+                if phrase:
+                    corpus.append((language, clean_phrase(phrase)))
+    return corpus
+
+
+def js_hashes(texts):
+    """Хэши клиента через node или None, если node не установлен"""
+    node = shutil.which('node') or shutil.which('nodejs')
+    if node is None:
+        return None
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8', delete=False) as f:
+        json.dump(texts, f, ensure_ascii=False)
+        input_file = f.name
+    try:
+        output = subprocess.run([node, '-e', JS_HASH, input_file], check=True,
+                                capture_output=True, text=True).stdout
+    finally:
+        os.remove(input_file)
+    return json.loads(output)
+
+
+def check_consistency(corpus) -> bool:
+    """
+    Сверка ключей: клиент (JavaScript), пакетная и одиночная формы,
+    имена файлов EnhancedSpeechGenerator
+
+    Returns:
+        True если расхождений нет
+    """
+    texts = [text for _, text in corpus] + EDGE_CASES
+    hashes = [phrase_hash(text) for text in texts]
+    ok = True
+
+    client = js_hashes(texts)
+    if client is None:
+        print("⚠️ node не найден, сверка с клиентом пропущена")
+    else:
+        mismatches = [text for text, ours, theirs in zip(texts, hashes, client) if ours != theirs]
+        for text in mismatches[:10]:
+            print(f"  ✗ клиент: {text!r}")
+        print(f"{'✓' if not mismatches else '✗'} Клиент (JavaScript): {len(texts) - len(mismatches)}/{len(texts)}")
+        ok = ok and not mismatches
+
+    batch = phrase_keys(texts, 'en')
+    single = [phrase_key(text, 'en') for text in texts]
+    batch_ok = batch == single
+    print(f"{'✓' if batch_ok else '✗'} phrase_keys совпадает с phrase_key")
+    ok = ok and batch_ok
+
+    try:
+        from SpeechGenerator_tts3 import EnhancedSpeechGenerator
+    except ImportError as e:
+        print(f"⚠️ EnhancedSpeechGenerator недоступен ({e}), сверка пропущена")
+    else:
+        generator = EnhancedSpeechGenerator(use_edge_tts=False, output_dir=tempfile.gettempdir())
+        phrase_types = {'en': 'target', 'ru': 'native'}
+        tts3_mismatches = [
+            text for language, text in corpus
+            if generator._plan_audio(text, phrase_types[language])['filename'] != phrase_filename(text, language)
+        ]
+        print(f"{'✓' if not tts3_mismatches else '✗'} EnhancedSpeechGenerator: "
+              f"{len(corpus) - len(tts3_mismatches)}/{len(corpus)}")
+        ok = ok and not tts3_mismatches
+
+    # Прежний хэш отличается только на тексте не в NFC и на пробелах вне \s
+    changed = [text for text, digest in zip(texts, hashes) if legacy_hash(text) != digest]
+    print(f"ℹ️ Фраз, у которых изменился хэш по сравнению с прежним: {len(changed)}")
+    for text in changed[:10]:
+        print(f"  • {text!r}")
+
+    return ok
+
+
+def bench(name: str, func, repeat: int, items: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+    rate = items * repeat / elapsed if elapsed > 0 else 0
+    print(f"  {name:<32} {elapsed:8.3f} с  {rate:12,.0f} фраз/с")
+
+
+def run_benchmark(corpus, repeat: int):
+    """Сравнение прежней нормализации, lru_cache и пакетной формы"""
+    texts = [text for _, text in corpus]
+
+    def cold():
+        phrase_hash.cache_clear()
+        phrase_key.cache_clear()
+        for text in texts:
+            phrase_key(text, 'en')
+
+    print(f"\nБенчмарк: {len(texts)} фраз x {repeat}")
+    bench("прежняя нормализация + md5", lambda: [legacy_hash(text) for text in texts], repeat, len(texts))
+    bench("phrase_key (пустой кэш)", cold, repeat, len(texts))
+    bench("phrase_key (кэш заполнен)", lambda: [phrase_key(text, 'en') for text in texts], repeat, len(texts))
+    bench("phrase_keys (пакет)", lambda: phrase_keys(texts, 'en'), repeat, len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сверка и бенчмарк ключей фраз (classes/PhraseKey.py)')
+    parser.add_argument('json_file', nargs='?',
+                        default=str(Path(__file__).resolve().parent.parent / 'phrases.json'),
+                        help='JSON файл с фразами (по умолчанию: generator/phrases.json)')
+    parser.add_argument('--repeat', type=int, default=100, help='Повторов бенчмарка (по умолчанию: 100)')
+    parser.add_argument('--skip-benchmark', action='store_true', help='Только сверка')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.json_file)
+    print(f"Фраз в корпусе: {len(corpus)}\n")
+
+    ok = check_consistency(corpus)
+
+    if not args.skip_benchmark:
+        run_benchmark(corpus, args.repeat)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
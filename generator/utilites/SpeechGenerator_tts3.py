@@ -1,7 +1,7 @@
 from gtts import gTTS
 import json
-import hashlib
 import os
+import sys
 from pathlib import Path
 import time
 from typing import Dict, List, Optional, Tuple
@@ -10,18 +10,53 @@ import subprocess
 import tempfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
-import re
+import asyncio
+import random
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.PhraseKey import clean_phrase, phrase_filename
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class RateLimiter:
+    """Ограничение частоты запросов (запросов в секунду) для asyncio"""
+    
+    def __init__(self, requests_per_second: float):
+        """
+        Args:
+            requests_per_second: Допустимое число запросов в секунду (0 - без ограничения)
+        """
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_time = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        """Ожидание слота для очередного запроса"""
+        if not self.interval:
+            return
+        
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        
+        if delay > 0:
+            await asyncio.sleep(delay)
+
 class EnhancedSpeechGenerator:
     def __init__(self, json_file_path: Optional[str] = None, 
                  use_edge_tts: bool = True,
                  voice_name: Optional[str] = None,
                  voice_type: Optional[str] = None,
-                 output_dir: str = "../public/data/voises"):
+                 output_dir: str = "../public/data/voises",
+                 max_workers: int = 3,
+                 requests_per_second: float = 5.0,
+                 max_retries: int = 3,
+                 retry_backoff: float = 1.0):
         """
         Улучшенный генератор речи
         
@@ -30,6 +65,10 @@ class EnhancedSpeechGenerator:
             use_edge_tts: Использовать Edge-TTS (True) или gTTS (False)
             voice_name: Имя конкретного голоса
             output_dir: Базовая директория для сохранения
+            max_workers: Максимальное число одновременных запросов синтеза
+            requests_per_second: Ограничение частоты запросов (0 - без ограничения)
+            max_retries: Количество повторов при ошибке синтеза
+            retry_backoff: Базовая задержка экспоненциального повтора, сек
         """
         self.json_file_path = json_file_path
         self.phrases_data = None
@@ -63,11 +102,15 @@ class EnhancedSpeechGenerator:
             'native': 'ru'     # Русский
         }
         
-        # Задержка между запросами
-        self.request_delay = 0.3
+        # Ограничение частоты запросов вместо фиксированной задержки
+        self.requests_per_second = requests_per_second
+        
+        # Максимум одновременных запросов синтеза
+        self.max_workers = max_workers
         
-        # Пул потоков для параллельной генерации
-        self.max_workers = 3
+        # Повторы с экспоненциальной задержкой
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
         
         # Настройки голосов для Edge-TTS
         self.edge_tts_voices = {
@@ -258,19 +301,6 @@ class EnhancedSpeechGenerator:
         except json.JSONDecodeError as e:
             raise ValueError(f"Ошибка чтения JSON файла: {e}")
     
-    def _generate_filename(self, phrase: str, phrase_type: str = 'target') -> str:
-        # Нормализуем фразу
-        normalized_phrase = ' '.join(phrase.strip().split()).lower()
-        
-        # Создаем MD5 хэш
-        phrase_hash = hashlib.md5(normalized_phrase.encode('utf-8')).hexdigest()
-        
-        # Получаем код языка
-        lang_code = self.language_map.get(phrase_type, 'unknown')
-        
-        # Формат: lang_hash.mp3
-        return f"{lang_code}_{phrase_hash}.mp3"
-    
     def _generate_with_gtts(self, text: str, lang: str, settings: Dict) -> Optional[bytes]:
         """Генерация аудио с помощью gTTS"""
         try:
@@ -299,140 +329,293 @@ class EnhancedSpeechGenerator:
             logger.error(f"Ошибка gTTS: {e}")
             return None
     
+    def _get_edge_tts_voice(self, lang: str, settings: Dict) -> str:
+        """Выбор голоса Edge-TTS для языка"""
+        voice = settings.get('voice_name')
+        
+        if not voice:
+            # Если голос не указан, берем по предпочтениям
+            voice = self.get_voice_by_preference(lang, settings.get('voice_type') or self.voice_type)
+        
+        return voice
+    
+    async def _generate_with_edge_tts_async(self, text: str, lang: str, settings: Dict) -> Optional[bytes]:
+        """Асинхронная генерация аудио с помощью Edge-TTS"""
+        import edge_tts
+        
+        voice = self._get_edge_tts_voice(lang, settings)
+        rate = settings.get('rate', '+0%')
+        
+        tts = edge_tts.Communicate(text=text, voice=voice, rate=rate)
+        audio_chunks = []
+        
+        async for chunk in tts.stream():
+            if chunk["type"] == "audio":
+                audio_chunks.append(chunk["data"])
+        
+        return b''.join(audio_chunks)
+    
     def _generate_with_edge_tts(self, text: str, lang: str, settings: Dict) -> Optional[bytes]:
         """Генерация аудио с помощью Edge-TTS (высокое качество)"""
         try:
-            import edge_tts
-            import asyncio
-            
-            # Выбираем голос
-            voice = settings.get('voice_name')
-            
-            if not voice:
-                # Если голос не указан, берем первый доступный
-                voices = {
-                    'en': 'en-US-AriaNeural',
-                    'ru': 'ru-RU-SvetlanaNeural'
-                }
-                voice = self.get_voice_by_preference(lang, self.voice_type) # voices.get(lang, 'en-US-AriaNeural')
-
-
-            rate = settings.get('rate', '+0%')
-            
-            async def generate():
-                tts = edge_tts.Communicate(text=text, voice=voice, rate=rate)
-                audio_chunks = []
-                
-                async for chunk in tts.stream():
-                    if chunk["type"] == "audio":
-                        audio_chunks.append(chunk["data"])
-                
-                return b''.join(audio_chunks)
-            
             # Запускаем асинхронную генерацию
-            audio_data = asyncio.run(generate())
-            return audio_data
+            return asyncio.run(self._generate_with_edge_tts_async(text, lang, settings))
             
         except Exception as e:
             logger.error(f"Ошибка Edge-TTS: {e}")
             return None
     
-    def generate_audio(self, phrase: str, phrase_type: str = 'target') -> Optional[Dict]:
+    def _gtts_settings(self, lang: str) -> Dict:
+        """Настройки для gTTS"""
+        return {
+            'tld': 'com' if lang == 'en' else 'ru',
+            'slow': False
+        }
+    
+    def _plan_audio(self, phrase: str, phrase_type: str = 'target') -> Optional[Dict]:
         """
-        Генерация аудиофайла
+        Подготовка задания: очистка фразы, имя и путь файла
         
         Args:
             phrase: Текст фразы
             phrase_type: Тип фразы ('target' или 'native')
         
         Returns:
-            dict: Информация о сгенерированном файле
+            dict: Параметры задания или None для пустой фразы
         """
-        
         if not phrase or not isinstance(phrase, str):
             logger.warning("Пустая фраза")
             return None
         
         # Нормализуем фразу
-        clean_phrase = re.sub(r'\([^()]*\)|\[[^\[\]]*\]', '', ' '.join(phrase.strip().split())).strip()
-        
-        # Генерация имени файла
-        filename = self._generate_filename(clean_phrase, phrase_type)
+        clean_text = clean_phrase(phrase)
         
         # Получаем код языка
         lang_code = self.language_map.get(phrase_type, 'en')
         
-        # Настройки
-        settings = {
-            'rate': '+0%'
-        }
+        # Генерация имени файла
+        filename = phrase_filename(clean_text, lang_code)
         
         # Определение директории для сохранения
         # Создаем подпапку с именем языка
         save_dir = Path(self.base_output_dir) / self.voice_type / lang_code
         
-        save_dir.mkdir(parents=True, exist_ok=True)
+        return {
+            'phrase': clean_text,
+            'phrase_type': phrase_type,
+            'lang': lang_code,
+            'filename': filename,
+            'filepath': save_dir / filename
+        }
+    
+    def _audio_result(self, plan: Dict, file_size: int, already_exists: bool) -> Dict:
+        """Формирование информации о файле"""
+        return {
+            'phrase': plan['phrase'],
+            'phrase_type': plan['phrase_type'],
+            'filename': plan['filename'],
+            'filepath': str(plan['filepath']),
+            'file_size': file_size,
+            'already_exists': already_exists,
+            'engine': 'edge_tts' if self.use_edge_tts else 'gtts'
+        }
+    
+    def _existing_result(self, plan: Dict) -> Optional[Dict]:
+        """Информация об уже существующем файле или None"""
+        filepath = plan['filepath']
+        try:
+            file_size = filepath.stat().st_size
+        except OSError:
+            return None
+        
+        if file_size > 0:
+            logger.info(f"Файл уже существует: {plan['filename']}")
+            return self._audio_result(plan, file_size, True)
+        return None
+    
+    def _save_audio(self, plan: Dict, audio_data: bytes) -> Optional[Dict]:
+        """Сохранение аудиоданных в файл"""
+        filepath = plan['filepath']
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Пишем во временный файл и атомарно переименовываем
+        temp_file = filepath.with_name(f"{filepath.name}.{os.getpid()}.part")
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(audio_data)
+            os.replace(temp_file, filepath)
+        except OSError:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
+        
+        file_size = filepath.stat().st_size
+        if file_size > 0:
+            logger.info(f"✓ Создан: {plan['filename']} ({file_size / 1024:.1f} KB)")
+            return self._audio_result(plan, file_size, False)
+        return None
+    
+    def generate_audio(self, phrase: str, phrase_type: str = 'target') -> Optional[Dict]:
+        """
+        Генерация аудиофайла
+        
+        Args:
+            phrase: Текст фразы
+            phrase_type: Тип фразы ('target' или 'native')
         
-        # Полный путь к файлу
-        filepath = save_dir / filename
+        Returns:
+            dict: Информация о сгенерированном файле
+        """
+        plan = self._plan_audio(phrase, phrase_type)
+        if plan is None:
+            return None
         
         # Проверяем, существует ли уже файл
-        if filepath.exists() and filepath.stat().st_size > 0:
-            logger.info(f"Файл уже существует: {filename}")
-            return {
-                'phrase': clean_phrase,
-                'phrase_type': phrase_type,
-                'filename': filename,
-                'filepath': str(filepath),
-                'file_size': filepath.stat().st_size,
-                'already_exists': True,
-                'engine': 'edge_tts' if self.use_edge_tts else 'gtts'
-            }
+        existing = self._existing_result(plan)
+        if existing:
+            return existing
         
-        # Получаем язык
-        lang = self.language_map.get(phrase_type, 'en')
+        lang = plan['lang']
+        clean_text = plan['phrase']
         
-        logger.info(f"Генерация: '{clean_phrase[:60]}...' ({'Edge-TTS' if self.use_edge_tts else 'gTTS'})")
+        logger.info(f"Генерация: '{clean_text[:60]}...' ({'Edge-TTS' if self.use_edge_tts else 'gTTS'})")
         
         # Выбираем метод генерации
-        audio_data = None
-        
         if self.use_edge_tts and self.edge_tts_available:
-            audio_data = self._generate_with_edge_tts(clean_phrase, lang, settings)
+            audio_data = self._generate_with_edge_tts(clean_text, lang, {'rate': '+0%'})
         else:
-            # Настройки для gTTS
-            gtts_settings = {
-                'tld': 'com' if lang == 'en' else 'ru',
-                'slow': False
-            }
-            audio_data = self._generate_with_gtts(clean_phrase, lang, gtts_settings)
+            audio_data = self._generate_with_gtts(clean_text, lang, self._gtts_settings(lang))
         
         if audio_data:
-            # Сохраняем в файл
-            with open(filepath, 'wb') as f:
-                f.write(audio_data)
-            
-            # Задержка между запросами
-            time.sleep(self.request_delay)
-            
-            # Проверяем файл
-            if filepath.exists() and filepath.stat().st_size > 0:
-                file_size_kb = filepath.stat().st_size / 1024
-                logger.info(f"✓ Создан: {filename} ({file_size_kb:.1f} KB)")
+            try:
+                result = self._save_audio(plan, audio_data)
+            except OSError as e:
+                logger.error(f"Ошибка записи {plan['filename']}: {e}")
+                result = None
+            if result:
+                return result
+        
+        logger.error(f"Ошибка генерации для: '{clean_text[:30]}...'")
+        return None
+    
+    async def _synthesize_async(self, plan: Dict) -> Optional[bytes]:
+        """Синтез одной фразы без перехвата ошибок (для повторов)"""
+        lang = plan['lang']
+        
+        if self.use_edge_tts and self.edge_tts_available:
+            settings = {'rate': '+0%', 'voice_type': plan.get('voice_type')}
+            return await self._generate_with_edge_tts_async(plan['phrase'], lang, settings)
+        
+        # gTTS синхронный - выполняем в пуле потоков
+        return await asyncio.to_thread(
+            self._generate_with_gtts, plan['phrase'], lang, self._gtts_settings(lang)
+        )
+    
+    async def _generate_job_async(self, plan: Dict, semaphore: asyncio.Semaphore,
+                                  limiter: RateLimiter) -> Optional[Dict]:
+        """
+        Генерация одного файла в конвейере: семафор, лимит частоты, повторы
+        
+        Args:
+            plan: Параметры задания из _plan_audio (force - перезаписать
+                  существующий файл, voice_type - гендер голоса задания)
+            semaphore: Ограничение одновременных запросов
+            limiter: Ограничение частоты запросов
+        
+        Returns:
+            dict: Информация о файле или None при ошибке
+        """
+        if not plan.get('force'):
+            existing = self._existing_result(plan)
+            if existing:
+                return existing
+        
+        clean_text = plan['phrase']
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    await limiter.wait()
+                    audio_data = await self._synthesize_async(plan)
                 
-                return {
-                    'phrase': clean_phrase,
-                    'phrase_type': phrase_type,
-                    'filename': filename,
-                    'filepath': str(filepath),
-                    'file_size': filepath.stat().st_size,
-                    'already_exists': False,
-                    'engine': 'edge_tts' if self.use_edge_tts else 'gtts'
-                }
-        
-        logger.error(f"Ошибка генерации для: '{clean_phrase[:30]}...'")
+                if audio_data:
+                    # Ошибка записи (нет места, права) - как ошибка синтеза: повтор
+                    result = await asyncio.to_thread(self._save_audio, plan, audio_data)
+                    if result:
+                        return result
+                    error = "файл не создан"
+                else:
+                    error = "пустой ответ"
+            except Exception as e:
+                error = e
+            
+            if attempt < self.max_retries:
+                delay = self.retry_backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+                logger.warning(f"Повтор {attempt + 1}/{self.max_retries} через {delay:.1f} с "
+                               f"для '{clean_text[:30]}...': {error}")
+                await asyncio.sleep(delay)
+        
+        logger.error(f"Ошибка генерации для: '{clean_text[:30]}...': {error}")
         return None
     
+    async def _generate_many_async(self, plans: List[Optional[Dict]]) -> List[Optional[Dict]]:
+        """Параллельная генерация списка заданий"""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        limiter = RateLimiter(self.requests_per_second)
+        
+        # Одинаковые фразы генерируются один раз
+        tasks = {}
+        
+        async def run(plan):
+            if plan is None:
+                return None
+            
+            key = str(plan['filepath'])
+            if key in tasks:
+                result = await tasks[key]
+                return dict(result, already_exists=True) if result else None
+            
+            tasks[key] = asyncio.ensure_future(self._generate_job_async(plan, semaphore, limiter))
+            return await tasks[key]
+        
+        results = await asyncio.gather(*(run(plan) for plan in plans), return_exceptions=True)
+        
+        # Непредвиденная ошибка одного задания не прерывает остальные
+        for plan, result in zip(plans, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Ошибка генерации для: '{plan['phrase'][:30]}...': {result}")
+        return [None if isinstance(result, BaseException) else result for result in results]
+    
+    def generate_many(self, jobs: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+        """
+        Параллельная генерация аудиофайлов
+        
+        Args:
+            jobs: Список пар (фраза, тип фразы 'target'/'native')
+        
+        Returns:
+            Список результатов в порядке заданий (None при ошибке)
+        """
+        plans = [self._plan_audio(phrase, phrase_type) for phrase, phrase_type in jobs]
+        return self.generate_plans(plans)
+    
+    def generate_plans(self, plans: List[Optional[Dict]]) -> List[Optional[Dict]]:
+        """
+        Параллельная генерация готовых заданий
+        
+        Задание - словарь из _plan_audio; путь файла, гендер голоса
+        (voice_type) и перезапись (force) можно задать для каждого задания.
+        
+        Args:
+            plans: Список заданий (None пропускается)
+        
+        Returns:
+            Список результатов в порядке заданий (None при ошибке)
+        """
+        return asyncio.run(self._generate_many_async(plans))
+    
     def generate_all_from_json(self) -> Dict:
         """Генерация всех аудиофайлов из JSON"""
         # Загружаем данные
@@ -462,15 +645,13 @@ class EnhancedSpeechGenerator:
         logger.info(f"ГЕНЕРАЦИЯ АУДИОФАЙЛОВ ({'Edge-TTS' if self.use_edge_tts else 'gTTS'})")
         logger.info(f"{'='*60}")
         
-        # Обрабатываем каждую категорию
+        # Собираем задания по всем категориям
+        jobs = []
         for category, phrases_list in data.items():
-            logger.info(f"\nКатегория: {category}")
-            logger.info(f"Фраз: {len(phrases_list)}")
-            logger.info(f"{'-'*40}")
+            logger.info(f"Категория: {category} (фраз: {len(phrases_list)})")
             
             results['total_categories'] += 1
             
-            # Обрабатываем каждую фразу в категории
             for i, phrase_pair in enumerate(phrases_list, 1):
                 target_phrase = phrase_pair.get('target', '').strip()
                 native_phrase = phrase_pair.get('native', '').strip()
@@ -479,52 +660,33 @@ class EnhancedSpeechGenerator:
                     logger.info(f"  Пропущена пустая фраза #{i}")
                     continue
                 
-                # Генерация английской версии (target)
                 if target_phrase:
-                    logger.info(f"  Фраза #{i} (EN): '{target_phrase[:50]}...'")
-                    target_result = self.generate_audio(
-                        target_phrase, 
-                        'target'
-                    )
-                    
-                    if target_result:
-                        if target_result.get('already_exists'):
-                            results['languages']['en']['existing'] += 1
-                            results['existing_files'] += 1
-                            #logger.info(f"    ✓ Файл уже существует")
-                        else:
-                            results['languages']['en']['files'] += 1
-                            results['generated_files'] += 1
-                            logger.info(f"    ✓ Файл создан")
-                    else:
-                        results['languages']['en']['errors'] += 1
-                        results['errors'] += 1
-                        logger.info(f"    ✗ Ошибка создания файла")
-                
-                # Генерация версии (native)
+                    jobs.append((target_phrase, 'target'))
                 if native_phrase:
-                    logger.info(f"  Фраза #{i} (RU): '{native_phrase[:50]}...'")
-                    native_result = self.generate_audio(
-                        native_phrase, 
-                        'native'
-                    )
-                    
-                    if native_result:
-                        if native_result.get('already_exists'):
-                            results['languages']['ru']['existing'] += 1
-                            results['existing_files'] += 1
-                            #logger.info(f"    ✓ Файл уже существует")
-                        else:
-                            results['languages']['ru']['files'] += 1
-                            results['generated_files'] += 1
-                            logger.info(f"    ✓ Файл создан")
-                    else:
-                        results['languages']['ru']['errors'] += 1
-                        results['errors'] += 1
-                        logger.info(f"    ✗ Ошибка создания файла")
+                    jobs.append((native_phrase, 'native'))
                 
                 results['total_phrases'] += 1
         
+        logger.info(f"Заданий: {len(jobs)}, потоков: {self.max_workers}, "
+                    f"лимит: {self.requests_per_second or '∞'} запр/с")
+        
+        # Параллельная генерация
+        job_results = self.generate_many(jobs)
+        
+        for (phrase, phrase_type), job_result in zip(jobs, job_results):
+            lang_code = self.language_map.get(phrase_type, 'en')
+            
+            if job_result:
+                if job_result.get('already_exists'):
+                    results['languages'][lang_code]['existing'] += 1
+                    results['existing_files'] += 1
+                else:
+                    results['languages'][lang_code]['files'] += 1
+                    results['generated_files'] += 1
+            else:
+                results['languages'][lang_code]['errors'] += 1
+                results['errors'] += 1
+        
         # Итоги
         logger.info(f"\n{'='*60}")
         logger.info("ИТОГИ:")
@@ -559,6 +721,12 @@ def main():
                        help='Использовать gTTS вместо Edge-TTS')
     parser.add_argument('--voice', help='Имя конкретного голоса для Edge-TTS')
     parser.add_argument('--voice-type', default='female', help='male or female')
+    parser.add_argument('--workers', type=int, default=3,
+                       help='Количество одновременных запросов синтеза')
+    parser.add_argument('--rps', type=float, default=5.0,
+                       help='Ограничение частоты запросов в секунду (0 - без ограничения)')
+    parser.add_argument('--retries', type=int, default=3,
+                       help='Количество повторов при ошибке')
     
     args = parser.parse_args()
     
@@ -568,7 +736,10 @@ def main():
         use_edge_tts=not args.use_gtts,  # Если указан --use-gtts, то не использовать Edge-TTS
         voice_name=args.voice,
         voice_type=args.voice_type,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        max_workers=args.workers,
+        requests_per_second=args.rps,
+        max_retries=args.retries
     )
     
     # Запускаем генерацию
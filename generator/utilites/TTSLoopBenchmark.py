@@ -0,0 +1,114 @@
+import asyncio
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Добавляем путь к модулям генератора
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classes.AsyncLoopRunner import AsyncLoopRunner
+
+
+async def fake_tts(text: str, output_file: str, latency: float, semaphore: asyncio.Semaphore = None) -> bool:
+    """
+    Локальная заглушка Edge-TTS: имитирует сетевую задержку и пишет файл
+
+    Args:
+        text: Текст фразы
+        output_file: Путь к выходному файлу
+        latency: Имитируемое время синтеза в секундах
+        semaphore: Ограничение одновременных запросов (опционально)
+
+    Returns:
+        True если успешно
+    """
+    if semaphore is not None:
+        async with semaphore:
+            await asyncio.sleep(latency)
+    else:
+        await asyncio.sleep(latency)
+
+    with open(output_file, 'wb') as f:
+        f.write(text.encode('utf-8') * 64)
+    return True
+
+
+def bench_new_loop_per_phrase(phrases, out_dir: str, latency: float, request_delay: float) -> float:
+    """Старая схема: новый event loop и задержка на каждую фразу"""
+    start = time.perf_counter()
+    for i, text in enumerate(phrases):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(fake_tts(text, os.path.join(out_dir, f"old_{i}.mp3"), latency))
+        loop.close()
+        time.sleep(request_delay)
+    return time.perf_counter() - start
+
+
+def bench_runner_sequential(runner: AsyncLoopRunner, phrases, out_dir: str, latency: float) -> float:
+    """Постоянный loop, последовательные вызовы"""
+    start = time.perf_counter()
+    for i, text in enumerate(phrases):
+        runner.run(fake_tts(text, os.path.join(out_dir, f"seq_{i}.mp3"), latency))
+    return time.perf_counter() - start
+
+
+def bench_runner_concurrent(runner: AsyncLoopRunner, phrases, out_dir: str,
+                            latency: float, workers: int, max_concurrent: int) -> float:
+    """Постоянный loop, параллельные вызовы из нескольких потоков"""
+    semaphore = runner.run(_make_semaphore(max_concurrent))
+
+    def call(item):
+        i, text = item
+        return runner.run(fake_tts(text, os.path.join(out_dir, f"conc_{i}.mp3"), latency, semaphore))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(call, enumerate(phrases)))
+    return time.perf_counter() - start
+
+
+async def _make_semaphore(value: int) -> asyncio.Semaphore:
+    return asyncio.Semaphore(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сравнение накладных расходов event loop при синтезе речи')
+    parser.add_argument('--phrases', type=int, default=50, help='Количество фраз')
+    parser.add_argument('--latency', type=float, default=0.05, help='Имитируемое время синтеза, сек')
+    parser.add_argument('--request-delay', type=float, default=0.3, help='Задержка старой схемы, сек')
+    parser.add_argument('--workers', type=int, default=8, help='Потоков-клиентов для параллельного режима')
+    parser.add_argument('--max-concurrent', type=int, default=4, help='Одновременных синтезов в loop')
+
+    args = parser.parse_args()
+
+    phrases = [f"phrase number {i}" for i in range(args.phrases)]
+    runner = AsyncLoopRunner('benchmark-loop')
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        results = {
+            'новый loop + задержка': bench_new_loop_per_phrase(phrases, out_dir, args.latency, args.request_delay),
+            'постоянный loop': bench_runner_sequential(runner, phrases, out_dir, args.latency),
+            'постоянный loop, параллельно': bench_runner_concurrent(
+                runner, phrases, out_dir, args.latency, args.workers, args.max_concurrent
+            ),
+        }
+
+    runner.stop()
+
+    print(f"\n{'='*60}")
+    print(f"ФРАЗ: {args.phrases}, ИМИТАЦИЯ СИНТЕЗА: {args.latency * 1000:.0f} мс")
+    print(f"{'='*60}")
+    for name, elapsed in results.items():
+        per_phrase = elapsed / args.phrases
+        overhead = per_phrase - args.latency
+        print(f"{name:32s} всего {elapsed:7.2f} с | на фразу {per_phrase * 1000:7.1f} мс | "
+              f"накладные {overhead * 1000:7.1f} мс")
+
+
+if __name__ == "__main__":
+    main()